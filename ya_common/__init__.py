@@ -0,0 +1,8 @@
+"""
+Код, общий для проектов YaNews и YaNote.
+
+Пакет лежит рядом с проектами; settings.py каждого проекта добавляет
+родительскую директорию в sys.path, так что пакет импортируется
+как ya_common везде, где загружены настройки: в manage.py, тестах
+и бенчмарках.
+"""
@@ -0,0 +1,187 @@
+"""
+Общая обвязка бенчмарков проектов.
+
+setup настраивает Django для запуска бенчмарка вне manage.py, throughput
+измеряет частоту вызовов функции. LoadBenchmark — командная строка
+бенчмарков load: заполнение базы, прогон драйверов ya_common/drivers.py
+каждого в отдельном процессе и сравнение с базовым прогоном. Данные и
+маршруты задают подклассы в проектах.
+"""
+import argparse
+import json
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import time
+
+from .drivers import DRIVERS, TOLERANCE, compare, print_results, run_driver
+
+
+def make_database_path(project):
+    """Путь к файлу базы во временной директории."""
+    return os.path.join(
+        tempfile.mkdtemp(prefix=f'{project}-bench-'), 'db.sqlite3'
+    )
+
+
+def setup(project, temporary_database=False, database=None, **overrides):
+    """
+    Настраивает Django проекта project для запуска бенчмарка.
+
+    С temporary_database=True работа идёт с пустой базой во временном
+    файле, к которой применены миграции; с database — с базой в этом
+    файле, который создаётся при необходимости. Именованные аргументы
+    переопределяют настройки проекта.
+    """
+    import django
+    from django.conf import settings
+
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', f'{project}.settings')
+    if temporary_database:
+        database = make_database_path(project)
+    if database:
+        settings.DATABASES['default']['NAME'] = database
+    settings.ALLOWED_HOSTS = ['*']
+    for name, value in overrides.items():
+        setattr(settings, name, value)
+    django.setup()
+    if database:
+        from django.core.management import call_command
+        call_command('migrate', verbosity=0)
+
+
+def throughput(func, min_time=0.5):
+    """Количество вызовов func в секунду."""
+    calls = 0
+    started = time.perf_counter()
+    while True:
+        func()
+        calls += 1
+        elapsed = time.perf_counter() - started
+        if elapsed >= min_time:
+            return calls / elapsed
+
+
+class LoadBenchmark:
+    """
+    Нагрузка на маршруты проекта на реалистичном объёме данных.
+
+    Подкласс задаёт project — пакет настроек проекта, full_volume —
+    полный объём данных по видам записей, и методы has_data, seed и
+    get_routes. Драйверы запускаются командой python -m module.
+    """
+    project = None
+    module = 'benchmarks.load'
+    full_volume = {}
+
+    def has_data(self):
+        """Заполнена ли база."""
+        raise NotImplementedError
+
+    def seed(self, volume, rng):
+        """Заполняет базу объёмом volume со случайностью из rng."""
+        raise NotImplementedError
+
+    def get_routes(self):
+        """Маршруты нагрузки, ya_common.drivers.Route."""
+        raise NotImplementedError
+
+    def after_driver(self):
+        """Убирает то, что записал в базу прогон драйвера."""
+
+    def get_volume(self, scale):
+        return {
+            name: max(1, int(count * scale))
+            for name, count in self.full_volume.items()
+        }
+
+    def prepare(self, database, scale):
+        """Создаёт и заполняет базу, если она ещё пуста."""
+        setup(self.project, database=database)
+        from django.db import connection
+
+        if not self.has_data():
+            volume = self.get_volume(scale)
+            print('Заполнение базы: ' + ', '.join(
+                f'{name} {count}' for name, count in volume.items()
+            ))
+            started = time.perf_counter()
+            self.seed(volume, random.Random(0))
+            print(f'База заполнена за {time.perf_counter() - started:.0f} с')
+        connection.close()
+
+    def run(self, args, database):
+        results = {}
+        for driver in args.drivers:
+            output = subprocess.run(
+                [
+                    sys.executable, '-m', self.module,
+                    '--driver', driver, '--database', database,
+                    '--seconds', str(args.seconds),
+                    '--concurrency', str(args.concurrency),
+                ],
+                check=True, capture_output=True, text=True
+            ).stdout
+            results[driver] = json.loads(output.splitlines()[-1])
+            print_results(driver, results[driver])
+            self.after_driver()
+        return results
+
+    def get_parser(self):
+        parser = argparse.ArgumentParser()
+        parser.add_argument('--scale', type=float, default=0.01)
+        parser.add_argument('--database')
+        parser.add_argument(
+            '--drivers', nargs='+', choices=DRIVERS, default=list(DRIVERS)
+        )
+        parser.add_argument('--driver', choices=DRIVERS)
+        parser.add_argument('--seconds', type=float, default=1)
+        parser.add_argument('--concurrency', type=int, default=4)
+        parser.add_argument('--baseline')
+        parser.add_argument('--save-baseline')
+        parser.add_argument('--tolerance', type=float, default=TOLERANCE)
+        return parser
+
+    def main(self):
+        parser = self.get_parser()
+        args = parser.parse_args()
+        if args.driver:
+            setup(self.project, database=args.database, DEBUG=False)
+            print(json.dumps(run_driver(
+                args.driver, self.get_routes(), args.seconds,
+                args.concurrency
+            )))
+            return
+
+        params = {
+            'scale': args.scale,
+            'seconds': args.seconds,
+            'concurrency': args.concurrency,
+        }
+        baseline = None
+        if args.baseline:
+            with open(args.baseline) as file:
+                baseline = json.load(file)
+            if baseline['params'] != params:
+                parser.error(
+                    f'Базовый прогон выполнен с другими параметрами: '
+                    f'{baseline["params"]}.'
+                )
+        database = args.database or make_database_path(self.project)
+        self.prepare(database, args.scale)
+        results = self.run(args, database)
+        if args.save_baseline:
+            with open(args.save_baseline, 'w') as file:
+                json.dump(
+                    {'params': params, 'results': results}, file, indent=2
+                )
+        if baseline is not None:
+            regressions = compare(
+                results, baseline['results'], args.tolerance
+            )
+            if regressions:
+                sys.exit('Регрессии по сравнению с базовым прогоном:\n'
+                         + '\n'.join(regressions))
+            print('Регрессий по сравнению с базовым прогоном нет.')
@@ -0,0 +1,102 @@
+"""
+Бюджеты запросов к базе данных и времени ответа: плагин pytest.
+
+Проекты задают только таблицу BUDGETS из строк Budget: по строке на
+адрес, метод и клиента. Плагин подключается из conftest.py проекта и
+даёт контекстный менеджер query_budget (он же фикстура), отчёт о
+расходе бюджетов в конце прогона и сбор результатов с воркеров
+pytest-xdist.
+"""
+import time
+from collections import namedtuple
+from contextlib import contextmanager
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+# json — имя фикстуры или атрибута с телом запроса в JSON; без него
+# запрос отправляет данные формы.
+Budget = namedtuple(
+    'Budget',
+    ('name', 'args', 'client', 'method', 'queries', 'milliseconds', 'json'),
+    defaults=(None,)
+)
+Result = namedtuple(
+    'Result',
+    ('label', 'queries', 'max_queries', 'milliseconds', 'max_milliseconds')
+)
+
+results = []
+
+
+def budget_id(budget):
+    return f'{budget.method.upper()} {budget.name} {budget.client}'
+
+
+@contextmanager
+def query_budget(label, max_queries, max_milliseconds):
+    """Проверяет, что код внутри with укладывается в бюджет."""
+    with CaptureQueriesContext(connection) as context:
+        started = time.perf_counter()
+        yield context
+        milliseconds = (time.perf_counter() - started) * 1000
+    results.append(Result(
+        label, len(context), max_queries, milliseconds, max_milliseconds
+    ))
+    queries = '\n'.join(query['sql'] for query in context.captured_queries)
+    assert len(context) <= max_queries, (
+        f'{label}: {len(context)} запросов при бюджете {max_queries}:\n'
+        f'{queries}'
+    )
+    assert milliseconds <= max_milliseconds, (
+        f'{label}: {milliseconds:.0f} мс при бюджете {max_milliseconds} мс'
+    )
+
+
+def format_report():
+    """Строки отчёта о расходе бюджетов, самые затратные — первыми."""
+    lines = []
+    for result in sorted(
+            results, key=lambda result: result.milliseconds, reverse=True
+    ):
+        mark = '!' if (
+            result.queries > result.max_queries
+            or result.milliseconds > result.max_milliseconds
+        ) else ' '
+        lines.append(
+            f'{mark} {result.label:<40} '
+            f'запросов {result.queries:>3}/{result.max_queries:<3} '
+            f'время {result.milliseconds:>7.1f}/{result.max_milliseconds} мс'
+        )
+    return lines
+
+
+@pytest.fixture(name='query_budget')
+def query_budget_fixture():
+    """Контекстный менеджер проверки бюджета запросов и времени."""
+    return query_budget
+
+
+def pytest_terminal_summary(terminalreporter):
+    """Отчёт о расходе бюджетов запросов и времени."""
+    if results:
+        terminalreporter.section('Бюджеты запросов и времени')
+        for line in format_report():
+            terminalreporter.write_line(line)
+
+
+def pytest_sessionfinish(session):
+    """Воркер pytest-xdist передаёт результаты бюджетов контроллеру."""
+    workeroutput = getattr(session.config, 'workeroutput', None)
+    if workeroutput is not None:
+        workeroutput['budgets'] = [list(result) for result in results]
+
+
+@pytest.hookimpl(optionalhook=True)
+def pytest_testnodedown(node, error):
+    """Контроллер pytest-xdist собирает результаты бюджетов воркеров."""
+    results.extend(
+        Result(*result)
+        for result in getattr(node, 'workeroutput', {}).get('budgets', ())
+    )
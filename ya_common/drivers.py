@@ -0,0 +1,372 @@
+"""
+Способы подать запросы проекту и сводка нагрузочного прогона.
+
+Драйвер client выполняет запросы в процессе тестовым клиентом Django,
+wsgi — через локальный WSGI-сервер wsgiref по HTTP, asgi — прямо в
+ASGI-приложение Django из конкурентных задач asyncio. Каждый маршрут
+нагружается concurrency исполнителями в течение seconds секунд, для
+маршрута считаются запросы в секунду, перцентили задержки, ошибки и
+пик памяти, выделенной на один запрос.
+
+Модуль общий для бенчмарков load обоих проектов: маршруты и данные
+задают сами проекты.
+"""
+import asyncio
+import http.client
+import resource
+import threading
+import time
+import tracemalloc
+from socketserver import ThreadingMixIn
+from wsgiref.simple_server import WSGIRequestHandler, WSGIServer, make_server
+
+DRIVERS = ('client', 'wsgi', 'asgi')
+QUANTILES = (0.5, 0.95, 0.99)
+# Допустимое ухудшение по сравнению с базовым прогоном по умолчанию.
+TOLERANCE = 0.2
+
+
+class Route:
+    """
+    Маршрут нагрузки: имя адреса и запросы, которые по нему подаются.
+
+    Пути перебираются по кругу; cookies — cookies пользователя, от имени
+    которого идут запросы, или None для анонима.
+    """
+
+    def __init__(self, name, paths, method='GET', body=b'',
+                 content_type=None, cookies=None):
+        self.name = name
+        self.paths = paths
+        self.method = method
+        self.body = body
+        self.content_type = content_type
+        self.cookies = cookies
+
+    def get_headers(self):
+        headers = {'Host': 'localhost'}
+        if self.content_type:
+            headers['Content-Type'] = self.content_type
+        if self.cookies:
+            headers['Cookie'] = '; '.join(
+                f'{name}={value}' for name, value in self.cookies.items()
+            )
+            if 'csrftoken' in self.cookies:
+                headers['X-CSRFToken'] = self.cookies['csrftoken']
+        return headers
+
+
+def percentile(values, fraction):
+    """Перцентиль значений; None, если значений нет."""
+    if not values:
+        return None
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * fraction))]
+
+
+def summarize(latencies, errors, elapsed, peak):
+    result = {
+        'rps': len(latencies) / elapsed,
+        'errors': errors,
+        'peak_kb': peak / 1024,
+    }
+    for quantile in QUANTILES:
+        value = percentile(latencies, quantile)
+        result[f'p{quantile * 100:g}'] = (
+            None if value is None else value * 1000
+        )
+    return result
+
+
+def measure_peak(send, route):
+    """Пик памяти Python, выделенной за один запрос, в байтах."""
+    tracemalloc.start()
+    try:
+        send(route, route.paths[0])
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def load_threads(make_sender, route, seconds, concurrency):
+    """Нагружает маршрут из concurrency потоков."""
+    latencies = []
+    errors = 0
+    lock = threading.Lock()
+    barrier = threading.Barrier(concurrency + 1)
+
+    def worker(offset):
+        nonlocal errors
+        send = make_sender(route)
+        own, failed = [], 0
+        barrier.wait()
+        deadline = time.perf_counter() + seconds
+        number = offset
+        while time.perf_counter() < deadline:
+            started = time.perf_counter()
+            status = send(route, route.paths[number % len(route.paths)])
+            own.append(time.perf_counter() - started)
+            failed += status != 200
+            number += concurrency
+        with lock:
+            latencies.extend(own)
+            errors += failed
+
+    threads = [
+        threading.Thread(target=worker, args=(offset,))
+        for offset in range(concurrency)
+    ]
+    for thread in threads:
+        thread.start()
+    barrier.wait()
+    started = time.perf_counter()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+    peak = measure_peak(make_sender(route), route)
+    return summarize(latencies, errors, elapsed, peak)
+
+
+def make_client_sender(route):
+    from django.test import Client
+
+    client = Client()
+    for name, value in (route.cookies or {}).items():
+        client.cookies[name] = value
+
+    def send(route, path):
+        extra = {}
+        if 'csrftoken' in client.cookies:
+            extra['HTTP_X_CSRFTOKEN'] = client.cookies['csrftoken'].value
+        return client.generic(
+            route.method, path, route.body,
+            route.content_type or 'application/octet-stream', **extra
+        ).status_code
+
+    return send
+
+
+class QuietHandler(WSGIRequestHandler):
+
+    def log_message(self, format, *args):
+        pass
+
+
+class ThreadingWSGIServer(ThreadingMixIn, WSGIServer):
+    daemon_threads = True
+    request_queue_size = 128
+
+
+def start_wsgi_server():
+    """Запускает WSGI-сервер проекта в фоне; возвращает (сервер, порт)."""
+    from django.core.wsgi import get_wsgi_application
+
+    server = make_server(
+        '127.0.0.1', 0, get_wsgi_application(),
+        server_class=ThreadingWSGIServer, handler_class=QuietHandler
+    )
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, server.server_port
+
+
+def make_http_sender(port):
+    def make_sender(route):
+        headers = route.get_headers()
+
+        def send(route, path):
+            connection = http.client.HTTPConnection('127.0.0.1', port)
+            try:
+                connection.request(
+                    route.method, path, route.body or None, headers
+                )
+                response = connection.getresponse()
+                response.read()
+                return response.status
+            finally:
+                connection.close()
+
+        return send
+
+    return make_sender
+
+
+def make_scope(route, path):
+    path, _, query = path.partition('?')
+    return {
+        'type': 'http',
+        'asgi': {'version': '3.0'},
+        'http_version': '1.1',
+        'method': route.method,
+        'scheme': 'http',
+        'path': path,
+        'raw_path': path.encode(),
+        'query_string': query.encode(),
+        'root_path': '',
+        'headers': [
+            (name.lower().encode(), value.encode())
+            for name, value in route.get_headers().items()
+        ],
+        'client': ('127.0.0.1', 50000),
+        'server': ('localhost', 80),
+    }
+
+
+async def asgi_request(application, route, path):
+    """Выполняет запрос и возвращает код ответа."""
+    status = None
+
+    async def receive():
+        return {'type': 'http.request', 'body': route.body,
+                'more_body': False}
+
+    async def send(message):
+        nonlocal status
+        if message['type'] == 'http.response.start':
+            status = message['status']
+
+    await application(make_scope(route, path), receive, send)
+    return status
+
+
+async def load_tasks(application, route, seconds, concurrency):
+    """Нагружает маршрут из concurrency задач asyncio."""
+    latencies = []
+    errors = 0
+    deadline = time.perf_counter() + seconds
+
+    async def worker(offset):
+        nonlocal errors
+        number = offset
+        while time.perf_counter() < deadline:
+            started = time.perf_counter()
+            status = await asgi_request(
+                application, route, route.paths[number % len(route.paths)]
+            )
+            latencies.append(time.perf_counter() - started)
+            errors += status != 200
+            number += concurrency
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker(offset) for offset in range(concurrency)))
+    return latencies, errors, time.perf_counter() - started
+
+
+def load_asgi(route, seconds, concurrency):
+    from django.core.asgi import get_asgi_application
+
+    application = get_asgi_application()
+    latencies, errors, elapsed = asyncio.run(
+        load_tasks(application, route, seconds, concurrency)
+    )
+
+    def send(route, path):
+        return asyncio.run(asgi_request(application, route, path))
+
+    peak = measure_peak(send, route)
+    return summarize(latencies, errors, elapsed, peak)
+
+
+def run_driver(driver, routes, seconds, concurrency):
+    """
+    Нагружает маршруты по очереди одним драйвером.
+
+    Возвращает результаты по маршрутам и пик резидентной памяти
+    процесса в мегабайтах.
+    """
+    if driver == 'wsgi':
+        server, port = start_wsgi_server()
+        make_sender = make_http_sender(port)
+    results = {}
+    for route in routes:
+        if driver == 'asgi':
+            results[route.name] = load_asgi(route, seconds, concurrency)
+        else:
+            results[route.name] = load_threads(
+                make_client_sender if driver == 'client' else make_sender,
+                route, seconds, concurrency
+            )
+    if driver == 'wsgi':
+        server.shutdown()
+    return {
+        'routes': results,
+        'max_rss_mb': resource.getrusage(
+            resource.RUSAGE_SELF
+        ).ru_maxrss / 1024,
+    }
+
+
+def get_session_cookies(user):
+    """Cookies сессии пользователя и токена CSRF для запросов от его имени."""
+    from django.conf import settings
+    from django.test import Client
+    from django.utils.crypto import get_random_string
+
+    client = Client()
+    client.force_login(user)
+    return {
+        settings.SESSION_COOKIE_NAME:
+            client.cookies[settings.SESSION_COOKIE_NAME].value,
+        settings.CSRF_COOKIE_NAME: get_random_string(64),
+    }
+
+
+def compare(results, baseline, tolerance=TOLERANCE):
+    """
+    Сравнивает прогон с базовым.
+
+    Возвращает список строк с регрессиями: запросов в секунду меньше,
+    а задержки или памяти больше базовых больше чем на долю tolerance,
+    или появились ошибки.
+    """
+    regressions = []
+    for driver, result in results.items():
+        if driver not in baseline:
+            continue
+        base = baseline[driver]
+        if result['max_rss_mb'] > base['max_rss_mb'] * (1 + tolerance):
+            regressions.append(
+                f'{driver}: память процесса {result["max_rss_mb"]:.0f} МБ, '
+                f'было {base["max_rss_mb"]:.0f} МБ'
+            )
+        for name, route in result['routes'].items():
+            if name not in base['routes']:
+                continue
+            regressions += compare_route(
+                f'{driver} {name}', route, base['routes'][name], tolerance
+            )
+    return regressions
+
+
+def compare_route(label, route, base, tolerance):
+    regressions = []
+    if route['errors']:
+        regressions.append(f'{label}: ошибок {route["errors"]}')
+    if route['rps'] < base['rps'] * (1 - tolerance):
+        regressions.append(
+            f'{label}: {route["rps"]:.0f} запр/с, было {base["rps"]:.0f}'
+        )
+    for metric in ('p95', 'peak_kb'):
+        if route[metric] is None or base[metric] is None:
+            continue
+        if route[metric] > base[metric] * (1 + tolerance):
+            regressions.append(
+                f'{label}: {metric} {route[metric]:.1f}, '
+                f'было {base[metric]:.1f}'
+            )
+    return regressions
+
+
+def format_latency(value):
+    return f'{"—":>8}' if value is None else f'{value:>8.1f}'
+
+
+def print_results(driver, result):
+    print(f'{driver}: пик памяти процесса {result["max_rss_mb"]:.0f} МБ')
+    print(f'{"маршрут":>22} {"запр/с":>8} {"p50, мс":>8} {"p95, мс":>8} '
+          f'{"p99, мс":>8} {"КБ/запр":>8} {"ошибок":>7}')
+    for name, route in result['routes'].items():
+        latencies = ' '.join(
+            format_latency(route[metric]) for metric in ('p50', 'p95', 'p99')
+        )
+        print(f'{name:>22} {route["rps"]:>8.0f} {latencies} '
+              f'{route["peak_kb"]:>8.0f} {route["errors"]:>7}')
@@ -0,0 +1,293 @@
+"""
+Фоновые задачи, которые выполняются после записи.
+
+Задача — функция, отмеченная декоратором runner.job; её вызов
+откладывается методом delay с именованными аргументами, которые должны
+сериализоваться в JSON. Отложенная задача сохраняется в таблицу задач
+проекта и после фиксации транзакции выполняется в пуле потоков процесса
+размера <префикс>_MAX_WORKERS. Упавшая задача повторяется через
+<префикс>_RETRY_DELAY секунд, с каждой попыткой вдвое реже, пока не
+исчерпает <префикс>_MAX_ATTEMPTS попыток.
+
+Задачи, не выполненные до остановки процесса, остаются в таблице, и их
+выполняет команда drain_jobs. С <префикс>_EAGER задачи выполняются сразу
+при вызове delay — так удобно в тестах.
+
+Префикс настроек задаёт проект: NEWS_JOBS в YaNews, NOTES_JOBS в YaNote.
+Таблица задач — модель проекта, унаследованная от AbstractJob, команда
+drain_jobs — подкласс DrainJobsCommand.
+"""
+import logging
+import threading
+import traceback
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+from functools import partial
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import (
+    DEFAULT_DB_ALIAS, close_old_connections, models, transaction,
+)
+from django.db.models import F, Q
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+
+class AbstractJob(models.Model):
+    """Отложенная задача."""
+    PENDING = 'pending'
+    RUNNING = 'running'
+    FAILED = 'failed'
+    STATES = (
+        (PENDING, 'Ожидает'),
+        (RUNNING, 'Выполняется'),
+        (FAILED, 'Не выполнена'),
+    )
+
+    name = models.CharField(max_length=200)
+    payload = models.JSONField(default=dict)
+    state = models.CharField(max_length=10, choices=STATES, default=PENDING)
+    attempts = models.PositiveIntegerField(default=0)
+    run_after = models.DateTimeField(default=timezone.now)
+    started = models.DateTimeField(null=True, blank=True)
+    created = models.DateTimeField(auto_now_add=True)
+    last_error = models.TextField(blank=True)
+
+    class Meta:
+        abstract = True
+        indexes = (
+            models.Index(
+                fields=('state', 'run_after'), name='job_state_run_after_idx'
+            ),
+        )
+
+    def __str__(self):
+        return f'{self.name} ({self.state})'
+
+
+class Metrics:
+    """Счётчики выполненных задач и задержки от постановки до выполнения."""
+
+    def __init__(self, size=1000):
+        self.lock = threading.Lock()
+        self.processed = self.failed = self.retried = 0
+        self.latencies = deque(maxlen=size)
+
+    def record(self, outcome, latency=None):
+        with self.lock:
+            setattr(self, outcome, getattr(self, outcome) + 1)
+            if latency is not None:
+                self.latencies.append(latency)
+
+    def get(self):
+        with self.lock:
+            latencies = sorted(self.latencies)
+            counters = {
+                'processed': self.processed,
+                'failed': self.failed,
+                'retried': self.retried,
+            }
+        if latencies:
+            counters.update(
+                latency_p50=latencies[len(latencies) // 2],
+                latency_p95=latencies[int(len(latencies) * 0.95)],
+                latency_max=latencies[-1],
+            )
+        return counters
+
+
+class JobRunner:
+    """
+    Пул потоков, выполняющий задачи из таблицы model.
+
+    model — модель задач проекта, подкласс AbstractJob; prefix — префикс имён
+    настроек очереди. Задачи выполняются сразу после записи, поэтому
+    и свои данные им нужно читать из основной базы.
+    """
+
+    def __init__(self, model, prefix):
+        self.model = model
+        self.prefix = prefix
+        self.registry = {}
+        self.lock = threading.Lock()
+        self.executor = None
+        self.metrics = Metrics()
+
+    @property
+    def jobs(self):
+        """
+        Менеджер задач, работающий только с основной базой.
+
+        Задачу забирают и удаляют в основной базе, и читать её из
+        отстающей реплики, куда чтение мог бы направить роутер проекта,
+        нельзя: задача не нашлась бы или нашлась бы в старом состоянии.
+        """
+        return self.model.objects.db_manager(DEFAULT_DB_ALIAS)
+
+    def setting(self, name):
+        return getattr(settings, f'{self.prefix}_{name}')
+
+    def job(self, func):
+        """Регистрирует функцию как задачу и добавляет ей метод delay."""
+        name = f'{func.__module__}.{func.__name__}'
+        self.registry[name] = func
+        func.delay = partial(self.enqueue, name)
+        return func
+
+    def enqueue(self, name, **payload):
+        """Откладывает задачу; возвращает запись или None в режиме eager."""
+        if self.setting('EAGER'):
+            self.registry[name](**payload)
+            return None
+        queued = self.jobs.create(name=name, payload=payload)
+        transaction.on_commit(partial(self.submit, queued.pk))
+        return queued
+
+    def submit(self, pk, delay=0):
+        """Выполняет задачу в пуле, при необходимости через delay секунд."""
+        if delay:
+            timer = threading.Timer(delay, self.submit, (pk,))
+            timer.daemon = True
+            timer.start()
+            return
+        with self.lock:
+            if self.executor is None:
+                self.executor = ThreadPoolExecutor(
+                    max_workers=self.setting('MAX_WORKERS'),
+                    thread_name_prefix=self.prefix.lower().replace('_', '-')
+                )
+        self.executor.submit(self.run_in_thread, pk)
+
+    def run_in_thread(self, pk):
+        close_old_connections()
+        try:
+            self.run(pk, on_retry=partial(self.submit, pk))
+        except Exception:
+            logger.exception('Задача %s не выполнена.', pk)
+        finally:
+            close_old_connections()
+
+    def due(self, now):
+        """
+        Условие на задачи, которые можно забрать на выполнение.
+
+        Задачу, которую взяли и не завершили за <префикс>_TIMEOUT секунд,
+        например из-за остановки процесса, можно забрать снова.
+        """
+        stale = now - timedelta(seconds=self.setting('TIMEOUT'))
+        return (
+            Q(state=self.model.PENDING, run_after__lte=now)
+            | Q(state=self.model.RUNNING, started__lt=stale)
+        )
+
+    def claim(self, pk):
+        """Забирает задачу на выполнение; False — её уже взяли."""
+        now = timezone.now()
+        return self.jobs.filter(self.due(now), pk=pk).update(
+            state=self.model.RUNNING, started=now,
+            attempts=F('attempts') + 1
+        ) == 1
+
+    def run(self, pk, on_retry=None):
+        """
+        Выполняет задачу, если её ещё никто не взял.
+
+        Выполненная задача удаляется из таблицы, упавшая — планируется
+        на повтор, и on_retry получает задержку до него в секундах; если
+        попытки кончились, задача остаётся в таблице с ошибкой.
+        Возвращает True, если задача выполнена.
+        """
+        if not self.claim(pk):
+            return False
+        queued = self.jobs.get(pk=pk)
+        try:
+            self.registry[queued.name](**queued.payload)
+        except Exception:
+            delay = self.fail(queued, traceback.format_exc())
+            if delay is not None and on_retry is not None:
+                on_retry(delay)
+            return False
+        self.jobs.filter(pk=pk).delete()
+        self.metrics.record(
+            'processed', (timezone.now() - queued.created).total_seconds()
+        )
+        return True
+
+    def fail(self, queued, error):
+        """Планирует повтор задачи; возвращает задержку или None."""
+        logger.warning('Задача %s (%s) упала.', queued.pk, queued.name)
+        if queued.attempts >= self.setting('MAX_ATTEMPTS'):
+            self.jobs.filter(pk=queued.pk).update(
+                state=self.model.FAILED, last_error=error
+            )
+            self.metrics.record('failed')
+            return None
+        delay = self.setting('RETRY_DELAY') * 2 ** (queued.attempts - 1)
+        self.jobs.filter(pk=queued.pk).update(
+            state=self.model.PENDING,
+            run_after=timezone.now() + timedelta(seconds=delay),
+            last_error=error,
+        )
+        self.metrics.record('retried')
+        return delay
+
+    def drain(self, limit=None):
+        """
+        Выполняет в текущем потоке задачи, которые можно забрать.
+
+        Это задачи, которым подошло время, и зависшие задачи процессов,
+        остановленных посреди выполнения. Возвращает число выполненных
+        задач.
+        """
+        done = 0
+        while limit is None or done < limit:
+            due = self.jobs.filter(
+                self.due(timezone.now())
+            ).order_by('run_after').values_list('pk', flat=True).first()
+            if due is None:
+                break
+            done += self.run(due)
+        return done
+
+    def get_metrics(self):
+        """Глубина очереди, число упавших задач и счётчики этого процесса."""
+        return {
+            'depth': self.jobs.filter(
+                state=self.model.PENDING
+            ).count(),
+            'failed_jobs': self.jobs.filter(
+                state=self.model.FAILED
+            ).count(),
+            **self.metrics.get(),
+        }
+
+
+class DrainJobsCommand(BaseCommand):
+    """Команда drain_jobs; подкласс в проекте задаёт runner."""
+    runner = None
+    help = (
+        'Выполняет отложенные задачи, которым подошло время, и выводит '
+        'метрики очереди.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--limit', type=int,
+            help='Наибольшее число задач. По умолчанию — все.'
+        )
+        parser.add_argument(
+            '--metrics', action='store_true',
+            help='Только вывести метрики, не выполняя задачи.'
+        )
+
+    def handle(self, *args, **options):
+        if not options['metrics']:
+            done = self.runner.drain(options['limit'])
+            self.stdout.write(
+                self.style.SUCCESS(f'Выполнено задач: {done}')
+            )
+        for name, value in self.runner.get_metrics().items():
+            self.stdout.write(f'{name}: {value}')
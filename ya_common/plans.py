@@ -0,0 +1,27 @@
+"""Проверка планов запросов SQLite."""
+from django.db import connection
+
+
+def slow_plan_steps(queries):
+    """
+    Шаги планов запросов, которые не используют индексы.
+
+    Полный просмотр таблицы и сортировка во временном B-дереве означают,
+    что для запроса не нашлось подходящего индекса. Просмотр
+    виртуальной таблицы (FTS5) идёт по её собственному индексу и
+    медленным не считается.
+    """
+    steps = []
+    with connection.cursor() as cursor:
+        for query in queries:
+            if not query['sql'].startswith('SELECT'):
+                continue
+            cursor.execute('EXPLAIN QUERY PLAN ' + query['sql'])
+            for *_, detail in cursor.fetchall():
+                full_scan = (
+                    detail.startswith('SCAN') and 'USING' not in detail
+                    and 'VIRTUAL TABLE' not in detail
+                )
+                if full_scan or 'TEMP B-TREE' in detail:
+                    steps.append(f'{detail}: {query["sql"]}')
+    return steps
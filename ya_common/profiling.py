@@ -0,0 +1,267 @@
+"""
+Профилирование запросов в работающем проекте.
+
+ProfilingMiddleware измеряет случайную долю запросов, заданную
+PROFILING_SAMPLE_RATE: время ответа, процессорное время потока, число
+и время SQL-запросов и время рендеринга шаблонов. Измерения копятся
+по имени адреса (news:detail, users:login, …) в окне из последних
+PROFILING_WINDOW запросов, а число и сумма измерений — за всё время
+работы процесса. Перцентили по окну отдаёт персоналу stats_view — в
+JSON или, с ?format=prometheus, в текстовом формате Prometheus с
+префиксом имён метрик PROFILING_METRIC_PREFIX.
+
+SQL-запросы считает обёртка execute_wrapper на каждом соединении, время
+шаблонов — обёртка над Template._render, которая учитывает только
+внешний шаблон, без вложенных include. Обе обёртки находят измерение
+текущего запроса через contextvars, поэтому работают и в потоках, куда
+асинхронное представление передаёт контекст. Процессорное время
+асинхронного представления не измеряется: оно выполняется не в том
+потоке, где работает middleware.
+"""
+import asyncio
+import random
+import threading
+import time
+from collections import defaultdict, deque
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.db import connections
+from django.db.backends.signals import connection_created
+from django.http import Http404, HttpResponse, JsonResponse
+from django.template.base import Template
+
+QUANTILES = (0.5, 0.9, 0.99)
+# Метрики: название в ответе, описание для Prometheus.
+METRICS = {
+    'seconds': 'Время ответа, с',
+    'cpu_seconds': 'Процессорное время потока запроса, с',
+    'sql_queries': 'Число SQL-запросов',
+    'sql_seconds': 'Время SQL-запросов, с',
+    'template_seconds': 'Время рендеринга шаблонов, с',
+}
+UNRESOLVED = '<unresolved>'
+
+current = ContextVar('profile', default=None)
+
+
+class Profile:
+    """Измерения одного запроса."""
+
+    __slots__ = ('sql_queries', 'sql_seconds', 'template_seconds', 'rendering')
+
+    def __init__(self):
+        self.sql_queries = 0
+        self.sql_seconds = 0.0
+        self.template_seconds = 0.0
+        self.rendering = False
+
+
+def sql_timer(execute, sql, params, many, context):
+    profile = current.get()
+    if profile is None:
+        return execute(sql, params, many, context)
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        profile.sql_queries += 1
+        profile.sql_seconds += time.perf_counter() - started
+
+
+def install_sql_timer(connection, **kwargs):
+    if sql_timer not in connection.execute_wrappers:
+        connection.execute_wrappers.append(sql_timer)
+
+
+def install_template_timer():
+    """Оборачивает Template._render; повторная установка ничего не делает."""
+    render = Template._render
+    if getattr(render, 'profiled', False):
+        return
+
+    def timed_render(self, context):
+        profile = current.get()
+        if profile is None or profile.rendering:
+            return render(self, context)
+        profile.rendering = True
+        started = time.perf_counter()
+        try:
+            return render(self, context)
+        finally:
+            profile.rendering = False
+            profile.template_seconds += time.perf_counter() - started
+
+    timed_render.profiled = True
+    Template._render = timed_render
+
+
+class Stats:
+    """Окна последних измерений по именам адресов."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.windows = defaultdict(self.make_window)
+        self.counts = defaultdict(int)
+        # Число и сумма измерений каждой метрики за всё время.
+        self.totals = defaultdict(
+            lambda: {metric: [0, 0] for metric in METRICS}
+        )
+
+    @staticmethod
+    def make_window():
+        return {
+            metric: deque(maxlen=settings.PROFILING_WINDOW)
+            for metric in METRICS
+        }
+
+    def record(self, name, values):
+        with self.lock:
+            window = self.windows[name]
+            totals = self.totals[name]
+            for metric, value in values.items():
+                if value is not None:
+                    window[metric].append(value)
+                    totals[metric][0] += 1
+                    totals[metric][1] += value
+            self.counts[name] += 1
+
+    def summary(self):
+        """
+        Число измерений и перцентили каждой метрики по адресам.
+
+        В totals — число и сумма измерений каждой метрики за всё время:
+        процессорное время асинхронных запросов не измеряется, так что
+        его число может быть меньше count.
+        """
+        with self.lock:
+            windows = {
+                name: {metric: sorted(values) for metric, values in
+                       window.items()}
+                for name, window in self.windows.items()
+            }
+            counts = dict(self.counts)
+            totals = {
+                name: {
+                    metric: {'count': count, 'sum': total}
+                    for metric, (count, total) in view_totals.items()
+                    if count
+                }
+                for name, view_totals in self.totals.items()
+            }
+        return {
+            name: {
+                'count': counts[name],
+                'totals': totals[name],
+                **{
+                    metric: {
+                        str(quantile): values[int(len(values) * quantile)]
+                        for quantile in QUANTILES
+                    }
+                    for metric, values in window.items() if values
+                },
+            }
+            for name, window in windows.items()
+        }
+
+    def clear(self):
+        with self.lock:
+            self.windows.clear()
+            self.counts.clear()
+            self.totals.clear()
+
+
+stats = Stats()
+
+
+class ProfilingMiddleware:
+    """Измеряет долю запросов PROFILING_SAMPLE_RATE."""
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if asyncio.iscoroutinefunction(get_response):
+            self._is_coroutine = asyncio.coroutines._is_coroutine
+        install_template_timer()
+        connection_created.connect(install_sql_timer)
+
+    def __call__(self, request):
+        if asyncio.iscoroutinefunction(self.get_response):
+            return self.__acall__(request)
+        if random.random() >= settings.PROFILING_SAMPLE_RATE:
+            return self.get_response(request)
+        profile, token = self.start()
+        started, cpu_started = time.perf_counter(), time.thread_time()
+        try:
+            response = self.get_response(request)
+        finally:
+            current.reset(token)
+        self.finish(
+            request, profile, started, time.thread_time() - cpu_started
+        )
+        return response
+
+    async def __acall__(self, request):
+        if random.random() >= settings.PROFILING_SAMPLE_RATE:
+            return await self.get_response(request)
+        profile, token = self.start()
+        started = time.perf_counter()
+        try:
+            response = await self.get_response(request)
+        finally:
+            current.reset(token)
+        self.finish(request, profile, started, None)
+        return response
+
+    def start(self):
+        for connection in connections.all():
+            install_sql_timer(connection)
+        profile = Profile()
+        return profile, current.set(profile)
+
+    def finish(self, request, profile, started, cpu_seconds):
+        match = request.resolver_match
+        stats.record(match.view_name if match else UNRESOLVED, {
+            'seconds': time.perf_counter() - started,
+            'cpu_seconds': cpu_seconds,
+            'sql_queries': profile.sql_queries,
+            'sql_seconds': profile.sql_seconds,
+            'template_seconds': profile.template_seconds,
+        })
+
+
+def format_prometheus(summary):
+    """Сводка в текстовом формате Prometheus: summary на каждую метрику."""
+    lines = []
+    for metric, description in METRICS.items():
+        name = f'{settings.PROFILING_METRIC_PREFIX}_request_{metric}'
+        lines += [f'# HELP {name} {description}', f'# TYPE {name} summary']
+        for view_name, view_stats in summary.items():
+            if metric not in view_stats:
+                continue
+            for quantile, value in view_stats[metric].items():
+                lines.append(
+                    f'{name}{{view="{view_name}",quantile="{quantile}"}} '
+                    f'{value}'
+                )
+            totals = view_stats['totals'][metric]
+            lines += [
+                f'{name}_sum{{view="{view_name}"}} {totals["sum"]}',
+                f'{name}_count{{view="{view_name}"}} {totals["count"]}',
+            ]
+    return '\n'.join(lines) + '\n'
+
+
+def stats_view(request):
+    """Перцентили измерений для персонала; остальным — 404."""
+    if not request.user.is_staff:
+        raise Http404
+    summary = stats.summary()
+    if request.GET.get('format') == 'prometheus':
+        return HttpResponse(
+            format_prometheus(summary),
+            content_type='text/plain; version=0.0.4; charset=utf-8'
+        )
+    return JsonResponse(summary, json_dumps_params={'ensure_ascii': False})
@@ -0,0 +1,124 @@
+"""
+Нагрузка на главную страницу и страницу новости под ASGI.
+
+Сравнивает синхронные представления и асинхронные (NEWS_ASYNC_VIEWS):
+запросы подаются прямо в ASGI-приложение Django из нескольких
+конкурентных задач, так что результат не зависит от выбора сервера.
+Каждый режим запускается в отдельном процессе.
+
+    python -m benchmarks.asgi [--requests 2000] [--concurrency 50]
+"""
+import argparse
+import asyncio
+import json
+import statistics
+import subprocess
+import sys
+import time
+
+from ya_common.drivers import Route, asgi_request, percentile
+
+NEWS_COUNT = 50
+COMMENTS_COUNT = 200
+
+
+async def load(application, route, requests, concurrency):
+    latencies = []
+    errors = 0
+    counter = iter(range(requests))
+
+    async def worker():
+        nonlocal errors
+        for number in counter:
+            started = time.perf_counter()
+            status = await asgi_request(
+                application, route, route.paths[number % len(route.paths)]
+            )
+            latencies.append(time.perf_counter() - started)
+            errors += status != 200
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return latencies, errors, time.perf_counter() - started
+
+
+def seed():
+    from django.contrib.auth import get_user_model
+
+    from news.models import Comment, News
+
+    author = get_user_model().objects.create(username='author')
+    news = [
+        News.objects.create(title=f'Новость {i}', text='Текст новости')
+        for i in range(NEWS_COUNT)
+    ]
+    Comment.objects.bulk_create(
+        Comment(news=news[i % 5], author=author, text=f'Комментарий {i}')
+        for i in range(COMMENTS_COUNT)
+    )
+    News.objects.recount_comments()
+    return Route('asgi', ['/'] + [f'/news/{item.pk}/' for item in news[:5]])
+
+
+def run_mode(mode, requests, concurrency, workers):
+    from . import setup
+
+    setup(
+        temporary_database=True,
+        NEWS_ASYNC_VIEWS=mode == 'async',
+        NEWS_ASYNC_MAX_WORKERS=workers,
+        CACHES={'default': {
+            'BACKEND': 'django.core.cache.backends.dummy.DummyCache'
+        }},
+    )
+    from django.core.asgi import get_asgi_application
+
+    route = seed()
+    application = get_asgi_application()
+    asyncio.run(load(application, route, concurrency, concurrency))
+    latencies, errors, elapsed = asyncio.run(
+        load(application, route, requests, concurrency)
+    )
+    print(json.dumps({
+        'mode': mode,
+        'rps': requests / elapsed,
+        'p50': statistics.median(latencies) * 1000,
+        'p99': percentile(latencies, 0.99) * 1000,
+        'errors': errors,
+    }))
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--mode', choices=('sync', 'async'))
+    parser.add_argument('--requests', type=int, default=2000)
+    parser.add_argument('--concurrency', type=int, default=50)
+    parser.add_argument(
+        '--workers', type=int, default=4,
+        help='Размер пула потоков асинхронного режима.'
+    )
+    args = parser.parse_args()
+    if args.mode:
+        run_mode(args.mode, args.requests, args.concurrency, args.workers)
+        return
+
+    print(f'Запросов: {args.requests}, конкурентность: {args.concurrency}')
+    print(f'{"режим":>6} {"запр/с":>8} {"p50, мс":>9} {"p99, мс":>9} '
+          f'{"ошибок":>7}')
+    for mode in ('sync', 'async'):
+        output = subprocess.run(
+            [
+                sys.executable, '-m', 'benchmarks.asgi', '--mode', mode,
+                '--requests', str(args.requests),
+                '--concurrency', str(args.concurrency),
+                '--workers', str(args.workers),
+            ],
+            check=True, capture_output=True, text=True
+        ).stdout
+        result = json.loads(output.splitlines()[-1])
+        print(f'{mode:>6} {result["rps"]:>8.0f} {result["p50"]:>9.1f} '
+              f'{result["p99"]:>9.1f} {result["errors"]:>7}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,56 @@
+"""
+Сравнение проверки запрещённых слов циклом и скомпилированным словарём.
+
+    python -m benchmarks.bad_words
+"""
+import random
+import time
+
+from . import setup, throughput
+
+setup()
+
+from news.bad_words import BadWordsMatcher  # noqa: E402
+
+ALPHABET = 'абвгдеёжзийклмнопрстуфхцчшщъыьэюя'
+DICTIONARY_SIZES = (10, 1_000, 50_000)
+TEXT_LENGTH = 500
+
+
+def random_word(rng, min_length=4, max_length=12):
+    length = rng.randint(min_length, max_length)
+    return ''.join(rng.choice(ALPHABET) for _ in range(length))
+
+
+def loop_find(words, text):
+    """Прежняя реализация: отдельный поиск подстроки для каждого слова."""
+    lowered_text = text.lower()
+    for word in words:
+        if word in lowered_text:
+            return word
+    return None
+
+
+def main():
+    rng = random.Random(0)
+    text = ' '.join(
+        random_word(rng, 2, 8) for _ in range(TEXT_LENGTH // 6)
+    )[:TEXT_LENGTH]
+    print(f'Текст: {len(text)} символов, без запрещённых слов')
+    print(f'{"слов":>8} {"сборка, с":>10} {"цикл, опер/с":>15} '
+          f'{"словарь, опер/с":>17} {"ускорение":>10}')
+    for size in DICTIONARY_SIZES:
+        words = [random_word(rng) for _ in range(size)]
+        words = [word for word in words if word not in text]
+        started = time.perf_counter()
+        matcher = BadWordsMatcher(words)
+        build_time = time.perf_counter() - started
+        assert matcher.find(text) is None
+        loop = throughput(lambda: loop_find(words, text))
+        compiled = throughput(lambda: matcher.find(text))
+        print(f'{size:>8} {build_time:>10.3f} {loop:>15.0f} '
+              f'{compiled:>17.0f} {compiled / loop:>9.1f}x')
+
+
+if __name__ == '__main__':
+    main()
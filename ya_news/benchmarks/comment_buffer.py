@@ -0,0 +1,121 @@
+"""
+Публикация комментариев к одной новости множеством писателей: запись
+напрямую и через очередь комментариев (NEWS_COMMENT_BUFFER).
+
+Каждый режим запускается в отдельном процессе на своей временной базе
+с профилем production. После прогона очередь сохраняется, и число
+комментариев в базе сверяется с числом успешных ответов.
+
+    python -m benchmarks.comment_buffer [--seconds 5] [--writers 200]
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import threading
+import time
+
+MODES = ('direct', 'buffered')
+
+
+def worker(client, url, barrier, seconds, results):
+    from django.db import connection
+
+    barrier.wait()
+    deadline = time.perf_counter() + seconds
+    done = errors = 0
+    while time.perf_counter() < deadline:
+        try:
+            status = client.post(url, {'text': 'Комментарий'}).status_code
+        except Exception:
+            status = None
+        done += 1
+        errors += status != 302
+    connection.close()
+    results.append((done, errors))
+
+
+def run_mode(mode, seconds, writers):
+    from . import setup
+
+    setup(temporary_database=True, NEWS_COMMENT_BUFFER=mode == 'buffered')
+    from django.contrib.auth import get_user_model
+    from django.db import connection
+    from django.test import Client
+    from django.urls import reverse
+
+    from news.buffer import comment_buffer
+    from news.models import Comment, News
+
+    User = get_user_model()
+    news = News.objects.create(title='Новость', text='Текст новости')
+    url = reverse('news:detail', args=(news.pk,))
+    clients = []
+    for i in range(writers):
+        client = Client(raise_request_exception=False)
+        client.force_login(User.objects.create(username=f'writer{i}'))
+        clients.append(client)
+    connection.close()
+
+    results = []
+    barrier = threading.Barrier(writers + 1)
+    threads = [
+        threading.Thread(
+            target=worker, args=(client, url, barrier, seconds, results)
+        )
+        for client in clients
+    ]
+    for thread in threads:
+        thread.start()
+    barrier.wait()
+    started = time.perf_counter()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+    comment_buffer.flush()
+
+    done = sum(done for done, _ in results)
+    errors = sum(errors for _, errors in results)
+    news.refresh_from_db()
+    print(json.dumps({
+        'mode': mode,
+        'posts': (done - errors) / elapsed,
+        'errors': errors,
+        'saved': Comment.objects.count(),
+        'expected': done - errors,
+        'comments_count': news.comments_count,
+    }))
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--mode', choices=MODES)
+    parser.add_argument('--seconds', type=float, default=5)
+    parser.add_argument('--writers', type=int, default=200)
+    args = parser.parse_args()
+    if args.mode:
+        run_mode(args.mode, args.seconds, args.writers)
+        return
+
+    print(f'Писателей: {args.writers}, {args.seconds:g} с на режим')
+    print(f'{"режим":>9} {"комментариев/с":>15} {"ошибок":>7} '
+          f'{"в базе":>7} {"ожидалось":>10}')
+    for mode in MODES:
+        output = subprocess.run(
+            [
+                sys.executable, '-m', 'benchmarks.comment_buffer',
+                '--mode', mode,
+                '--seconds', str(args.seconds),
+                '--writers', str(args.writers),
+            ],
+            check=True, capture_output=True, text=True,
+            env={**os.environ, 'YANEWS_DATABASE_PROFILE': 'production'},
+        ).stdout
+        result = json.loads(output.splitlines()[-1])
+        print(f'{mode:>9} {result["posts"]:>15.0f} {result["errors"]:>7} '
+              f'{result["saved"]:>7} {result["expected"]:>10}')
+
+
+if __name__ == '__main__':
+    main()
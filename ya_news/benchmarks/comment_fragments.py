@@ -0,0 +1,114 @@
+"""
+Время рендеринга длинной ветки комментариев.
+
+Сравнивает рендеринг каждого комментария в общем цикле шаблона с
+кэшированными фрагментами комментариев: при пустом кэше (первый
+просмотр) и при заполненном (все следующие).
+
+    python -m benchmarks.comment_fragments [--comments 10000]
+"""
+import argparse
+import statistics
+import time
+
+from . import setup
+
+AUTHORS_COUNT = 50
+REPEAT = 5
+
+# Шаблон ветки до появления фрагментов: всё рендерится в одном цикле.
+INLINE_TEMPLATE = """
+{% for comment in comments %}
+  <div>
+    <b>{{ comment.author }}</b>, {{ comment.created }}</b>
+    <p class="mb-0">{{ comment.text|linebreaksbr }}</p>
+    {% if comment.author == user %}
+      <a href="{% url 'news:edit' comment.pk %}">Редактировать</a> |
+      <a href="{% url 'news:delete' comment.pk %}">Удалить</a>
+    {% endif %}
+  </div>
+  <br>
+{% endfor %}
+"""
+
+
+def seed(comments_count):
+    from django.contrib.auth import get_user_model
+
+    from news.models import Comment, News
+
+    User = get_user_model()
+    User.objects.bulk_create(
+        User(username=f'author{i}') for i in range(AUTHORS_COUNT)
+    )
+    authors = list(User.objects.all())
+    news = News.objects.create(title='Новость', text='Текст новости')
+    Comment.objects.bulk_create(
+        (
+            Comment(
+                news=news, author=authors[i % AUTHORS_COUNT],
+                text=f'Комментарий {i}\nвторая строка',
+            )
+            for i in range(comments_count)
+        ),
+        batch_size=1000,
+    )
+    return news, authors[0]
+
+
+def measure(render):
+    timings = []
+    for _ in range(REPEAT):
+        started = time.perf_counter()
+        render()
+        timings.append(time.perf_counter() - started)
+    return statistics.median(timings) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--comments', type=int, default=10_000)
+    args = parser.parse_args()
+
+    setup(temporary_database=True)
+    from django.template import engines
+    from django.template.loader import render_to_string
+    from django.test import RequestFactory
+
+    from news.cache import get_cache, render_comment_fragments
+    from news.pagination import get_comments_page
+
+    news, viewer = seed(args.comments)
+    request = RequestFactory().get('/')
+    request.user = viewer
+    comments, _ = get_comments_page(news.pk, per_page=args.comments)
+    inline_template = engines['django'].from_string(INLINE_TEMPLATE)
+
+    def render_inline():
+        inline_template.render(
+            {'comments': comments, 'user': viewer}, request
+        )
+
+    def render_fragments():
+        render_to_string('news/includes/comments.html', {
+            'comments': render_comment_fragments(comments, request),
+            'news_id': news.pk,
+            'user': viewer,
+        }, request)
+
+    def render_cold():
+        get_cache().clear()
+        render_fragments()
+
+    print(f'Комментариев в ветке: {args.comments}')
+    print(f'{"рендеринг":>24} {"мс":>8}')
+    for title, render in (
+        ('в общем цикле', render_inline),
+        ('фрагменты, пустой кэш', render_cold),
+        ('фрагменты, полный кэш', render_fragments),
+    ):
+        print(f'{title:>24} {measure(render):>8.0f}')
+
+
+if __name__ == '__main__':
+    main()
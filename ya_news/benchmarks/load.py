@@ -0,0 +1,121 @@
+"""
+Нагрузка на все маршруты news.urls на реалистичном объёме данных.
+
+База заполняется долей --scale от полного объёма: 10 тыс.
+пользователей, 100 тыс. новостей и 10 млн комментариев, которые
+достаются в основном свежим новостям. С --database заполненная база
+сохраняется в файле и используется повторно. Маршруты нагружаются
+драйверами client, wsgi и asgi (ya_common/drivers.py), каждый в
+отдельном процессе; для маршрута выводятся запросы в секунду,
+перцентили задержки, память на запрос и ошибки, для процесса — пик
+памяти.
+
+Страницы редактирования и удаления комментария запрашиваются методом
+GET, чтобы прогон не менял базу: запись измеряют бенчмарки
+comment_buffer и sqlite_profile.
+
+С --save-baseline результаты сохраняются в JSON, с --baseline —
+сравниваются с сохранёнными, и при регрессии больше --tolerance
+команда завершается с ошибкой.
+
+    python -m benchmarks.load [--scale 0.01] [--database load.sqlite3]
+        [--drivers client wsgi asgi] [--seconds 1] [--concurrency 4]
+        [--baseline load.json] [--save-baseline load.json]
+"""
+from datetime import date, timedelta
+
+from ya_common.bench import LoadBenchmark
+from ya_common.drivers import Route, get_session_cookies
+
+FULL_VOLUME = {
+    'users': 10_000,
+    'news': 100_000,
+    'comments': 10_000_000,
+}
+BATCH_SIZE = 10_000
+# Сколько разных новостей и комментариев перебирает маршрут.
+PATHS_COUNT = 20
+
+
+class NewsLoad(LoadBenchmark):
+    """Нагрузка на маршруты YaNews."""
+    project = 'yanews'
+    full_volume = FULL_VOLUME
+
+    def has_data(self):
+        from news.models import News
+
+        return News.objects.exists()
+
+    def seed(self, volume, rng):
+        """Заполняет базу; чем новее новость, тем больше у неё комментариев."""
+        from django.contrib.auth import get_user_model
+
+        from news.models import Comment, News
+
+        User = get_user_model()
+        User.objects.bulk_create(
+            (User(username=f'user{i}') for i in range(volume['users'])),
+            batch_size=BATCH_SIZE,
+        )
+        today = date.today()
+        News.objects.bulk_create(
+            (
+                News(
+                    title=f'Новость {i}', text=f'Текст новости {i}',
+                    date=today - timedelta(days=i // 10),
+                )
+                for i in range(volume['news'])
+            ),
+            batch_size=BATCH_SIZE,
+        )
+        user_ids = list(User.objects.values_list('pk', flat=True))
+        news_ids = list(News.objects.values_list('pk', flat=True))
+        for start in range(0, volume['comments'], BATCH_SIZE):
+            stop = min(start + BATCH_SIZE, volume['comments'])
+            Comment.objects.bulk_create(
+                Comment(
+                    news_id=news_ids[int(len(news_ids) * rng.random() ** 4)],
+                    author_id=user_ids[i % len(user_ids)],
+                    text=f'Комментарий {i}',
+                )
+                for i in range(start, stop)
+            )
+        News.objects.recount_comments()
+
+    def get_routes(self):
+        from django.contrib.auth import get_user_model
+        from django.urls import reverse
+
+        from news.models import Comment, News
+
+        author = get_user_model().objects.order_by('pk').first()
+        cookies = get_session_cookies(author)
+        news_ids = News.objects.values_list('pk', flat=True)[:PATHS_COUNT]
+        comment_ids = Comment.objects.filter(
+            author=author
+        ).values_list('pk', flat=True)[:PATHS_COUNT]
+
+        def paths(name, ids):
+            return [reverse(name, args=(pk,)) for pk in ids]
+
+        return [
+            Route('news:home', [reverse('news:home')]),
+            Route('news:feed_rss', [reverse('news:feed_rss')]),
+            Route('news:feed_atom', [reverse('news:feed_atom')]),
+            Route('news:feed_json', [reverse('news:feed_json')]),
+            Route('news:feed_comments', [reverse('news:feed_comments')]),
+            Route('news:detail', paths('news:detail', news_ids)),
+            Route('news:comments', paths('news:comments', news_ids)),
+            Route(
+                'news:edit', paths('news:edit', comment_ids), cookies=cookies
+            ),
+            Route(
+                'news:delete', paths('news:delete', comment_ids),
+                cookies=cookies
+            ),
+        ]
+
+
+if __name__ == '__main__':
+    NewsLoad().main()
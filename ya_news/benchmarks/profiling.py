@@ -0,0 +1,78 @@
+"""
+Накладные расходы ProfilingMiddleware на странице новости.
+
+Сравнивает число просмотров в секунду без middleware и с ним при
+разных долях профилируемых запросов. Режимы чередуются по кругам, и
+для каждого берётся лучший круг, чтобы шум машины меньше влиял на
+разницу в пару процентов.
+
+    python -m benchmarks.profiling [--rates 0.01 1] [--rounds 5]
+"""
+import argparse
+
+from . import setup, throughput
+
+MIDDLEWARE = 'ya_common.profiling.ProfilingMiddleware'
+COMMENTS_COUNT = 20
+
+
+def make_client(profiled, reader, url):
+    from django.conf import settings
+    from django.test import Client
+
+    settings.MIDDLEWARE = [
+        name for name in settings.MIDDLEWARE if name != MIDDLEWARE
+    ]
+    if profiled:
+        settings.MIDDLEWARE.insert(0, MIDDLEWARE)
+    # Клиент собирает цепочку middleware при первом запросе.
+    client = Client()
+    client.force_login(reader)
+    client.get(url)
+    return client
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--rates', type=float, nargs='+', default=[0.01, 1])
+    parser.add_argument('--rounds', type=int, default=5)
+    args = parser.parse_args()
+
+    setup(temporary_database=True)
+    from django.conf import settings
+    from django.contrib.auth import get_user_model
+    from django.urls import reverse
+
+    from news.models import Comment, News
+
+    User = get_user_model()
+    reader = User.objects.create(username='reader')
+    news = News.objects.create(title='Новость', text='Текст новости')
+    Comment.objects.bulk_create(
+        Comment(news=news, author=reader, text=f'Комментарий {i}')
+        for i in range(COMMENTS_COUNT)
+    )
+    url = reverse('news:detail', args=(news.pk,))
+
+    modes = {'без middleware': (make_client(False, reader, url), 0)}
+    profiled = make_client(True, reader, url)
+    for rate in args.rates:
+        modes[f'доля {rate:g}'] = (profiled, rate)
+
+    best = dict.fromkeys(modes, 0)
+    for _ in range(args.rounds):
+        for mode, (client, rate) in modes.items():
+            settings.PROFILING_SAMPLE_RATE = rate
+            best[mode] = max(
+                best[mode], throughput(lambda: client.get(url))
+            )
+
+    baseline = best['без middleware']
+    print(f'{"режим":>15} {"просмотров/с":>13} {"накладные":>10}')
+    for mode, views in best.items():
+        overhead = (baseline - views) / baseline * 100
+        print(f'{mode:>15} {views:>13.0f} {overhead:>9.1f}%')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,144 @@
+"""
+Конкурентные чтение и запись при разных профилях базы данных.
+
+Несколько потоков публикуют комментарии, остальные читают главную
+страницу; каждый профиль (YANEWS_DATABASE_PROFILE) запускается в
+отдельном процессе на своей временной базе. Кеш страниц отключён,
+чтобы каждое чтение доходило до базы.
+
+    python -m benchmarks.sqlite_profile [--seconds 5] [--readers 8]
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import threading
+import time
+
+PROFILES = ('default', 'production')
+NEWS_COUNT = 20
+
+
+def seed(writers):
+    from django.contrib.auth import get_user_model
+
+    from news.models import News
+
+    News.objects.bulk_create(
+        News(title=f'Новость {i}', text='Текст новости')
+        for i in range(NEWS_COUNT)
+    )
+    User = get_user_model()
+    return (
+        list(News.objects.values_list('pk', flat=True)),
+        [User.objects.create(username=f'writer{i}') for i in range(writers)],
+    )
+
+
+def worker(make_request, deadline, results, name):
+    from django.db import connection
+
+    done = errors = 0
+    while time.perf_counter() < deadline:
+        try:
+            status = make_request(done)
+        except Exception:
+            status = None
+        done += 1
+        errors += status not in (200, 302)
+    connection.close()
+    results.append((name, done, errors))
+
+
+def run_profile(profile, seconds, readers, writers):
+    from . import setup
+
+    setup(
+        temporary_database=True,
+        CACHES={'default': {
+            'BACKEND': 'django.core.cache.backends.dummy.DummyCache'
+        }},
+    )
+    from django.db import connection
+    from django.test import Client
+    from django.urls import reverse
+
+    news_ids, users = seed(writers)
+    connection.close()
+
+    def reader(number):
+        return Client().get(reverse('news:home')).status_code
+
+    def make_writer(user):
+        client = Client()
+        client.force_login(user)
+
+        def write(number):
+            url = reverse('news:detail', args=(
+                news_ids[number % len(news_ids)],
+            ))
+            return client.post(url, {'text': 'Комментарий'}).status_code
+
+        return write
+
+    threads = []
+    results = []
+    deadline = time.perf_counter() + seconds
+    targets = (
+        [(make_writer(user), 'writes') for user in users]
+        + [(reader, 'reads')] * readers
+    )
+    for make_request, name in targets:
+        threads.append(threading.Thread(
+            target=worker,
+            args=(make_request, deadline, results, name),
+        ))
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    totals = {'profile': profile, 'reads': 0, 'writes': 0, 'errors': 0}
+    for name, done, errors in results:
+        totals[name] += done - errors
+        totals['errors'] += errors
+    for name in ('reads', 'writes'):
+        totals[name] /= seconds
+    print(json.dumps(totals))
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--profile', choices=PROFILES)
+    parser.add_argument('--seconds', type=float, default=5)
+    parser.add_argument('--readers', type=int, default=8)
+    parser.add_argument('--writers', type=int, default=4)
+    args = parser.parse_args()
+    if args.profile:
+        run_profile(args.profile, args.seconds, args.readers, args.writers)
+        return
+
+    print(f'Читателей: {args.readers}, писателей: {args.writers}, '
+          f'{args.seconds:g} с на профиль')
+    print(f'{"профиль":>10} {"чтений/с":>9} {"записей/с":>10} '
+          f'{"ошибок":>7}')
+    for profile in PROFILES:
+        output = subprocess.run(
+            [
+                sys.executable, '-m', 'benchmarks.sqlite_profile',
+                '--profile', profile,
+                '--seconds', str(args.seconds),
+                '--readers', str(args.readers),
+                '--writers', str(args.writers),
+            ],
+            check=True, capture_output=True, text=True,
+            env={**os.environ, 'YANEWS_DATABASE_PROFILE': profile},
+        ).stdout
+        result = json.loads(output.splitlines()[-1])
+        print(f'{profile:>10} {result["reads"]:>9.0f} '
+              f'{result["writes"]:>10.0f} {result["errors"]:>7}')
+
+
+if __name__ == '__main__':
+    main()
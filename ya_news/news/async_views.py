@@ -0,0 +1,66 @@
+"""
+Асинхронные версии страниц новостей для работы под ASGI.
+
+В Django 3.2 нет асинхронного ORM, поэтому синхронное представление
+целиком — запросы к базе и рендеринг шаблона — выполняется в отдельном
+пуле потоков ограниченного размера NEWS_ASYNC_MAX_WORKERS. Под ASGI это
+один переход между потоками на запрос вместо общего для всех синхронных
+представлений потока и отдельного перехода для рендеринга ответа.
+"""
+import asyncio
+import contextvars
+import functools
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.db import close_old_connections
+
+from .views import NewsDetailView, NewsList
+
+# Пул создаётся при первом запросе, а не при импорте: так его размер
+# берётся из настроек, действующих на момент работы.
+executor = None
+executor_lock = threading.Lock()
+
+
+def get_executor():
+    global executor
+    with executor_lock:
+        if executor is None:
+            executor = ThreadPoolExecutor(
+                max_workers=settings.NEWS_ASYNC_MAX_WORKERS,
+                thread_name_prefix='news-async'
+            )
+    return executor
+
+
+def run_view(view, request, *args, **kwargs):
+    """Выполняет представление и рендерит ответ в потоке пула."""
+    close_old_connections()
+    try:
+        response = view(request, *args, **kwargs)
+        if hasattr(response, 'render') and callable(response.render):
+            response = response.render()
+        return response
+    finally:
+        close_old_connections()
+
+
+def as_async_view(view):
+    """Асинхронная обёртка над синхронным представлением."""
+
+    async def async_view(request, *args, **kwargs):
+        call = functools.partial(
+            contextvars.copy_context().run,
+            run_view, view, request, *args, **kwargs
+        )
+        return await asyncio.get_running_loop().run_in_executor(
+            get_executor(), call
+        )
+
+    return async_view
+
+
+news_list = as_async_view(NewsList.as_view())
+news_detail = as_async_view(NewsDetailView.as_view())
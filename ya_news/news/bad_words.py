@@ -0,0 +1,156 @@
+"""
+Поиск запрещённых слов в тексте комментария.
+
+Словарь компилируется в одно регулярное выражение по префиксному дереву
+слов: движок re проходит текст за один раз, не перебирая слова по одному.
+Словарь берётся из файла NEWS_BAD_WORDS_FILE (по слову на строке),
+списка NEWS_BAD_WORDS в настройках или из BAD_WORDS по умолчанию.
+При изменении файла или настроек словарь перестраивается без перезапуска;
+время изменения файла проверяется не чаще раза в
+NEWS_BAD_WORDS_CHECK_INTERVAL секунд. Если файла нет, используется
+словарь из настроек или по умолчанию.
+"""
+import logging
+import os
+import re
+import threading
+import time
+
+from django.conf import settings
+from django.core.signals import setting_changed
+from django.dispatch import receiver
+
+BAD_WORDS = (
+    'редиска',
+    'негодяй',
+    # Дополните список на своё усмотрение.
+)
+END = ''
+
+logger = logging.getLogger(__name__)
+
+
+def _build_trie(words):
+    trie = {}
+    for word in words:
+        node = trie
+        for char in word:
+            node = node.setdefault(char, {})
+        node[END] = {}
+    return trie
+
+
+def _trie_to_regex(node):
+    branches = [
+        re.escape(char) + _trie_to_regex(child)
+        for char, child in sorted(node.items())
+        if char != END
+    ]
+    if not branches:
+        return ''
+    if len(branches) == 1:
+        pattern = branches[0]
+    else:
+        pattern = '(?:' + '|'.join(branches) + ')'
+    if END in node:
+        return f'(?:{pattern})?'
+    return pattern
+
+
+class BadWordsMatcher:
+    """Скомпилированный словарь запрещённых слов."""
+
+    def __init__(self, words):
+        self.words = frozenset(
+            word.strip().lower() for word in words if word.strip()
+        )
+        self.pattern = None
+        if self.words:
+            self.pattern = re.compile(
+                _trie_to_regex(_build_trie(self.words))
+            )
+
+    def find(self, text):
+        """Возвращает первое найденное в тексте запрещённое слово или None."""
+        if self.pattern is None:
+            return None
+        match = self.pattern.search(text.lower())
+        return match.group() if match else None
+
+
+def read_words(path):
+    """Читает словарь из файла: по слову на строке, # — комментарий."""
+    with open(path, encoding='utf-8') as file:
+        return [
+            line for line in (line.strip() for line in file)
+            if line and not line.startswith('#')
+        ]
+
+
+class _MatcherHolder:
+    """Хранит текущий словарь и перестраивает его при изменении источника."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._matcher = None
+        self._source = None
+        self._next_check = 0
+
+    def _get_source(self):
+        """Путь к файлу словаря и время его изменения; None — файла нет."""
+        path = getattr(settings, 'NEWS_BAD_WORDS_FILE', None)
+        if not path:
+            return None, None
+        try:
+            return path, os.stat(path).st_mtime_ns
+        except OSError:
+            return path, None
+
+    def _load_words(self, path):
+        if path:
+            try:
+                return read_words(path)
+            except OSError:
+                logger.warning(
+                    'Файл словаря %s недоступен, используется словарь '
+                    'из настроек.', path
+                )
+        return getattr(settings, 'NEWS_BAD_WORDS', BAD_WORDS)
+
+    def get(self):
+        matcher = self._matcher
+        now = time.monotonic()
+        if matcher is not None and now < self._next_check:
+            return matcher
+        source = self._get_source()
+        with self._lock:
+            self._next_check = now + settings.NEWS_BAD_WORDS_CHECK_INTERVAL
+            if self._matcher is None or source != self._source:
+                self._matcher = BadWordsMatcher(self._load_words(source[0]))
+                self._source = source
+            return self._matcher
+
+    def reload(self):
+        with self._lock:
+            self._matcher = None
+
+
+_holder = _MatcherHolder()
+
+
+def get_matcher():
+    return _holder.get()
+
+
+def reload_bad_words():
+    """Перечитывает словарь при следующей проверке текста."""
+    _holder.reload()
+
+
+@receiver(setting_changed)
+def bad_words_setting_changed(setting, **kwargs):
+    if setting in (
+        'NEWS_BAD_WORDS', 'NEWS_BAD_WORDS_FILE',
+        'NEWS_BAD_WORDS_CHECK_INTERVAL',
+    ):
+        reload_bad_words()
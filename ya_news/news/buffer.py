@@ -0,0 +1,162 @@
+"""
+Буферизованная запись комментариев.
+
+Комментарии к популярной новости вставляются в одну таблицу и один
+индекс, и каждая вставка ждёт своей очереди на блокировку записи
+SQLite. С включённым NEWS_COMMENT_BUFFER новые комментарии попадают в
+очередь в памяти процесса, а фоновый поток сохраняет их пачками: как
+только набралось NEWS_COMMENT_BUFFER_BATCH_SIZE комментариев или прошло
+NEWS_COMMENT_BUFFER_DELAY секунд. Если задержка None, фоновый поток не
+запускается и очередь сохраняет вызов flush(). В очереди не больше
+NEWS_COMMENT_BUFFER_MAX_SIZE комментариев: когда она полна, append
+отказывает, и комментарий сохраняется сразу.
+
+Пока комментарий ждёт в очереди, его автор видит его в конце ветки.
+Очередь своя у каждого процесса, поэтому при нескольких процессах
+автор увидит комментарий сразу, только если попадёт в тот же процесс.
+Очередь сохраняется при штатном завершении процесса (atexit); при
+аварийном завершении или SIGKILL комментарии из неё теряются.
+"""
+import atexit
+import logging
+import threading
+from collections import Counter
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.db.models import F
+from django.utils import timezone
+
+from .cache import invalidate_detail, invalidate_home
+from .models import Comment, News
+
+logger = logging.getLogger(__name__)
+
+
+class CommentBuffer:
+    """Очередь комментариев, которую фоновый поток сохраняет пачками."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.ready = threading.Condition(self.lock)
+        # Не даёт фоновому потоку и явному вызову flush сохранить одну
+        # пачку дважды.
+        self.flushing = threading.Lock()
+        self.pending = []
+        self.thread = None
+
+    def append(self, comment):
+        """
+        Ставит комментарий в очередь на сохранение.
+
+        Время создания проставляется сразу и сохраняется в базе как
+        есть, так что комментарий не меняет места в ветке. Возвращает
+        False, если очередь полна и комментарий нужно сохранить сразу.
+        """
+        with self.ready:
+            if len(self.pending) >= settings.NEWS_COMMENT_BUFFER_MAX_SIZE:
+                return False
+            comment.created = comment.updated = timezone.now()
+            self.pending.append(comment)
+            if len(self.pending) >= settings.NEWS_COMMENT_BUFFER_BATCH_SIZE:
+                self.ready.notify()
+            if (
+                self.thread is None
+                and settings.NEWS_COMMENT_BUFFER_DELAY is not None
+            ):
+                self.thread = threading.Thread(
+                    target=self.run, name='comment-buffer', daemon=True
+                )
+                self.thread.start()
+                atexit.register(self.flush)
+        return True
+
+    def get_pending(self, news_id, author_id):
+        """Ещё не сохранённые комментарии автора к новости."""
+        with self.lock:
+            return [
+                comment for comment in self.pending
+                if (comment.news_id, comment.author_id) == (news_id, author_id)
+            ]
+
+    def run(self):
+        while True:
+            with self.ready:
+                self.ready.wait_for(lambda: self.pending)
+                self.ready.wait_for(
+                    lambda: len(self.pending)
+                    >= settings.NEWS_COMMENT_BUFFER_BATCH_SIZE,
+                    timeout=settings.NEWS_COMMENT_BUFFER_DELAY,
+                )
+            try:
+                self.flush()
+            except Exception:
+                logger.exception('Не удалось сохранить комментарии.')
+
+    def flush(self):
+        """
+        Сохраняет все комментарии из очереди.
+
+        Возвращает число сохранённых комментариев.
+        """
+        saved = 0
+        with self.flushing:
+            while True:
+                with self.lock:
+                    batch = self.pending[
+                        :settings.NEWS_COMMENT_BUFFER_BATCH_SIZE
+                    ]
+                if not batch:
+                    return saved
+                saved += self.save(batch)
+
+    def save(self, batch):
+        """
+        Сохраняет пачку и обновляет счётчики и кэш её новостей.
+
+        Фиксация транзакции и удаление пачки из очереди идут под
+        блокировкой очереди: читатель видит комментарий либо в очереди,
+        либо в базе, но не дважды. На время записи пачки append и
+        get_pending ждут.
+
+        Если пачку целиком вставить не удалось, например новость успели
+        удалить, комментарии сохраняются по одному, а не подходящие
+        отбрасываются.
+        """
+        with self.lock:
+            try:
+                saved = self.insert(batch)
+            except IntegrityError:
+                saved = self.insert_one_by_one(batch)
+            del self.pending[:len(batch)]
+        for news_id in {comment.news_id for comment in saved}:
+            invalidate_detail(news_id)
+        invalidate_home()
+        return len(saved)
+
+    @transaction.atomic
+    def insert(self, batch):
+        """Вставляет комментарии и увеличивает счётчики их новостей."""
+        Comment.objects.insert_with_dates(batch)
+        now = timezone.now()
+        counts = Counter(comment.news_id for comment in batch)
+        for news_id, count in counts.items():
+            News.objects.filter(pk=news_id).update(
+                comments_count=F('comments_count') + count,
+                updated=now,
+            )
+        return batch
+
+    def insert_one_by_one(self, batch):
+        saved = []
+        for comment in batch:
+            try:
+                saved += self.insert([comment])
+            except IntegrityError:
+                logger.warning(
+                    'Комментарий к новости %s отброшен.', comment.news_id
+                )
+        return saved
+
+
+comment_buffer = CommentBuffer()
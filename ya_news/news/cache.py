@@ -0,0 +1,251 @@
+"""
+Кэширование страниц новостей.
+
+Ключи страниц содержат номер версии: версия главной страницы общая,
+версия страницы новости — своя для каждой новости. При изменении данных
+версия увеличивается, и старые записи просто перестают запрашиваться.
+"""
+import time
+from urllib.parse import quote
+
+from django.conf import settings
+from django.core.cache import caches
+from django.http import HttpResponse
+from django.template.loader import get_template
+from django.utils import timezone, translation
+from django.utils.safestring import mark_safe
+
+from .routers import primary_reads
+
+HOME_VERSION_KEY = 'news:home:version'
+DETAIL_VERSION_KEY = 'news:detail:{pk}:version'
+LAST_MODIFIED_KEY = 'news:detail:{pk}:{version}:last_modified'
+FEEDS_LAST_MODIFIED_KEY = 'news:feeds:{version}:last_modified'
+COMMENT_FRAGMENT_KEY = (
+    'news:comment:{pk}:{updated}:{author}:{language}:{timezone}'
+)
+COMMENT_TEMPLATE = 'news/includes/comment.html'
+STATS_KEY = 'news:cache:{name}'
+STATS_NAMES = ('hits', 'misses')
+
+
+def get_cache():
+    return caches[settings.NEWS_CACHE_ALIAS]
+
+
+def get_version(key):
+    """
+    Текущая версия по ключу.
+
+    Начальная версия — текущее время в наносекундах: если ключ версии
+    вытеснят из кэша или он истечёт, новая версия не совпадёт ни с одной
+    из прежних. Ключ живёт NEWS_CACHE_VERSION_TIMEOUT секунд: версия
+    создаётся и для адресов несуществующих новостей, и бессрочные ключи
+    копились бы в кэше без ограничений.
+    """
+    cache = get_cache()
+    version = cache.get(key)
+    if version is None:
+        version = time.time_ns()
+        if not cache.add(
+            key, version, timeout=settings.NEWS_CACHE_VERSION_TIMEOUT
+        ):
+            version = cache.get(key, version)
+    return version
+
+
+def bump_version(key):
+    cache = get_cache()
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.add(
+            key, time.time_ns(), timeout=settings.NEWS_CACHE_VERSION_TIMEOUT
+        )
+
+
+def get_home_version():
+    return get_version(HOME_VERSION_KEY)
+
+
+def get_detail_version(pk):
+    return get_version(DETAIL_VERSION_KEY.format(pk=pk))
+
+
+def invalidate_home():
+    bump_version(HOME_VERSION_KEY)
+
+
+def invalidate_detail(pk):
+    bump_version(DETAIL_VERSION_KEY.format(pk=pk))
+
+
+def get_detail_last_modified(pk, compute):
+    """
+    Время изменения страницы новости.
+
+    Значение запоминается до смены версии страницы, так что повторные
+    проверки обходятся без запросов к базе. compute(pk) вычисляет его
+    по базе; None — новости нет.
+    """
+    key = LAST_MODIFIED_KEY.format(pk=pk, version=get_detail_version(pk))
+    return get_or_compute(key, lambda: compute(pk))
+
+
+def get_feeds_last_modified(version, compute):
+    """
+    Время изменения лент для версии главной страницы version.
+
+    Версия меняется с каждым изменением новостей и комментариев, так
+    что значение запоминается до неё. compute() вычисляет его по базе;
+    None — новостей нет.
+    """
+    return get_or_compute(
+        FEEDS_LAST_MODIFIED_KEY.format(version=version), compute
+    )
+
+
+def get_or_compute(key, compute):
+    """
+    Значение из кэша или compute(); None не запоминается.
+
+    compute() читает из основной базы: значение запоминается под уже
+    новой версией, а реплика может ещё не знать об изменении.
+    """
+    cache = get_cache()
+    value = cache.get(key)
+    if value is None:
+        with primary_reads():
+            value = compute()
+        if value is not None:
+            cache.set(key, value, settings.NEWS_CACHE_TIMEOUT)
+    return value
+
+
+def get_comment_fragment_key(comment):
+    """
+    Ключ HTML-фрагмента комментария.
+
+    Время изменения входит в ключ: отредактированный комментарий
+    получает новый фрагмент, даже если старый не удалён из кэша. Так же
+    в ключ входит всё, что выводится во фрагменте помимо комментария:
+    имя автора, язык и часовой пояс, в которых выведена дата.
+    """
+    return COMMENT_FRAGMENT_KEY.format(
+        pk=comment.pk,
+        updated=comment.updated.timestamp(),
+        author=quote(comment.author.get_username()),
+        language=translation.get_language(),
+        timezone=timezone.get_current_timezone_name(),
+    )
+
+
+def render_comment_fragments(comments, request=None):
+    """
+    Проставляет комментариям готовый HTML в атрибут fragment.
+
+    Фрагменты берутся из кэша одним запросом, недостающие рендерятся
+    с контекстом запроса request и сохраняются тоже одним запросом. Во
+    фрагменте нет ничего, что зависит от зрителя, кроме языка и
+    часового пояса, входящих в ключ: ссылки на редактирование и
+    удаление шаблон добавляет поверх него. Ещё не сохранённые
+    комментарии рендерятся без кэша.
+    """
+    keys = {
+        get_comment_fragment_key(comment): comment
+        for comment in comments if comment.pk
+    }
+    unsaved = [comment for comment in comments if not comment.pk]
+    cache = get_cache()
+    fragments = cache.get_many(keys)
+    missing = keys.keys() - fragments.keys()
+    if missing or unsaved:
+        template = get_template(COMMENT_TEMPLATE)
+    if missing:
+        rendered = {
+            key: template.render({'comment': keys[key]}, request)
+            for key in missing
+        }
+        cache.set_many(
+            rendered, timeout=settings.NEWS_COMMENT_FRAGMENT_TIMEOUT
+        )
+        fragments.update(rendered)
+    for key, comment in keys.items():
+        comment.fragment = mark_safe(fragments[key])
+    for comment in unsaved:
+        comment.fragment = mark_safe(
+            template.render({'comment': comment}, request)
+        )
+    return comments
+
+
+def invalidate_comment_fragment(comment):
+    get_cache().delete(get_comment_fragment_key(comment))
+
+
+def count(name):
+    """Увеличивает счётчик попаданий или промахов кэша."""
+    cache = get_cache()
+    key = STATS_KEY.format(name=name)
+    try:
+        cache.incr(key)
+    except ValueError:
+        if not cache.add(key, 1, timeout=None):
+            cache.incr(key)
+
+
+def get_stats():
+    """Счётчики попаданий и промахов кэша страниц."""
+    values = get_cache().get_many(
+        [STATS_KEY.format(name=name) for name in STATS_NAMES]
+    )
+    return {
+        name: values.get(STATS_KEY.format(name=name), 0)
+        for name in STATS_NAMES
+    }
+
+
+def reset_stats():
+    get_cache().delete_many(
+        [STATS_KEY.format(name=name) for name in STATS_NAMES]
+    )
+
+
+class CachedPageMixin:
+    """
+    Кэширует страницу целиком для анонимных пользователей.
+
+    Авторизованным пользователям страница всегда рендерится заново:
+    в ней есть форма с CSRF-токеном и ссылки на их комментарии.
+    Страница для кэша читается и рендерится по основной базе: версия
+    в ключе меняется сразу после записи, и страница из отстающей реплики
+    осталась бы в кэше под новой версией на NEWS_CACHE_TIMEOUT.
+    """
+
+    def get_page_cache_key(self):
+        """
+        Ключ страницы в кэше.
+
+        В ключ входят только параметры, от которых зависит страница:
+        иначе произвольные параметры запроса засоряли бы кэш.
+        """
+        raise NotImplementedError
+
+    def get(self, request, *args, **kwargs):
+        if request.user.is_authenticated:
+            return super().get(request, *args, **kwargs)
+        cache = get_cache()
+        key = self.get_page_cache_key()
+        content = cache.get(key)
+        if content is not None:
+            count('hits')
+            response = HttpResponse(content)
+            response['X-Cache'] = 'HIT'
+            return response
+        count('misses')
+        with primary_reads():
+            response = super().get(request, *args, **kwargs)
+            response.render()
+        response['X-Cache'] = 'MISS'
+        cache.set(key, response.content, settings.NEWS_CACHE_TIMEOUT)
+        return response
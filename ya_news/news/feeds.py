@@ -0,0 +1,220 @@
+"""
+Ленты новостей и комментариев для агрегаторов.
+
+Агрегаторы опрашивают ленты часто, а меняются они редко. Поэтому
+каждая лента отвечает на условные запросы: Last-Modified вычисляется
+одним запросом к базе по самой свежей дате новости, времени изменения
+новостей и самому свежему комментарию и запоминается в кэше до смены
+версии главной страницы. В ETag входит и сама версия: она меняется с
+каждым изменением и удалением новостей и комментариев. При совпадении
+клиент получает 304 без выборки записей и рендеринга.
+"""
+import json
+from datetime import datetime, time
+
+from django.conf import settings
+from django.core.handlers.asgi import ASGIRequest
+from django.contrib.syndication.views import Feed
+from django.db.models import Subquery
+from django.http import StreamingHttpResponse
+from django.urls import reverse, reverse_lazy
+from django.utils import timezone
+from django.utils.decorators import method_decorator
+from django.utils.feedgenerator import Atom1Feed
+from django.views import generic
+from django.views.decorators.http import condition
+
+from .cache import get_feeds_last_modified, get_home_version
+from .models import Comment, News
+
+TITLE = 'YaNews'
+DESCRIPTION = 'Свежие новости и комментарии к ним.'
+JSON_FEED_VERSION = 'https://jsonfeed.org/version/1.1'
+
+
+def query_feeds_last_modified():
+    """
+    Время изменения лент по базе; None — новостей нет.
+
+    Свежая дата новости, время изменения новостей и время свежего
+    комментария выбираются одним запросом. Время изменения новости
+    обновляется и при правке или удалении её комментариев.
+    """
+    latest_comment = Comment.objects.order_by('-created').values(
+        'created'
+    )[:1]
+    latest_update = News.objects.order_by('-updated').values('updated')[:1]
+    latest = News.objects.order_by('-date').values('date').annotate(
+        comment=Subquery(latest_comment), updated=Subquery(latest_update)
+    ).first()
+    if latest is None:
+        return None
+    return max(filter(None, (
+        get_published(latest['date']), latest['updated'], latest['comment']
+    )))
+
+
+def get_validators(request):
+    """
+    Версия главной страницы и время последнего изменения лент.
+
+    Результат запоминается в запросе, чтобы ETag и Last-Modified не
+    обращались к кэшу дважды.
+    """
+    if not hasattr(request, 'feeds_validators'):
+        version = get_home_version()
+        request.feeds_validators = version, get_feeds_last_modified(
+            version, query_feeds_last_modified
+        )
+    return request.feeds_validators
+
+
+def get_last_modified(request, *args, **kwargs):
+    """Время последнего изменения лент."""
+    return get_validators(request)[1]
+
+
+def get_etag(request, *args, **kwargs):
+    """
+    Значение ETag для лент.
+
+    В отличие от Last-Modified с точностью до секунды, ETag различает
+    изменения в одну секунду, а с версией главной страницы — и
+    удаления, после которых время изменения не растёт.
+    """
+    version, last_modified = get_validators(request)
+    if last_modified is None:
+        return None
+    return f'"{version}-{last_modified.timestamp():.6f}"'
+
+
+conditional = condition(
+    etag_func=get_etag, last_modified_func=get_last_modified
+)
+
+
+def get_news_items():
+    return News.objects.all()[:settings.NEWS_FEED_SIZE]
+
+
+def get_published(date):
+    """Время публикации новости: у новости есть только дата."""
+    return timezone.make_aware(datetime.combine(date, time.min))
+
+
+class ConditionalFeed(Feed):
+    """Лента с общими для всех лент ETag и Last-Modified."""
+
+    @method_decorator(conditional)
+    def __call__(self, request, *args, **kwargs):
+        response = super().__call__(request, *args, **kwargs)
+        # Feed выставляет Last-Modified по своим записям, а лента
+        # меняется и с новым комментарием.
+        del response['Last-Modified']
+        return response
+
+
+class LatestNewsFeed(ConditionalFeed):
+    """Свежие новости в формате RSS."""
+    title = TITLE
+    description = DESCRIPTION
+    link = reverse_lazy('news:home')
+
+    def items(self):
+        return get_news_items()
+
+    def item_title(self, item):
+        return item.title
+
+    def item_description(self, item):
+        return item.text
+
+    def item_link(self, item):
+        return reverse('news:detail', args=(item.pk,))
+
+    def item_pubdate(self, item):
+        return get_published(item.date)
+
+
+class LatestNewsAtomFeed(LatestNewsFeed):
+    """Свежие новости в формате Atom."""
+    feed_type = Atom1Feed
+    subtitle = DESCRIPTION
+
+
+class LatestCommentsFeed(ConditionalFeed):
+    """Свежие комментарии ко всем новостям в формате RSS."""
+    title = f'{TITLE}: комментарии'
+    description = DESCRIPTION
+    link = reverse_lazy('news:home')
+
+    def items(self):
+        return Comment.objects.select_related('author', 'news').order_by(
+            '-created'
+        )[:settings.NEWS_FEED_SIZE]
+
+    def item_title(self, item):
+        return f'{item.author} о «{item.news.title}»'
+
+    def item_description(self, item):
+        return item.text
+
+    def item_link(self, item):
+        return reverse('news:detail', args=(item.news_id,)) + '#comments'
+
+    def item_guid(self, item):
+        return f'comment-{item.pk}'
+
+    item_guid_is_permalink = False
+
+    def item_author_name(self, item):
+        return str(item.author)
+
+    def item_pubdate(self, item):
+        return item.created
+
+
+@method_decorator(conditional, name='get')
+class NewsJsonFeed(generic.View):
+    """
+    Свежие новости в формате JSON Feed.
+
+    Ответ отдаётся потоком: записи выгружаются из базы и сериализуются
+    по одной.
+    """
+
+    def get(self, request, *args, **kwargs):
+        items = get_news_items()
+        if isinstance(request, ASGIRequest):
+            # Под ASGI Django перебирает поток в цикле событий, где
+            # запросы к базе запрещены, поэтому записи выгружаются заранее.
+            items = list(items)
+        else:
+            items = items.iterator()
+        return StreamingHttpResponse(
+            self.stream(request, items), content_type='application/feed+json'
+        )
+
+    def stream(self, request, items):
+        home_url = request.build_absolute_uri(reverse('news:home'))
+        header = json.dumps({
+            'version': JSON_FEED_VERSION,
+            'title': TITLE,
+            'description': DESCRIPTION,
+            'home_page_url': home_url,
+            'feed_url': request.build_absolute_uri(),
+        }, ensure_ascii=False)
+        yield header[:-1] + ', "items": ['
+        for number, news in enumerate(items):
+            url = request.build_absolute_uri(
+                reverse('news:detail', args=(news.pk,))
+            )
+            item = json.dumps({
+                'id': url,
+                'url': url,
+                'title': news.title,
+                'content_text': news.text,
+                'date_published': get_published(news.date).isoformat(),
+            }, ensure_ascii=False)
+            yield item if number == 0 else ', ' + item
+        yield ']}'
@@ -1,13 +1,9 @@
 from django.forms import ModelForm
 from django.core.exceptions import ValidationError
 
+from .bad_words import BAD_WORDS, get_matcher  # noqa: F401
 from .models import Comment
 
-BAD_WORDS = (
-    'редиска',
-    'негодяй',
-    # Дополните список на своё усмотрение.
-)
 WARNING = 'Не ругайтесь!'
 
 
@@ -20,8 +16,9 @@ class CommentForm(ModelForm):
     def clean_text(self):
         """Не позволяем ругаться в комментариях."""
         text = self.cleaned_data['text']
-        lowered_text = text.lower()
-        for word in BAD_WORDS:
-            if word in lowered_text:
-                raise ValidationError(WARNING)
+        word = get_matcher().find(text)
+        if word is not None:
+            raise ValidationError(
+                WARNING, code='bad_word', params={'word': word}
+            )
         return text
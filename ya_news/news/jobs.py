@@ -0,0 +1,31 @@
+"""
+Фоновые задачи YaNews.
+
+Задачи выполняет общий ya_common.jobs.JobRunner с настройками NEWS_JOBS_*.
+"""
+from django.db import DEFAULT_DB_ALIAS
+
+from ya_common.jobs import JobRunner
+
+from .cache import render_comment_fragments
+from .models import Comment, Job
+
+runner = JobRunner(Job, 'NEWS_JOBS')
+job = runner.job
+get_metrics = runner.get_metrics
+
+
+@job
+def render_comment_fragment(comment_id):
+    """
+    Заранее кладёт в кэш HTML-фрагмент нового комментария.
+
+    Комментарий читается из основной базы: в реплике его может ещё
+    не быть.
+    """
+    comments = list(
+        Comment.objects.using(DEFAULT_DB_ALIAS).filter(
+            pk=comment_id
+        ).select_related('author')
+    )
+    render_comment_fragments(comments)
@@ -0,0 +1,48 @@
+"""Общие части команд потоковой выгрузки и загрузки JSON Lines."""
+import sys
+import time
+from contextlib import contextmanager
+
+NEWS_MODEL = 'news.news'
+COMMENT_MODEL = 'news.comment'
+PROGRESS_EVERY = 10_000
+
+
+class Progress:
+    """Периодически сообщает число обработанных записей и скорость."""
+
+    def __init__(self, stream, every=PROGRESS_EVERY):
+        self.stream = stream
+        self.every = every
+        self.count = 0
+        self.started = time.perf_counter()
+
+    @property
+    def rate(self):
+        elapsed = time.perf_counter() - self.started
+        return self.count / elapsed if elapsed else 0
+
+    def update(self, count=1):
+        before = self.count // self.every
+        self.count += count
+        if self.count // self.every != before:
+            self.stream.write(
+                f'Обработано записей: {self.count} ({self.rate:.0f} зап/с)'
+            )
+
+    def finish(self):
+        elapsed = time.perf_counter() - self.started
+        self.stream.write(
+            f'Готово: {self.count} записей за {elapsed:.1f} с '
+            f'({self.rate:.0f} зап/с)'
+        )
+
+
+@contextmanager
+def open_stream(path, mode):
+    """Открывает файл или стандартный поток, если путь — «-»."""
+    if path == '-':
+        yield sys.stdin if 'r' in mode else sys.stdout
+        return
+    with open(path, mode, encoding='utf-8') as stream:
+        yield stream
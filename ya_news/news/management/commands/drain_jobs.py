@@ -0,0 +1,7 @@
+from ya_common.jobs import DrainJobsCommand
+
+from news.jobs import runner
+
+
+class Command(DrainJobsCommand):
+    runner = runner
@@ -0,0 +1,60 @@
+import json
+
+from django.core.management.base import BaseCommand
+
+from news.models import Comment, News
+
+from ._jsonl import COMMENT_MODEL, NEWS_MODEL, Progress, open_stream
+
+
+class Command(BaseCommand):
+    help = (
+        'Потоково выгружает новости и комментарии в формате JSON Lines: '
+        'по одной записи на строку.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'path', nargs='?', default='-',
+            help='Файл для выгрузки. По умолчанию — стандартный вывод.'
+        )
+        parser.add_argument(
+            '--chunk-size', type=int, default=2000,
+            help='Сколько строк читать из базы за один раз.'
+        )
+
+    def handle(self, *args, **options):
+        chunk_size = options['chunk_size']
+        progress = Progress(self.stderr)
+        news = News.objects.order_by('pk').values_list(
+            'pk', 'title', 'text', 'date'
+        )
+        comments = Comment.objects.order_by('pk').values_list(
+            'pk', 'news_id', 'author__username', 'text', 'created'
+        )
+        with open_stream(options['path'], 'w') as stream:
+            for pk, title, text, date in news.iterator(chunk_size):
+                self.write(stream, NEWS_MODEL, pk, {
+                    'title': title,
+                    'text': text,
+                    'date': date.isoformat(),
+                })
+                progress.update()
+            for pk, news_id, author, text, created in comments.iterator(
+                    chunk_size
+            ):
+                self.write(stream, COMMENT_MODEL, pk, {
+                    'news': news_id,
+                    'author': author,
+                    'text': text,
+                    'created': created.isoformat(),
+                })
+                progress.update()
+        progress.finish()
+
+    def write(self, stream, model, pk, fields):
+        stream.write(json.dumps(
+            {'model': model, 'pk': pk, 'fields': fields},
+            ensure_ascii=False
+        ))
+        stream.write('\n')
@@ -0,0 +1,141 @@
+import json
+from collections import Counter
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+
+from news.cache import invalidate_detail, invalidate_home
+from news.models import Comment, News
+
+from ._jsonl import COMMENT_MODEL, NEWS_MODEL, Progress, open_stream
+
+User = get_user_model()
+AUTHORS_CACHE_SIZE = 100_000
+
+
+class Command(BaseCommand):
+    help = (
+        'Потоково загружает новости и комментарии из JSON Lines '
+        'пакетами. Авторы комментариев ищутся по username, '
+        'отсутствующие пользователи создаются.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'path', nargs='?', default='-',
+            help='Файл для загрузки. По умолчанию — стандартный ввод.'
+        )
+        parser.add_argument(
+            '--batch-size', type=int, default=2000,
+            help='Сколько записей сохранять одним запросом.'
+        )
+
+    def handle(self, *args, **options):
+        self.batch_size = options['batch_size']
+        self.progress = Progress(self.stderr)
+        self.news = []
+        self.comments = []
+        self.authors = {}
+        with open_stream(options['path'], 'r') as stream:
+            for line_number, line in enumerate(stream, start=1):
+                if line.strip():
+                    self.add(line_number, line)
+            self.flush_news()
+            self.flush_comments()
+        invalidate_home()
+        self.progress.finish()
+
+    def add(self, line_number, line):
+        try:
+            record = json.loads(line)
+            model, fields = record['model'], record['fields']
+        except (ValueError, KeyError, TypeError) as error:
+            raise CommandError(f'Строка {line_number}: {error}')
+        if model == NEWS_MODEL:
+            self.news.append(News(
+                pk=record.get('pk'),
+                title=fields['title'],
+                text=fields['text'],
+                date=parse_date(fields['date']),
+            ))
+            if len(self.news) >= self.batch_size:
+                self.flush_news()
+        elif model == COMMENT_MODEL:
+            self.flush_news()
+            created = parse_datetime(fields['created'])
+            self.comments.append((fields['author'], Comment(
+                pk=record.get('pk'),
+                news_id=fields['news'],
+                text=fields['text'],
+                created=created,
+                updated=created,
+            )))
+            if len(self.comments) >= self.batch_size:
+                self.flush_comments()
+        else:
+            raise CommandError(
+                f'Строка {line_number}: неизвестная модель {model}'
+            )
+
+    def flush_news(self):
+        if not self.news:
+            return
+        News.objects.bulk_create(self.news)
+        self.progress.update(len(self.news))
+        self.news = []
+
+    def flush_comments(self):
+        """
+        Сохраняет пакет комментариев и увеличивает счётчики их новостей.
+
+        Счётчики обновляются в той же транзакции, что и вставка, так что
+        памяти нужно не больше пакета при любом размере выгрузки.
+        """
+        if not self.comments:
+            return
+        self.resolve_authors({username for username, _ in self.comments})
+        for username, comment in self.comments:
+            comment.author_id = self.authors[username]
+        counts = Counter(comment.news_id for _, comment in self.comments)
+        with transaction.atomic():
+            Comment.objects.insert_with_dates(
+                [comment for _, comment in self.comments]
+            )
+            now = timezone.now()
+            for news_id, count in counts.items():
+                News.objects.filter(pk=news_id).update(
+                    comments_count=F('comments_count') + count,
+                    updated=now,
+                )
+        for news_id in counts:
+            invalidate_detail(news_id)
+        self.progress.update(len(self.comments))
+        self.comments = []
+
+    @transaction.atomic
+    def resolve_authors(self, usernames):
+        """Находит id авторов по username, создавая недостающих."""
+        missing = usernames - self.authors.keys()
+        if not missing:
+            return
+        if len(self.authors) + len(missing) > AUTHORS_CACHE_SIZE:
+            self.authors = {}
+            missing = usernames
+        found = dict(User.objects.filter(
+            username__in=missing
+        ).values_list('username', 'pk'))
+        new_users = [
+            User(username=username) for username in missing - found.keys()
+        ]
+        for user in new_users:
+            user.set_unusable_password()
+        User.objects.bulk_create(new_users)
+        if new_users:
+            found.update(User.objects.filter(
+                username__in=[user.username for user in new_users]
+            ).values_list('username', 'pk'))
+        self.authors.update(found)
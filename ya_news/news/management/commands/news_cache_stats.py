@@ -0,0 +1,23 @@
+from django.core.management.base import BaseCommand
+
+from news.cache import get_stats, reset_stats
+
+
+class Command(BaseCommand):
+    help = 'Показывает счётчики попаданий и промахов кэша страниц новостей.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--reset', action='store_true', help='Обнулить счётчики.'
+        )
+
+    def handle(self, *args, **options):
+        stats = get_stats()
+        total = stats['hits'] + stats['misses']
+        ratio = stats['hits'] / total if total else 0
+        self.stdout.write(
+            f'Попаданий: {stats["hits"]}, промахов: {stats["misses"]}, '
+            f'доля попаданий: {ratio:.1%}'
+        )
+        if options['reset']:
+            reset_stats()
@@ -0,0 +1,22 @@
+from django.core.management.base import BaseCommand
+
+from news.models import News
+
+
+class Command(BaseCommand):
+    help = 'Пересчитывает счётчики комментариев у новостей.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'news_ids', nargs='*', type=int,
+            help='Идентификаторы новостей. По умолчанию — все новости.'
+        )
+
+    def handle(self, *args, **options):
+        news = News.objects.all()
+        if options['news_ids']:
+            news = news.filter(pk__in=options['news_ids'])
+        updated = news.recount_comments()
+        self.stdout.write(
+            self.style.SUCCESS(f'Пересчитано новостей: {updated}')
+        )
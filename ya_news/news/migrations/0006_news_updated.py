@@ -0,0 +1,18 @@
+# Generated by Django 3.2.15 on 2026-10-18 18:52
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('news', '0005_comment_created_idx'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='news',
+            name='updated',
+            field=models.DateTimeField(auto_now=True),
+        ),
+    ]
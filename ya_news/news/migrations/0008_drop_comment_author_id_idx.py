@@ -0,0 +1,17 @@
+# Generated by Django 3.2.15 on 2026-10-18 19:44
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('news', '0007_job'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='comment',
+            name='comment_author_id_idx',
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 3.2.15 on 2026-10-18 19:58
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('news', '0008_drop_comment_author_id_idx'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='news',
+            index=models.Index(fields=['updated'], name='news_updated_idx'),
+        ),
+    ]
@@ -1,16 +1,43 @@
 from datetime import datetime
 
 from django.conf import settings
-from django.db import models
+from django.db import connections, models
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+from ya_common.jobs import AbstractJob
+
+
+class NewsQuerySet(models.QuerySet):
+
+    def recount_comments(self):
+        """Пересчитывает счётчик комментариев по данным таблицы Comment."""
+        counts = Comment.objects.filter(
+            news=OuterRef('pk')
+        ).order_by().values('news').annotate(
+            count=Count('pk')
+        ).values('count')
+        return self.update(
+            comments_count=Coalesce(Subquery(counts), 0)
+        )
 
 
 class News(models.Model):
     title = models.CharField(max_length=50)
     text = models.TextField()
     date = models.DateField(default=datetime.today)
+    comments_count = models.PositiveIntegerField(default=0, editable=False)
+    updated = models.DateTimeField(auto_now=True)
+
+    objects = NewsQuerySet.as_manager()
 
     class Meta:
         ordering = ('-date',)
+        indexes = (
+            models.Index(fields=('-date',), name='news_date_desc_idx'),
+            # Время изменения лент: самая свежая правка новостей.
+            models.Index(fields=('updated',), name='news_updated_idx'),
+        )
         verbose_name_plural = 'Новости'
         verbose_name = 'Новость'
 
@@ -18,6 +45,49 @@ class News(models.Model):
         return self.title
 
 
+class CommentQuerySet(models.QuerySet):
+
+    def insert_with_dates(self, comments):
+        """
+        Вставляет комментарии, сохраняя их время создания.
+
+        bulk_create вызывает pre_save полей, и auto_now_add подменил бы
+        created текущим временем, поэтому строки вставляются запросом
+        INSERT напрямую. Комментарии без id получают его от базы, но в
+        объекты он не проставляется. Сигналы, как и у bulk_create,
+        не отправляются.
+        """
+        connection = connections[self.db]
+        fields = self.model._meta.concrete_fields
+        groups = (
+            ([c for c in comments if c.pk is not None], fields),
+            (
+                [c for c in comments if c.pk is None],
+                [field for field in fields if not field.primary_key],
+            ),
+        )
+        quote = connection.ops.quote_name
+        with connection.cursor() as cursor:
+            for group, group_fields in groups:
+                if not group:
+                    continue
+                cursor.executemany(
+                    f'INSERT INTO {quote(self.model._meta.db_table)} ('
+                    + ', '.join(quote(field.column) for field in group_fields)
+                    + ') VALUES ('
+                    + ', '.join(['%s'] * len(group_fields)) + ')',
+                    [
+                        [
+                            field.get_db_prep_save(
+                                getattr(comment, field.attname), connection
+                            )
+                            for field in group_fields
+                        ]
+                        for comment in group
+                    ]
+                )
+
+
 class Comment(models.Model):
     news = models.ForeignKey(
         News,
@@ -29,9 +99,22 @@ class Comment(models.Model):
     )
     text = models.TextField()
     created = models.DateTimeField(auto_now_add=True)
+    updated = models.DateTimeField(auto_now=True)
+
+    objects = CommentQuerySet.as_manager()
 
     class Meta:
         ordering = ('created',)
+        indexes = (
+            models.Index(
+                fields=('news', 'created'), name='comment_news_created_idx'
+            ),
+            models.Index(fields=('created',), name='comment_created_idx'),
+        )
 
     def __str__(self):
         return self.text[:50]
+
+
+class Job(AbstractJob):
+    """Отложенная задача, см. ya_common/jobs.py."""
@@ -0,0 +1,92 @@
+"""
+Курсорная (keyset) пагинация комментариев.
+
+Страница комментариев определяется курсором — парой (created, id)
+первого комментария на странице. Выборка очередной страницы идёт
+по индексу и не зависит от того, насколько далеко она от начала ветки.
+"""
+from datetime import datetime, timedelta, timezone
+
+from django.conf import settings
+from django.db.models import Q
+from django.urls import reverse
+from django.utils.http import urlencode
+
+from .models import Comment
+
+EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+MICROSECOND = timedelta(microseconds=1)
+# Наибольший id, который помещается в целое SQLite.
+MAX_ID = 2 ** 63 - 1
+
+
+def encode_cursor(comment):
+    """
+    Курсор, указывающий на комментарий.
+
+    У ещё не сохранённого комментария id в курсоре 0: страница начнётся
+    с комментариев, созданных не раньше него.
+    """
+    return f'{(comment.created - EPOCH) // MICROSECOND}-{comment.pk or 0}'
+
+
+def decode_cursor(cursor):
+    """
+    Разбирает курсор в пару (created, id).
+
+    Некорректный курсор, в том числе со временем или id вне допустимых
+    границ, приводит к ValueError.
+    """
+    micros, pk = (int(part) for part in cursor.split('-'))
+    if not 0 <= pk <= MAX_ID:
+        raise ValueError(f'Id курсора вне границ: {pk}.')
+    try:
+        return EPOCH + micros * MICROSECOND, pk
+    except OverflowError:
+        raise ValueError(f'Время курсора вне границ: {micros}.')
+
+
+def get_comments_page(news_id, cursor=None, per_page=None):
+    """
+    Возвращает комментарии страницы и курсор следующей страницы.
+
+    Если следующей страницы нет, вместо курсора возвращается None.
+    """
+    per_page = per_page or settings.COMMENTS_COUNT_ON_PAGE
+    comments = Comment.objects.filter(
+        news_id=news_id
+    ).select_related('author').order_by('created', 'pk')
+    if cursor:
+        created, pk = decode_cursor(cursor)
+        comments = comments.filter(
+            Q(created__gt=created) | Q(created=created, pk__gte=pk)
+        )
+    comments = list(comments[:per_page + 1])
+    next_cursor = None
+    if len(comments) > per_page:
+        next_cursor = encode_cursor(comments.pop())
+    return comments, next_cursor
+
+
+def get_comment_url(comment, per_page=None):
+    """
+    Адрес страницы новости, на которой виден комментарий.
+
+    Для комментариев с первой страницы курсор в адрес не добавляется.
+    Ещё не сохранённый комментарий из очереди (news/buffer.py) будет
+    в конце ветки, но сколько комментариев окажется раньше него, станет
+    известно только при сохранении очереди: адрес ведёт на страницу,
+    которая начинается с него самого.
+    """
+    per_page = per_page or settings.COMMENTS_COUNT_ON_PAGE
+    url = reverse('news:detail', kwargs={'pk': comment.news_id})
+    on_first_page = False
+    if comment.pk:
+        earlier = Comment.objects.filter(news_id=comment.news_id).filter(
+            Q(created__lt=comment.created)
+            | Q(created=comment.created, pk__lt=comment.pk)
+        ).order_by('created', 'pk')
+        on_first_page = not earlier[per_page - 1:per_page].exists()
+    if not on_first_page:
+        url += '?' + urlencode({'cursor': encode_cursor(comment)})
+    return url + '#comments'
@@ -0,0 +1,59 @@
+"""
+Бюджеты запросов к базе данных и времени ответа для страниц проекта.
+
+Таблица BUDGETS — единственное место, где задаются бюджеты: по строке
+на адрес, метод и клиента. Клиенты — фикстуры pytest: анонимный client,
+author_client автора комментария и admin_client другого пользователя.
+Проверяет бюджеты плагин ya_common.budgets.
+"""
+from ya_common.budgets import Budget
+
+PAGE_MS = 250
+NEWS = 'news_id_for_args'
+COMMENT = 'comment_id_for_args'
+ANONYMOUS = 'client'
+AUTHOR = 'author_client'
+READER = 'admin_client'
+
+BUDGETS = (
+    Budget('news:home', None, ANONYMOUS, 'get', 1, PAGE_MS),
+    Budget('news:home', None, AUTHOR, 'get', 3, PAGE_MS),
+    Budget('news:home', None, READER, 'get', 3, PAGE_MS),
+    Budget('news:detail', NEWS, ANONYMOUS, 'get', 3, PAGE_MS),
+    Budget('news:detail', NEWS, AUTHOR, 'get', 5, PAGE_MS),
+    Budget('news:detail', NEWS, READER, 'get', 5, PAGE_MS),
+    Budget('news:detail', NEWS, AUTHOR, 'post', 7, PAGE_MS),
+    Budget('news:detail', NEWS, READER, 'post', 7, PAGE_MS),
+    Budget('news:comments', NEWS, ANONYMOUS, 'get', 1, PAGE_MS),
+    Budget('news:comments', NEWS, AUTHOR, 'get', 3, PAGE_MS),
+    Budget('news:comments', NEWS, READER, 'get', 3, PAGE_MS),
+    Budget('news:feed_rss', None, ANONYMOUS, 'get', 2, PAGE_MS),
+    Budget('news:feed_rss', None, AUTHOR, 'get', 2, PAGE_MS),
+    Budget('news:feed_rss', None, READER, 'get', 2, PAGE_MS),
+    Budget('news:feed_atom', None, ANONYMOUS, 'get', 2, PAGE_MS),
+    Budget('news:feed_atom', None, AUTHOR, 'get', 2, PAGE_MS),
+    Budget('news:feed_atom', None, READER, 'get', 2, PAGE_MS),
+    Budget('news:feed_json', None, ANONYMOUS, 'get', 2, PAGE_MS),
+    Budget('news:feed_json', None, AUTHOR, 'get', 2, PAGE_MS),
+    Budget('news:feed_json', None, READER, 'get', 2, PAGE_MS),
+    Budget('news:feed_comments', None, ANONYMOUS, 'get', 2, PAGE_MS),
+    Budget('news:feed_comments', None, AUTHOR, 'get', 2, PAGE_MS),
+    Budget('news:feed_comments', None, READER, 'get', 2, PAGE_MS),
+    Budget('news:edit', COMMENT, ANONYMOUS, 'get', 0, PAGE_MS),
+    Budget('news:edit', COMMENT, AUTHOR, 'get', 4, PAGE_MS),
+    Budget('news:edit', COMMENT, READER, 'get', 3, PAGE_MS),
+    Budget('news:edit', COMMENT, AUTHOR, 'post', 6, PAGE_MS),
+    Budget('news:delete', COMMENT, ANONYMOUS, 'get', 0, PAGE_MS),
+    Budget('news:delete', COMMENT, AUTHOR, 'get', 4, PAGE_MS),
+    Budget('news:delete', COMMENT, READER, 'get', 3, PAGE_MS),
+    Budget('news:delete', COMMENT, AUTHOR, 'post', 6, PAGE_MS),
+    Budget('users:login', None, ANONYMOUS, 'get', 0, PAGE_MS),
+    Budget('users:login', None, AUTHOR, 'get', 2, PAGE_MS),
+    Budget('users:login', None, READER, 'get', 2, PAGE_MS),
+    Budget('users:logout', None, ANONYMOUS, 'get', 0, PAGE_MS),
+    Budget('users:logout', None, AUTHOR, 'get', 4, PAGE_MS),
+    Budget('users:logout', None, READER, 'get', 4, PAGE_MS),
+    Budget('users:signup', None, ANONYMOUS, 'get', 0, PAGE_MS),
+    Budget('users:signup', None, AUTHOR, 'get', 2, PAGE_MS),
+    Budget('users:signup', None, READER, 'get', 2, PAGE_MS),
+)
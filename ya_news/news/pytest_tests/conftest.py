@@ -2,6 +2,7 @@ from datetime import datetime, timedelta
 
 import pytest
 from django.conf import settings
+from django.core.cache import cache
 from django.urls import reverse
 from django.utils import timezone
 
@@ -12,6 +13,22 @@ COMMENT_TEXT = 'Текст комментария'
 FORM_DATA = {'text': 'Обновлённый комментарий'}
 
 
+def pytest_configure(config):
+    """
+    Отложенные задачи в тестах выполняются сразу.
+
+    Бюджеты запросов и времени проверяет плагин ya_common.budgets.
+    """
+    settings.NEWS_JOBS_EAGER = True
+    config.pluginmanager.import_plugin('ya_common.budgets')
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    """Кэш страниц не должен переживать отдельный тест."""
+    cache.clear()
+
+
 @pytest.fixture
 def form_data():
     return FORM_DATA
@@ -61,6 +78,20 @@ def few_comment(news, author):
         comment.save()
 
 
+@pytest.fixture
+def comments_per_page(settings):
+    settings.COMMENTS_COUNT_ON_PAGE = 2
+    return settings.COMMENTS_COUNT_ON_PAGE
+
+
+@pytest.fixture
+def many_comments(news, author, comments_per_page):
+    return [
+        Comment.objects.create(news=news, author=author, text=f'Text {i}')
+        for i in range(comments_per_page * 2 + 1)
+    ]
+
+
 @pytest.fixture
 def news_id_for_args(news):
     return (news.id,)
@@ -76,6 +107,11 @@ def detail_url(news_id_for_args):
     return reverse('news:detail', args=news_id_for_args)
 
 
+@pytest.fixture
+def comments_url(news_id_for_args):
+    return reverse('news:comments', args=news_id_for_args)
+
+
 @pytest.fixture
 def edit_url(comment_id_for_args):
     return reverse('news:edit', args=comment_id_for_args)
@@ -0,0 +1,46 @@
+import pytest
+from django.urls import reverse
+
+from news.models import Comment
+from news.pytest_tests.budgets import BUDGETS
+from news.urls import urlpatterns
+from ya_common.budgets import budget_id
+from yanews.urls import auth_urls
+
+COMMENTS_COUNT = 10
+
+
+@pytest.fixture
+def thread(news, comment, admin_user):
+    """Ветка, в которой N+1 запрос сразу превысит бюджет."""
+    for i in range(COMMENTS_COUNT):
+        Comment.objects.create(news=news, author=admin_user, text=f'Text {i}')
+
+
+def test_budgets_cover_all_routes():
+    """Бюджеты заданы для каждого адреса и каждого клиента."""
+    names = {f'news:{pattern.name}' for pattern in urlpatterns} | {
+        f'users:{pattern.name}' for pattern in auth_urls[0]
+    }
+    clients = {budget.client for budget in BUDGETS}
+    covered = {
+        (budget.name, budget.client)
+        for budget in BUDGETS if budget.method == 'get'
+    }
+    assert covered == {
+        (name, client) for name in names for client in clients
+    }
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize('budget', BUDGETS, ids=budget_id)
+def test_view_budget(budget, thread, request, query_budget):
+    """Страница укладывается в бюджет запросов и времени."""
+    client = request.getfixturevalue(budget.client)
+    args = request.getfixturevalue(budget.args) if budget.args else None
+    url = reverse(budget.name, args=args)
+    data = {'text': 'Новый текст'} if budget.method == 'post' else None
+    with query_budget(
+            budget_id(budget), budget.queries, budget.milliseconds
+    ):
+        getattr(client, budget.method)(url, data)
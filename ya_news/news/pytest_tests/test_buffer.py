@@ -0,0 +1,92 @@
+import pytest
+from django.test import Client
+
+from news.buffer import comment_buffer
+from news.models import Comment
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture(autouse=True)
+def buffered(settings):
+    """Очередь без фонового потока: тест сохраняет её сам."""
+    settings.NEWS_COMMENT_BUFFER = True
+    settings.NEWS_COMMENT_BUFFER_DELAY = None
+    yield
+    comment_buffer.pending.clear()
+
+
+def test_comment_queued(author_client, detail_url, form_data, news):
+    """Комментарий ждёт в очереди, но автор уже видит его."""
+    response = author_client.post(detail_url, data=form_data)
+    assert response.url.endswith('-0#comments')
+    assert not Comment.objects.exists()
+    for url in (response.url, detail_url):
+        assert form_data['text'] in author_client.get(url).content.decode()
+    assert form_data['text'] not in Client().get(detail_url).content.decode()
+
+
+def test_flush(author_client, admin_client, detail_url, form_data, news):
+    """Очередь сохраняется пачкой вместе со счётчиком новости."""
+    author_client.post(detail_url, data=form_data)
+    admin_client.post(detail_url, data=form_data)
+    assert comment_buffer.flush() == 2
+    assert not comment_buffer.pending
+    news.refresh_from_db()
+    assert news.comments_count == Comment.objects.count() == 2
+    content = Client().get(detail_url).content.decode()
+    assert content.count(form_data['text']) == 2
+
+
+def test_flush_keeps_created(author_client, detail_url, form_data):
+    """Комментарий сохраняется со временем постановки в очередь."""
+    author_client.post(detail_url, data=form_data)
+    created = comment_buffer.pending[0].created
+    comment_buffer.flush()
+    assert Comment.objects.get().created == created
+
+
+def test_full_buffer_saves_at_once(
+        settings, author_client, detail_url, form_data, news
+):
+    """Когда очередь полна, комментарий сохраняется сразу."""
+    settings.NEWS_COMMENT_BUFFER_MAX_SIZE = 1
+    author_client.post(detail_url, data=form_data)
+    author_client.post(detail_url, data=form_data)
+    assert len(comment_buffer.pending) == 1
+    assert Comment.objects.count() == 1
+    assert comment_buffer.flush() == 1
+    news.refresh_from_db()
+    assert news.comments_count == 2
+
+
+def test_redirect_to_last_page(
+        many_comments, author_client, detail_url, form_data
+):
+    """Для длинной ветки адрес ведёт на страницу, где будет комментарий."""
+    response = author_client.post(detail_url, data=form_data)
+    assert '-0#comments' in response.url
+    content = author_client.get(response.url).content.decode()
+    assert form_data['text'] in content
+
+
+def test_etag_changes(author_client, detail_url, form_data):
+    """Свой комментарий в очереди меняет ETag страницы для автора."""
+    etag = author_client.get(detail_url)['ETag']
+    author_client.post(detail_url, data=form_data)
+    response = author_client.get(detail_url, HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == 200
+
+
+@pytest.mark.django_db(transaction=True)
+def test_flush_skips_deleted_news(author_client, detail_url, form_data, news):
+    """
+    Комментарии к удалённой новости отбрасываются.
+
+    Внешние ключи SQLite проверяет при фиксации транзакции, поэтому тест
+    работает без общей транзакции.
+    """
+    author_client.post(detail_url, data=form_data)
+    news.delete()
+    assert comment_buffer.flush() == 0
+    assert not comment_buffer.pending
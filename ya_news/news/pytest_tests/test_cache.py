@@ -0,0 +1,137 @@
+import time
+
+import pytest
+from django.conf import settings
+from django.test import Client
+from django.urls import reverse
+from django.utils import timezone
+
+from news.cache import (
+    DETAIL_VERSION_KEY, get_cache, get_comment_fragment_key, get_stats,
+    render_comment_fragments,
+)
+
+HOME_URL = reverse('news:home')
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize(
+    'url',
+    (HOME_URL, pytest.lazy_fixture('detail_url'))
+)
+def test_anonymous_page_cached(client, url, django_assert_num_queries):
+    """Повторный запрос анонима отдаётся из кэша без запросов к БД."""
+    assert client.get(url)['X-Cache'] == 'MISS'
+    with django_assert_num_queries(0):
+        response = client.get(url)
+    assert response['X-Cache'] == 'HIT'
+    assert get_stats() == {'hits': 1, 'misses': 1}
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize(
+    'url',
+    (HOME_URL, pytest.lazy_fixture('detail_url'))
+)
+def test_unused_query_ignored(client, url):
+    """Лишние параметры запроса не создают новых записей в кэше."""
+    assert client.get(url, {'junk': 1})['X-Cache'] == 'MISS'
+    assert client.get(url, {'junk': 2})['X-Cache'] == 'HIT'
+    assert client.get(url)['X-Cache'] == 'HIT'
+
+
+@pytest.mark.django_db
+def test_missing_news_version_expires(client, monkeypatch):
+    """Версия страницы несуществующей новости не остаётся в кэше навсегда."""
+    key = DETAIL_VERSION_KEY.format(pk=999999)
+    url = reverse('news:detail', args=(999999,))
+    assert client.get(url).status_code == 404
+    assert get_cache().get(key) is not None
+    expired = time.time() + settings.NEWS_CACHE_VERSION_TIMEOUT + 1
+    monkeypatch.setattr(time, 'time', lambda: expired)
+    assert get_cache().get(key) is None
+
+
+@pytest.mark.parametrize(
+    'url',
+    (HOME_URL, pytest.lazy_fixture('detail_url'))
+)
+def test_comment_invalidates_cache(author_client, url, detail_url, form_data):
+    """Новый комментарий сбрасывает кэш главной и страницы новости."""
+    client = Client()
+    client.get(url)
+    author_client.post(detail_url, data=form_data)
+    response = client.get(url)
+    assert response['X-Cache'] == 'MISS'
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize(
+    'url',
+    (HOME_URL, pytest.lazy_fixture('detail_url'))
+)
+def test_news_change_invalidates_cache(client, news, url):
+    """Изменение новости сбрасывает кэш её страниц."""
+    client.get(url)
+    news.title = 'Новый заголовок'
+    news.save()
+    response = client.get(url)
+    assert response['X-Cache'] == 'MISS'
+    assert news.title in response.content.decode()
+
+
+def test_author_sees_own_links(author_client, comment, detail_url):
+    """Автор видит ссылки на свой комментарий, даже если страница в кэше."""
+    Client().get(detail_url)
+    response = author_client.get(detail_url)
+    assert 'X-Cache' not in response
+    assert reverse('news:edit', args=(comment.pk,)) in (
+        response.content.decode()
+    )
+
+
+def test_comment_fragment_shared_between_viewers(
+        author_client, admin_client, comment, detail_url
+):
+    """Фрагмент комментария общий, ссылки автора добавляются поверх."""
+    edit_url = reverse('news:edit', args=(comment.pk,))
+    assert edit_url in author_client.get(detail_url).content.decode()
+    key = get_comment_fragment_key(comment)
+    assert comment.text in get_cache().get(key)
+    get_cache().set(key, 'Фрагмент из кэша')
+    content = admin_client.get(detail_url).content.decode()
+    assert 'Фрагмент из кэша' in content
+    assert edit_url not in content
+
+
+def test_comment_fragment_follows_author_name(
+        author_client, author, comment, detail_url
+):
+    """После переименования автора фрагмент выводит новое имя."""
+    author_client.get(detail_url)
+    author.username = 'Новое имя'
+    author.save()
+    assert author.username in author_client.get(detail_url).content.decode()
+
+
+@pytest.mark.django_db
+def test_comment_fragment_per_timezone(comment):
+    """Дата во фрагменте выводится в часовом поясе зрителя."""
+    fragments = set()
+    for zone in ('UTC', 'Asia/Tokyo'):
+        with timezone.override(zone):
+            [rendered] = render_comment_fragments([comment])
+            fragments.add(rendered.fragment)
+    assert len(fragments) == 2
+
+
+def test_comment_update_replaces_fragment(
+        author_client, comment, detail_url, edit_url, form_data
+):
+    """После редактирования комментарий выводится с новым текстом."""
+    author_client.get(detail_url)
+    author_client.post(edit_url, data=form_data)
+    assert get_cache().get(get_comment_fragment_key(comment)) is None
+    content = author_client.get(detail_url).content.decode()
+    assert form_data['text'] in content
+    assert comment.text not in content
@@ -0,0 +1,97 @@
+import time
+from http import HTTPStatus
+
+import pytest
+from django.test import Client
+
+from news.models import Comment
+
+REPEAT = 20
+ROUNDS = 5
+
+
+def cpu_time(func):
+    """
+    Процессорное время REPEAT вызовов func в текущем потоке.
+
+    Берётся лучший из ROUNDS замеров, чтобы тест не зависел от соседних
+    процессов, например при параллельном запуске тестов.
+    """
+    rounds = []
+    for _ in range(ROUNDS):
+        started = time.thread_time()
+        for _ in range(REPEAT):
+            func()
+        rounds.append(time.thread_time() - started)
+    return min(rounds)
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize(
+    'header, value',
+    (
+        ('HTTP_IF_NONE_MATCH', 'ETag'),
+        ('HTTP_IF_MODIFIED_SINCE', 'Last-Modified'),
+    )
+)
+def test_anonymous_revalidation(
+        comment, detail_url, header, value, django_assert_num_queries
+):
+    """Проверка неизменившейся страницы не обращается к базе."""
+    client = Client()
+    response = client.get(detail_url)
+    with django_assert_num_queries(0):
+        response = client.get(detail_url, **{header: response[value]})
+    assert response.status_code == HTTPStatus.NOT_MODIFIED
+    assert response.content == b''
+
+
+def test_author_revalidation(
+        author_client, comment, detail_url, django_assert_num_queries
+):
+    """
+    Для автора проверка стоит только загрузки сессии и пользователя.
+
+    Процессорного времени она тратит меньше, чем рендеринг страницы.
+    """
+    etag = author_client.get(detail_url)['ETag']
+    with django_assert_num_queries(2):
+        response = author_client.get(detail_url, HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == HTTPStatus.NOT_MODIFIED
+    revalidation = cpu_time(
+        lambda: author_client.get(detail_url, HTTP_IF_NONE_MATCH=etag)
+    )
+    render = cpu_time(lambda: author_client.get(detail_url))
+    assert revalidation < render
+
+
+@pytest.mark.parametrize(
+    'change',
+    (
+        lambda comment: Comment.objects.create(
+            news=comment.news, author=comment.author, text='Новый'
+        ),
+        lambda comment: comment.save(),
+        lambda comment: comment.delete(),
+    ),
+    ids=('create', 'update', 'delete')
+)
+def test_comment_change_invalidates_etag(
+        author_client, comment, detail_url, change
+):
+    """Изменение комментариев меняет ETag и время изменения страницы."""
+    response = author_client.get(detail_url)
+    change(comment)
+    response = author_client.get(
+        detail_url,
+        HTTP_IF_NONE_MATCH=response['ETag'],
+        HTTP_IF_MODIFIED_SINCE=response['Last-Modified'],
+    )
+    assert response.status_code == HTTPStatus.OK
+
+
+def test_etag_depends_on_user(author_client, admin_client, detail_url):
+    """У разных пользователей свои ETag: на странице их ссылки и форма."""
+    etag = author_client.get(detail_url)['ETag']
+    assert admin_client.get(detail_url)['ETag'] != etag
+    assert Client().get(detail_url)['ETag'] != etag
@@ -1,10 +1,16 @@
 import re
+from http import HTTPStatus
 
 import pytest
+from asgiref.sync import async_to_sync
 from django.conf import settings
+from django.contrib.auth.models import AnonymousUser
+from django.core.cache import cache
 from django.urls import reverse
 
+from news import async_views
 from news.forms import CommentForm
+from news.views import NewsDetailView, NewsList
 
 
 @pytest.mark.django_db
@@ -16,6 +22,13 @@ def test_news_count(all_news, client):
     assert news_count == settings.NEWS_COUNT_ON_HOME_PAGE
 
 
+@pytest.mark.django_db
+def test_home_page_single_query(all_news, client, django_assert_num_queries):
+    """Главная страница загружается одним запросом к базе данных."""
+    with django_assert_num_queries(1):
+        client.get(reverse('news:home'))
+
+
 @pytest.mark.django_db
 def test_new_order(all_news, client):
     """
@@ -59,3 +72,56 @@ def test_client_has_form(parametrized_client, expected_result, detail_url):
     assert ('form' in response.context) is expected_result
     if expected_result:
         assert isinstance(response.context['form'], CommentForm)
+
+
+@pytest.mark.django_db
+def test_comments_paginated_by_cursor(
+        many_comments, comments_per_page, client, detail_url, comments_url
+):
+    """Комментарии выводятся страницами, следующая загружается по курсору."""
+    response = client.get(detail_url)
+    assert response.context['comments'] == many_comments[:comments_per_page]
+    cursor = response.context['next_cursor']
+    assert cursor
+
+    response = client.get(comments_url, {'cursor': cursor})
+    assert response.context['comments'] == many_comments[
+        comments_per_page:comments_per_page * 2
+    ]
+    response = client.get(
+        comments_url, {'cursor': response.context['next_cursor']}
+    )
+    assert response.context['comments'] == many_comments[
+        comments_per_page * 2:
+    ]
+    assert response.context['next_cursor'] is None
+
+
+@pytest.mark.django_db(transaction=True)
+@pytest.mark.parametrize(
+    'async_view, sync_view',
+    (
+        (async_views.news_list, NewsList.as_view()),
+        (async_views.news_detail, NewsDetailView.as_view()),
+    )
+)
+def test_async_views_match_sync(rf, news, async_view, sync_view):
+    """Асинхронные страницы совпадают с синхронными."""
+    request = rf.get('/')
+    request.user = AnonymousUser()
+    sync_response = sync_view(request, pk=news.pk)
+    sync_response.render()
+    cache.clear()
+    async_response = async_to_sync(async_view)(request, pk=news.pk)
+    assert async_response.status_code == HTTPStatus.OK
+    assert async_response.content == sync_response.content
+
+
+def test_async_executor_created_lazily(settings, monkeypatch):
+    """Пул потоков создаётся при первом обращении, по текущим настройкам."""
+    monkeypatch.setattr(async_views, 'executor', None)
+    settings.NEWS_ASYNC_MAX_WORKERS = 3
+    executor = async_views.get_executor()
+    assert executor._max_workers == 3
+    assert async_views.get_executor() is executor
+    executor.shutdown()
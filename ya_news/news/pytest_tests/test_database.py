@@ -0,0 +1,26 @@
+import pytest
+from django.db import DEFAULT_DB_ALIAS, connections
+
+
+def pragma(connection, name):
+    with connection.cursor() as cursor:
+        cursor.execute(f'PRAGMA {name}')
+        return cursor.fetchone()[0]
+
+
+@pytest.mark.django_db
+def test_pragmas_applied_to_new_connection(settings):
+    """
+    Новое соединение настраивается по SQLITE_PRAGMAS.
+
+    Соединение открывается отдельно от общего соединения тестов, чтобы
+    PRAGMA не достались следующим тестам.
+    """
+    settings.SQLITE_PRAGMAS = {'cache_size': -4096, 'synchronous': 'NORMAL'}
+    connection = connections.create_connection(DEFAULT_DB_ALIAS)
+    try:
+        assert pragma(connection, 'cache_size') == -4096
+        # 1 — NORMAL.
+        assert pragma(connection, 'synchronous') == 1
+    finally:
+        connection.close()
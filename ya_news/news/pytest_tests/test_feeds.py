@@ -0,0 +1,126 @@
+import json
+from datetime import timedelta
+from http import HTTPStatus
+
+import pytest
+from asgiref.sync import async_to_sync
+from django.core.asgi import get_asgi_application
+from django.urls import reverse
+from django.utils import timezone
+
+from news.cache import invalidate_home
+from news.models import Comment, News
+
+FEEDS = ('news:feed_rss', 'news:feed_atom', 'news:feed_json',
+         'news:feed_comments')
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize('name', FEEDS)
+@pytest.mark.parametrize(
+    'header, value',
+    (('HTTP_IF_NONE_MATCH', 'ETag'), ('HTTP_IF_MODIFIED_SINCE',
+                                      'Last-Modified'))
+)
+def test_feed_not_modified(
+        client, comment, name, header, value, django_assert_num_queries
+):
+    """Неизменившаяся лента отдаётся кодом 304 без запросов к базе."""
+    url = reverse(name)
+    response = client.get(url)
+    assert response.status_code == HTTPStatus.OK
+    with django_assert_num_queries(0):
+        response = client.get(url, **{header: response[value]})
+    assert response.status_code == HTTPStatus.NOT_MODIFIED
+    assert response.content == b''
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize('name', FEEDS)
+def test_new_comment_changes_etag(client, comment, name):
+    """Новый комментарий меняет ETag лент."""
+    url = reverse(name)
+    etag = client.get(url)['ETag']
+    Comment.objects.create(
+        news=comment.news, author=comment.author, text='Новый комментарий'
+    )
+    response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == HTTPStatus.OK
+    assert response['ETag'] != etag
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize('name', FEEDS)
+@pytest.mark.parametrize('change', ('edit_news', 'edit', 'delete'))
+def test_changes_change_validators(client, comment, name, change):
+    """Правка новости, правка и удаление комментария меняют ETag."""
+    url = reverse(name)
+    etag = client.get(url)['ETag']
+    if change == 'edit_news':
+        comment.news.title = 'Новый заголовок'
+        comment.news.save()
+    elif change == 'edit':
+        comment.text = 'Новый текст'
+        comment.save()
+    else:
+        comment.delete()
+    response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == HTTPStatus.OK
+    assert response['ETag'] != etag
+
+
+@pytest.mark.django_db
+def test_last_modified_follows_updates(client, comment):
+    """Last-Modified растёт с временем изменения новостей."""
+    url = reverse('news:feed_rss')
+    last_modified = client.get(url)['Last-Modified']
+    News.objects.filter(pk=comment.news_id).update(
+        updated=timezone.now() + timedelta(days=1)
+    )
+    invalidate_home()
+    response = client.get(url, HTTP_IF_MODIFIED_SINCE=last_modified)
+    assert response.status_code == HTTPStatus.OK
+
+
+@pytest.mark.django_db
+def test_json_feed(client, all_news, settings):
+    """JSON-лента содержит свежие новости, начиная с самой новой."""
+    settings.NEWS_FEED_SIZE = 5
+    response = client.get(reverse('news:feed_json'))
+    feed = json.loads(b''.join(response.streaming_content))
+    dates = [item['date_published'] for item in feed['items']]
+    assert len(dates) == settings.NEWS_FEED_SIZE
+    assert dates == sorted(dates, reverse=True)
+
+
+@pytest.mark.django_db(transaction=True)
+def test_json_feed_asgi(all_news, settings):
+    """JSON-лента отдаётся и под ASGI, где поток читается в цикле событий."""
+    settings.NEWS_FEED_SIZE = 5
+    messages = []
+
+    async def receive():
+        return {'type': 'http.request', 'body': b'', 'more_body': False}
+
+    async def send(message):
+        messages.append(message)
+
+    async_to_sync(get_asgi_application())({
+        'type': 'http',
+        'method': 'GET',
+        'path': reverse('news:feed_json'),
+        'query_string': b'',
+        'headers': [(b'host', b'localhost')],
+    }, receive, send)
+    assert messages[0]['status'] == HTTPStatus.OK
+    feed = json.loads(b''.join(
+        message.get('body', b'') for message in messages[1:]
+    ))
+    assert len(feed['items']) == settings.NEWS_FEED_SIZE
+
+
+@pytest.mark.django_db
+def test_comments_feed(client, comment):
+    """Лента комментариев содержит текст комментария."""
+    response = client.get(reverse('news:feed_comments'))
+    assert comment.text in response.content.decode()
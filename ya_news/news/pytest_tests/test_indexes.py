@@ -0,0 +1,56 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from news.pagination import encode_cursor
+from ya_common.plans import slow_plan_steps
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize(
+    'parametrized_client',
+    (pytest.lazy_fixture('client'), pytest.lazy_fixture('author_client'))
+)
+@pytest.mark.parametrize(
+    'name, args',
+    (
+        ('news:home', None),
+        ('news:detail', pytest.lazy_fixture('news_id_for_args')),
+        ('news:comments', pytest.lazy_fixture('news_id_for_args')),
+        ('news:feed_rss', None),
+        ('news:feed_json', None),
+        ('news:feed_comments', None),
+    )
+)
+def test_read_views_use_indexes(
+        parametrized_client, name, args, many_comments
+):
+    """Страницы новостей не просматривают таблицы целиком."""
+    url = reverse(name, args=args)
+    with CaptureQueriesContext(connection) as context:
+        parametrized_client.get(url, {'cursor': encode_cursor(
+            many_comments[2]
+        )} if args else None)
+    assert slow_plan_steps(context.captured_queries) == []
+
+
+@pytest.mark.parametrize('name', ('news:edit', 'news:delete'))
+def test_comment_views_use_indexes(
+        author_client, name, comment_id_for_args, many_comments
+):
+    """Редактирование и удаление комментария используют индексы."""
+    url = reverse(name, args=comment_id_for_args)
+    with CaptureQueriesContext(connection) as context:
+        author_client.get(url)
+        author_client.post(url, {'text': 'Новый текст'})
+    assert slow_plan_steps(context.captured_queries) == []
+
+
+def test_comment_post_uses_indexes(
+        author_client, detail_url, form_data, many_comments
+):
+    """Публикация комментария использует индексы."""
+    with CaptureQueriesContext(connection) as context:
+        author_client.post(detail_url, data=form_data)
+    assert slow_plan_steps(context.captured_queries) == []
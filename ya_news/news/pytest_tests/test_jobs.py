@@ -0,0 +1,95 @@
+from datetime import timedelta
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.utils import timezone
+
+from news.cache import get_cache, get_comment_fragment_key
+from news.jobs import get_metrics, job, runner
+from news.models import Comment, Job
+
+pytestmark = pytest.mark.django_db
+
+calls = []
+
+
+@job
+def flaky(fail):
+    calls.append(fail)
+    if fail:
+        raise ValueError('Сбой')
+
+
+@pytest.fixture(autouse=True)
+def deferred(settings):
+    settings.NEWS_JOBS_EAGER = False
+    settings.NEWS_JOBS_RETRY_DELAY = 0
+    settings.NEWS_JOBS_MAX_ATTEMPTS = 2
+    calls.clear()
+
+
+def test_comment_enqueues_fragment(author_client, detail_url, form_data):
+    """Фрагмент нового комментария рендерится отложенной задачей."""
+    author_client.post(detail_url, data=form_data)
+    assert Job.objects.get().name == 'news.jobs.render_comment_fragment'
+    key = get_comment_fragment_key(Comment.objects.get())
+    assert get_cache().get(key) is None
+    assert runner.drain() == 1
+    assert form_data['text'] in get_cache().get(key)
+    assert not Job.objects.exists()
+
+
+def test_retry_then_fail():
+    """Упавшая задача повторяется, а исчерпав попытки, остаётся с ошибкой."""
+    queued = flaky.delay(fail=True)
+    assert runner.drain() == 0
+    assert calls == [True, True]
+    queued.refresh_from_db()
+    assert (queued.state, queued.attempts) == (Job.FAILED, 2)
+    assert 'ValueError' in queued.last_error
+
+
+def test_claimed_once():
+    """Задачу, которую уже взяли, второй раз не выполнить."""
+    queued = flaky.delay(fail=False)
+    assert runner.run(queued.pk)
+    assert not runner.run(queued.pk)
+    assert calls == [False]
+
+
+def test_drain_runs_stale_job(settings):
+    """Задачу, зависшую у остановленного процесса, выполняет drain."""
+    queued = flaky.delay(fail=False)
+    Job.objects.filter(pk=queued.pk).update(
+        state=Job.RUNNING, attempts=1,
+        started=timezone.now() - timedelta(
+            seconds=settings.NEWS_JOBS_TIMEOUT + 1
+        ),
+    )
+    assert runner.drain() == 1
+    assert calls == [False]
+    assert not Job.objects.exists()
+
+
+def test_drain_skips_running_job():
+    """Задачу, которую выполняют прямо сейчас, drain не трогает."""
+    queued = flaky.delay(fail=False)
+    Job.objects.filter(pk=queued.pk).update(
+        state=Job.RUNNING, started=timezone.now()
+    )
+    assert runner.drain() == 0
+    assert calls == []
+
+
+def test_drain_command_metrics():
+    flaky.delay(fail=False)
+    flaky.delay(fail=False)
+    stdout = StringIO()
+    call_command('drain_jobs', '--limit', '1', stdout=stdout)
+    output = stdout.getvalue()
+    assert 'Выполнено задач: 1' in output
+    assert 'depth: 1' in output
+    metrics = get_metrics()
+    assert metrics['depth'] == 1
+    assert metrics['latency_max'] >= 0
@@ -1,8 +1,15 @@
+import json
+import os
+from http import HTTPStatus
+from io import StringIO
+
 import pytest
+from django.core.management import call_command
 from pytest_django.asserts import assertFormError, assertRedirects
 
-from news.forms import BAD_WORDS, WARNING
-from news.models import Comment
+from news.forms import BAD_WORDS, WARNING, CommentForm
+from news.models import Comment, News
+from news.pagination import encode_cursor
 
 
 @pytest.mark.django_db
@@ -37,6 +44,48 @@ def test_user_cant_use_bad_words(admin_client, detail_url, bad_word):
     assert Comment.objects.count() == 0
 
 
+def test_bad_word_reported():
+    """Форма сообщает, какое запрещённое слово найдено."""
+    form = CommentForm(data={'text': 'Ну ты и РЕДИСКА!'})
+    assert not form.is_valid()
+    error = form.errors.as_data()['text'][0]
+    assert error.code == 'bad_word'
+    assert error.params == {'word': 'редиска'}
+
+
+def test_bad_words_reloaded_from_file(settings, tmp_path):
+    """Словарь из файла перечитывается при его изменении."""
+    path = tmp_path / 'bad_words.txt'
+    path.write_text('# словарь\nзлодей\n', encoding='utf-8')
+    settings.NEWS_BAD_WORDS_FILE = str(path)
+    settings.NEWS_BAD_WORDS_CHECK_INTERVAL = 0
+    assert not CommentForm(data={'text': 'Злодей!'}).is_valid()
+    assert CommentForm(data={'text': 'Редиска!'}).is_valid()
+
+    path.write_text('редиска\n', encoding='utf-8')
+    os.utime(path, ns=(0, 0))
+    assert CommentForm(data={'text': 'Злодей!'}).is_valid()
+    assert not CommentForm(data={'text': 'Редиска!'}).is_valid()
+
+
+def test_bad_words_file_checked_by_interval(settings, tmp_path):
+    """Между проверками изменение файла не замечается."""
+    path = tmp_path / 'bad_words.txt'
+    path.write_text('злодей\n', encoding='utf-8')
+    settings.NEWS_BAD_WORDS_FILE = str(path)
+    settings.NEWS_BAD_WORDS_CHECK_INTERVAL = 60
+    assert not CommentForm(data={'text': 'Злодей!'}).is_valid()
+    path.unlink()
+    assert not CommentForm(data={'text': 'Злодей!'}).is_valid()
+
+
+def test_missing_bad_words_file(settings, tmp_path, caplog):
+    """Без файла словаря используется словарь по умолчанию."""
+    settings.NEWS_BAD_WORDS_FILE = str(tmp_path / 'missing.txt')
+    assert not CommentForm(data={'text': 'Редиска!'}).is_valid()
+    assert 'missing.txt' in caplog.text
+
+
 def test_author_can_delete_comment(author_client, delete_url, url_to_comments):
     """Автор может удалить свои комментарии."""
     response = author_client.delete(delete_url)
@@ -70,3 +119,128 @@ def test_user_cant_edit_comment_of_another_user(
     comment_text = comment.text
     comment.refresh_from_db()
     assert comment.text == comment_text
+
+
+@pytest.mark.django_db
+def test_redirect_to_comment_page(
+        many_comments, author_client, detail_url, form_data
+):
+    """После комментирования пользователь попадает на страницу с ним."""
+    response = author_client.post(detail_url, data=form_data)
+    comment = Comment.objects.latest('pk')
+    assertRedirects(
+        response, f'{detail_url}?cursor={encode_cursor(comment)}#comments'
+    )
+    response = author_client.get(response.url)
+    assert comment in response.context['comments']
+
+
+@pytest.mark.django_db
+def test_redirect_ignores_stale_counter(
+        many_comments, news, author_client, detail_url, form_data
+):
+    """Страница нового комментария не зависит от счётчика новости."""
+    News.objects.update(comments_count=0)
+    response = author_client.post(detail_url, data=form_data)
+    comment = Comment.objects.latest('pk')
+    assert comment in author_client.get(response.url).context['comments']
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize('url, method, queries', (
+    # Сессия, пользователь, новость, вставка, обновление новости,
+    # задача рендеринга фрагмента (в тестах она выполняется сразу одним
+    # запросом, в работе — одна вставка в очередь задач) и проверка
+    # страницы комментария.
+    (pytest.lazy_fixture('detail_url'), 'post', 7),
+    # Сессия, пользователь, комментарий, его обновление, обновление
+    # новости и проверка страницы комментария.
+    (pytest.lazy_fixture('edit_url'), 'post', 6),
+    # Сессия, пользователь, комментарий, проверка страницы, удаление и
+    # обновление новости.
+    (pytest.lazy_fixture('delete_url'), 'delete', 6),
+))
+def test_comment_write_queries(
+        comment, author_client, form_data, django_assert_num_queries,
+        url, method, queries
+):
+    """Новость и комментарий загружаются при записи не больше раза."""
+    with django_assert_num_queries(queries):
+        response = getattr(author_client, method)(url, form_data)
+    assert response.status_code == HTTPStatus.FOUND
+
+
+def test_comments_count_increases_on_create(
+        author_client, detail_url, news, form_data
+):
+    """Создание комментария увеличивает счётчик у новости."""
+    author_client.post(detail_url, data=form_data)
+    news.refresh_from_db()
+    assert news.comments_count == 1
+
+
+def test_comments_count_decreases_on_delete(author_client, delete_url, news):
+    """Удаление комментария уменьшает счётчик у новости."""
+    author_client.delete(delete_url)
+    news.refresh_from_db()
+    assert news.comments_count == 0
+
+
+@pytest.mark.django_db
+def test_recount_comments_command(comment, news):
+    """Команда recount_comments восстанавливает счётчики."""
+    News.objects.update(comments_count=100)
+    call_command('recount_comments', stdout=StringIO())
+    news.refresh_from_db()
+    assert news.comments_count == 1
+
+
+@pytest.mark.django_db
+def test_jsonl_dump_and_load(comment, news, tmp_path):
+    """Выгрузка в JSON Lines и обратная загрузка сохраняют данные."""
+    path = str(tmp_path / 'news.jsonl')
+    call_command('dump_news_jsonl', path, stderr=StringIO())
+    created, author_id = comment.created, comment.author_id
+    News.objects.all().delete()
+
+    call_command('load_news_jsonl', path, stderr=StringIO())
+    loaded = Comment.objects.get()
+    assert loaded.news.title == news.title
+    assert loaded.news.comments_count == 1
+    assert loaded.created == created
+    assert loaded.author_id == author_id
+
+
+@pytest.mark.django_db
+def test_jsonl_load_counts_comments_by_batch(comment, news, tmp_path):
+    """Счётчик комментариев растёт с каждым загруженным пакетом."""
+    path = str(tmp_path / 'news.jsonl')
+    Comment.objects.create(
+        news=news, author=comment.author, text='Второй комментарий'
+    )
+    call_command('dump_news_jsonl', path, stderr=StringIO())
+    News.objects.all().delete()
+
+    call_command('load_news_jsonl', path, batch_size=1, stderr=StringIO())
+    news = News.objects.get()
+    assert news.comments_count == 2
+    assert Comment._meta.get_field('created').auto_now_add
+
+
+@pytest.mark.django_db
+def test_jsonl_load_creates_missing_authors(django_user_model, news, tmp_path):
+    """Загрузка создаёт отсутствующих авторов по username."""
+    path = tmp_path / 'comments.jsonl'
+    path.write_text(json.dumps({
+        'model': 'news.comment',
+        'fields': {
+            'news': news.pk,
+            'author': 'Новый автор',
+            'text': 'Текст комментария',
+            'created': '2023-01-01T12:00:00+00:00',
+        },
+    }) + '\n', encoding='utf-8')
+    call_command('load_news_jsonl', str(path), stderr=StringIO())
+    comment = Comment.objects.get()
+    assert comment.author.username == 'Новый автор'
+    assert not comment.author.has_usable_password()
@@ -0,0 +1,73 @@
+import pytest
+from django.urls import reverse
+
+from ya_common.profiling import stats
+
+PROFILING_URL = reverse('profiling')
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture
+def profiling(settings):
+    settings.MIDDLEWARE = [
+        'ya_common.profiling.ProfilingMiddleware', *settings.MIDDLEWARE
+    ]
+    settings.PROFILING_SAMPLE_RATE = 1
+    stats.clear()
+    yield
+    stats.clear()
+
+
+def test_request_profiled(profiling, client, detail_url):
+    """Запрос измеряется и учитывается под именем адреса."""
+    client.get(detail_url)
+    summary = stats.summary()['news:detail']
+    assert summary['count'] == 1
+    # Последнее изменение, новость и страница комментариев.
+    assert summary['sql_queries']['0.5'] == 3
+    assert summary['sql_seconds']['0.5'] > 0
+    assert 0 < summary['template_seconds']['0.5'] < summary['seconds']['0.5']
+    assert summary['cpu_seconds']['0.5'] > 0
+
+
+def test_not_sampled(profiling, settings, client, detail_url):
+    settings.PROFILING_SAMPLE_RATE = 0
+    client.get(detail_url)
+    assert stats.summary() == {}
+
+
+def test_stats_view(profiling, admin_client, client, detail_url):
+    """Перцентили доступны только персоналу, в JSON и для Prometheus."""
+    client.get(detail_url)
+    assert client.get(PROFILING_URL).status_code == 404
+    assert admin_client.get(PROFILING_URL).json()['news:detail']['count'] == 1
+    text = admin_client.get(
+        PROFILING_URL, {'format': 'prometheus'}
+    ).content.decode()
+    assert (
+        'yanews_request_sql_queries{view="news:detail",quantile="0.5"} 3'
+    ) in text
+    assert 'yanews_request_seconds_count{view="news:detail"} 1' in text
+    assert 'yanews_request_sql_queries_sum{view="news:detail"} 3' in text
+
+
+def test_totals_outlive_window(profiling, settings, client, detail_url):
+    """Число и сумма измерений копятся и после вытеснения из окна."""
+    settings.PROFILING_WINDOW = 1
+    stats.clear()
+    client.get(detail_url)
+    # Второй раз страница отдаётся из кэша без запросов к базе.
+    client.get(detail_url)
+    summary = stats.summary()['news:detail']
+    assert summary['sql_queries']['0.5'] == 0
+    assert summary['totals']['sql_queries'] == {'count': 2, 'sum': 3}
+
+
+def test_metric_prefix(profiling, settings, admin_client, client, detail_url):
+    settings.PROFILING_METRIC_PREFIX = 'custom'
+    client.get(detail_url)
+    text = admin_client.get(
+        PROFILING_URL, {'format': 'prometheus'}
+    ).content.decode()
+    assert 'custom_request_seconds_sum{view="news:detail"}' in text
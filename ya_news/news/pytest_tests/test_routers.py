@@ -0,0 +1,207 @@
+import asyncio
+import logging
+
+import pytest
+from asgiref.sync import async_to_sync
+from django.contrib.auth import get_user_model
+from django.core.handlers.asgi import ASGIHandler
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.http import HttpResponse
+from django.test import Client
+from django.utils.http import http_date
+
+from news.cache import get_cache, get_comment_fragment_key
+from news.jobs import get_metrics, runner
+from news.models import Comment, News
+from news.routers import (
+    STICKY_COOKIE, PrimaryStickinessMiddleware, ReplicaRouter, use_primary
+)
+
+REPLICAS = ['replica1', 'replica2']
+REPLICA = 'replica'
+
+
+@pytest.fixture
+def replicas(settings):
+    settings.NEWS_REPLICA_DATABASES = REPLICAS
+    return REPLICAS
+
+
+@pytest.fixture
+def replica(settings, tmp_path):
+    """
+    Реплика — снимок основной базы в отдельном файле.
+
+    Снимок делается в начале теста и дальше не обновляется: всё, что
+    записано позже, есть только в основной базе, как у отстающей
+    реплики.
+    """
+    primary = connections[DEFAULT_DB_ALIAS]
+    primary.ensure_connection()
+    path = str(tmp_path / 'replica.sqlite3')
+    connections.databases[REPLICA] = {
+        **connections.databases[DEFAULT_DB_ALIAS], 'NAME': path, 'TEST': {}
+    }
+    replica = connections[REPLICA]
+    replica.ensure_connection()
+    primary.connection.backup(replica.connection)
+    settings.NEWS_REPLICA_DATABASES = [REPLICA]
+    yield replica
+    replica.close()
+    del connections[REPLICA]
+    del connections.databases[REPLICA]
+
+
+@pytest.fixture
+def router():
+    return ReplicaRouter()
+
+
+def read_database(request):
+    """Прогоняет запрос через middleware и возвращает базу для чтения."""
+    databases = []
+
+    def get_response(request):
+        databases.append(ReplicaRouter().db_for_read(News))
+        return HttpResponse()
+
+    response = PrimaryStickinessMiddleware(get_response)(request)
+    return databases[0], response
+
+
+@pytest.mark.parametrize('model', (News, Comment))
+def test_reads_go_to_replicas(router, replicas, model):
+    assert router.db_for_read(model) in replicas
+
+
+def test_writes_go_to_primary(router, replicas):
+    assert router.db_for_write(Comment) == 'default'
+
+
+def test_other_apps_not_routed(router, replicas):
+    User = get_user_model()
+    assert router.db_for_read(User) is None
+    assert router.db_for_write(User) is None
+
+
+def test_without_replicas_reads_go_to_primary(router):
+    assert router.db_for_read(News) is None
+
+
+def test_primary_forced_by_context(router, replicas):
+    token = use_primary.set(True)
+    try:
+        assert router.db_for_read(News) is None
+    finally:
+        use_primary.reset(token)
+
+
+def test_migrations_not_applied_to_replicas(router, replicas):
+    assert router.allow_migrate('replica1', 'news') is False
+    assert router.allow_migrate('default', 'news') is None
+
+
+def test_write_request_sticks_to_primary(rf, replicas):
+    """После записи клиент некоторое время читает из основной базы."""
+    database, response = read_database(rf.post('/'))
+    assert database is None
+    assert STICKY_COOKIE in response.cookies
+
+    request = rf.get('/')
+    request.COOKIES[STICKY_COOKIE] = response.cookies[STICKY_COOKIE].value
+    database, response = read_database(request)
+    assert database is None
+    assert STICKY_COOKIE not in response.cookies
+
+    database, _ = read_database(rf.get('/'))
+    assert database in replicas
+
+
+def test_write_request_sticks_to_primary_async(rf, replicas):
+    """В асинхронной цепочке middleware работает так же."""
+    databases = []
+
+    async def get_response(request):
+        databases.append(ReplicaRouter().db_for_read(News))
+        return HttpResponse()
+
+    middleware = PrimaryStickinessMiddleware(get_response)
+    assert asyncio.iscoroutinefunction(middleware)
+    response = async_to_sync(middleware)(rf.post('/'))
+    assert databases == [None]
+    assert STICKY_COOKIE in response.cookies
+
+
+def test_asgi_middleware_not_adapted(settings, caplog):
+    """Под ASGI цепочка middleware не переключается в синхронный режим."""
+    # Об адаптации Django сообщает только в режиме отладки.
+    settings.DEBUG = True
+    with caplog.at_level(logging.DEBUG, logger='django.request'):
+        ASGIHandler().load_middleware(is_async=True)
+    assert 'adapted' not in caplog.text
+
+
+@pytest.mark.django_db(transaction=True)
+def test_comment_author_reads_from_primary(
+        news, author_client, admin_client, detail_url, form_data, replica
+):
+    """
+    Автор комментария после перенаправления читает из основной базы.
+
+    Новый комментарий есть только в основной базе: другой пользователь
+    без cookie читает страницу из реплики, и его там нет. Снимок реплики
+    делается после фиксации данных, поэтому тест работает без общей
+    транзакции.
+    """
+    response = author_client.post(detail_url, data=form_data)
+    assert STICKY_COOKIE in response.cookies
+    assert Comment.objects.using(DEFAULT_DB_ALIAS).exists()
+    assert not Comment.objects.using(REPLICA).exists()
+    response = author_client.get(response.url)
+    assert form_data['text'] in response.content.decode()
+    response = admin_client.get(detail_url)
+    assert response.status_code == 200
+    assert form_data['text'] not in response.content.decode()
+
+
+@pytest.mark.django_db(transaction=True)
+def test_page_cache_filled_from_primary(
+        news, author_client, detail_url, form_data, replica
+):
+    """
+    Кэш страниц и Last-Modified заполняются по основной базе.
+
+    После записи версия страниц уже новая, а реплика отстаёт: страница,
+    прочитанная из неё, осталась бы в кэше без нового комментария.
+    """
+    author_client.post(detail_url, data=form_data)
+    comment = Comment.objects.using(DEFAULT_DB_ALIAS).get()
+    anonymous = Client()
+    for cache_status in ('MISS', 'HIT'):
+        response = anonymous.get(detail_url)
+        assert response['X-Cache'] == cache_status
+        assert form_data['text'] in response.content.decode()
+        assert response['Last-Modified'] == http_date(
+            comment.created.timestamp()
+        )
+    assert 'Комментариев: 1' in anonymous.get('/').content.decode()
+
+
+@pytest.mark.django_db(transaction=True)
+def test_jobs_read_from_primary(
+        news, author_client, detail_url, form_data, replica, settings,
+        monkeypatch
+):
+    """Очередь задач и сами задачи читают из основной базы."""
+    settings.NEWS_JOBS_EAGER = False
+    # Задачу выполняет drain, а не пул потоков после фиксации.
+    monkeypatch.setattr(runner, 'submit', lambda pk, delay=0: None)
+    author_client.post(detail_url, data=form_data)
+    assert get_metrics()['depth'] == 1
+    assert runner.drain() == 1
+    comment = Comment.objects.using(DEFAULT_DB_ALIAS).select_related(
+        'author'
+    ).get()
+    assert form_data['text'] in get_cache().get(
+        get_comment_fragment_key(comment)
+    )
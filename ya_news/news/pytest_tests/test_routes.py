@@ -11,6 +11,11 @@ from pytest_django.asserts import assertRedirects
     (
         ('news:home', None),
         ('news:detail', pytest.lazy_fixture('comment_id_for_args')),
+        ('news:comments', pytest.lazy_fixture('news_id_for_args')),
+        ('news:feed_rss', None),
+        ('news:feed_atom', None),
+        ('news:feed_json', None),
+        ('news:feed_comments', None),
         ('users:signup', None),
         ('users:login', None),
         ('users:logout', None),
@@ -23,6 +28,19 @@ def test_pages_availability(name, args, client):
     assert response.status_code == HTTPStatus.OK
 
 
+@pytest.mark.django_db
+@pytest.mark.parametrize('name', ('news:detail', 'news:comments'))
+@pytest.mark.parametrize(
+    'cursor',
+    ('invalid', '99999999999999999999-1', '0-99999999999999999999')
+)
+def test_invalid_cursor(client, name, cursor, news_id_for_args):
+    """Некорректный курсор комментариев приводит к ошибке 404."""
+    url = reverse(name, args=news_id_for_args)
+    response = client.get(url, {'cursor': cursor})
+    assert response.status_code == HTTPStatus.NOT_FOUND
+
+
 @pytest.mark.parametrize(
     "parametrized_client, expected_status",
     (
@@ -0,0 +1,126 @@
+"""
+Распределение запросов новостей между основной базой и репликами.
+
+Чтение новостей и комментариев уходит на случайную реплику из
+NEWS_REPLICA_DATABASES, запись — всегда в основную базу. Реплики
+отстают от основной базы, поэтому запросы, изменяющие данные, и
+запросы пользователя в течение NEWS_REPLICA_STICKY_SECONDS после них
+читают из основной базы: автор видит свой комментарий сразу после
+перенаправления на страницу новости.
+"""
+import asyncio
+import random
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS
+
+STICKY_COOKIE = 'news_primary'
+SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS', 'TRACE')
+
+use_primary = ContextVar('news_use_primary', default=False)
+
+
+@contextmanager
+def primary_reads():
+    """Внутри блока чтение новостей идёт из основной базы."""
+    token = use_primary.set(True)
+    try:
+        yield
+    finally:
+        use_primary.reset(token)
+
+
+def reads_from_replica():
+    """Чтение новостей сейчас уходит на реплику."""
+    return bool(settings.NEWS_REPLICA_DATABASES) and not use_primary.get()
+
+
+class ReplicaRouter:
+    app_label = 'news'
+
+    def db_for_read(self, model, **hints):
+        if model._meta.app_label != self.app_label or use_primary.get():
+            return None
+        replicas = settings.NEWS_REPLICA_DATABASES
+        return random.choice(replicas) if replicas else None
+
+    def db_for_write(self, model, **hints):
+        if model._meta.app_label == self.app_label:
+            return DEFAULT_DB_ALIAS
+        return None
+
+    def allow_relation(self, obj1, obj2, **hints):
+        databases = {DEFAULT_DB_ALIAS, *settings.NEWS_REPLICA_DATABASES}
+        if {obj1._state.db, obj2._state.db} <= databases:
+            return True
+        return None
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        if db in settings.NEWS_REPLICA_DATABASES:
+            return False
+        return None
+
+
+class PrimaryDatabaseMixin:
+    """Представление читает данные только из основной базы."""
+
+    def dispatch(self, request, *args, **kwargs):
+        with primary_reads():
+            return super().dispatch(request, *args, **kwargs)
+
+
+class PrimaryStickinessMiddleware:
+    """
+    Направляет в основную базу запросы, изменяющие данные.
+
+    В ответ на такой запрос клиент получает cookie, и его запросы в
+    течение NEWS_REPLICA_STICKY_SECONDS тоже читают из основной базы.
+    Middleware работает и в синхронной, и в асинхронной цепочке: иначе
+    под ASGI Django обернул бы асинхронные представления в async_to_sync.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if asyncio.iscoroutinefunction(get_response):
+            self._is_coroutine = asyncio.coroutines._is_coroutine
+
+    def __call__(self, request):
+        if asyncio.iscoroutinefunction(self.get_response):
+            return self.__acall__(request)
+        token = self.start(request)
+        try:
+            response = self.get_response(request)
+        finally:
+            use_primary.reset(token)
+        return self.finish(request, response)
+
+    async def __acall__(self, request):
+        token = self.start(request)
+        try:
+            response = await self.get_response(request)
+        finally:
+            use_primary.reset(token)
+        return self.finish(request, response)
+
+    def start(self, request):
+        return use_primary.set(
+            request.method not in SAFE_METHODS
+            or STICKY_COOKIE in request.COOKIES
+        )
+
+    def finish(self, request, response):
+        if (
+            request.method not in SAFE_METHODS
+            and settings.NEWS_REPLICA_DATABASES
+        ):
+            response.set_cookie(
+                STICKY_COOKIE, '1',
+                max_age=settings.NEWS_REPLICA_STICKY_SECONDS,
+                httponly=True, samesite='Lax',
+            )
+        return response
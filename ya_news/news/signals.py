@@ -0,0 +1,56 @@
+from django.db.backends.signals import connection_created
+from django.db.models import F
+from django.db.models.functions import Greatest
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from django.utils import timezone
+
+from ya_common.sqlite import apply_sqlite_pragmas
+
+from .cache import invalidate_detail, invalidate_home
+from .models import Comment, News
+
+
+@receiver(post_save, sender=Comment)
+def update_news_on_comment_save(sender, instance, created, **kwargs):
+    """
+    Обновляем время изменения новости при сохранении комментария.
+
+    При создании комментария заодно увеличиваем счётчик комментариев.
+    """
+    changes = {'updated': timezone.now()}
+    if created:
+        changes['comments_count'] = F('comments_count') + 1
+    News.objects.filter(pk=instance.news_id).update(**changes)
+
+
+@receiver(post_delete, sender=Comment)
+def update_news_on_comment_delete(sender, instance, **kwargs):
+    """
+    Уменьшаем счётчик комментариев новости при удалении комментария.
+
+    Время изменения новости тоже обновляем.
+    """
+    News.objects.filter(pk=instance.news_id).update(
+        comments_count=Greatest(F('comments_count') - 1, 0),
+        updated=timezone.now(),
+    )
+
+
+@receiver(post_save, sender=Comment)
+@receiver(post_delete, sender=Comment)
+def invalidate_comment_pages(sender, instance, **kwargs):
+    """Сбрасываем кэш страниц, на которых виден комментарий."""
+    invalidate_detail(instance.news_id)
+    invalidate_home()
+
+
+@receiver(post_save, sender=News)
+@receiver(post_delete, sender=News)
+def invalidate_news_pages(sender, instance, **kwargs):
+    """Сбрасываем кэш страниц, на которых видна новость."""
+    invalidate_detail(instance.pk)
+    invalidate_home()
+
+
+connection_created.connect(apply_sqlite_pragmas)
@@ -1,12 +1,45 @@
+from django.conf import settings
 from django.urls import path
 
-from news import views
+from news import async_views, feeds, views
 
 app_name = 'news'
 
+if settings.NEWS_ASYNC_VIEWS:
+    home_view = async_views.news_list
+    detail_view = async_views.news_detail
+else:
+    home_view = views.NewsList.as_view()
+    detail_view = views.NewsDetailView.as_view()
+
 urlpatterns = [
-    path('', views.NewsList.as_view(), name='home'),
-    path('news/<int:pk>/', views.NewsDetailView.as_view(), name='detail'),
+    path('', home_view, name='home'),
+    path(
+        'feeds/news.rss',
+        feeds.LatestNewsFeed(),
+        name='feed_rss'
+    ),
+    path(
+        'feeds/news.atom',
+        feeds.LatestNewsAtomFeed(),
+        name='feed_atom'
+    ),
+    path(
+        'feeds/news.json',
+        feeds.NewsJsonFeed.as_view(),
+        name='feed_json'
+    ),
+    path(
+        'feeds/comments.rss',
+        feeds.LatestCommentsFeed(),
+        name='feed_comments'
+    ),
+    path('news/<int:pk>/', detail_view, name='detail'),
+    path(
+        'news/<int:pk>/comments/',
+        views.NewsComments.as_view(),
+        name='comments'
+    ),
     path(
         'delete_comment/<int:pk>/',
         views.CommentDelete.as_view(),
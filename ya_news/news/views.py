@@ -1,39 +1,168 @@
+import hashlib
+
 from django.conf import settings
 from django.contrib.auth.mixins import LoginRequiredMixin
+from django.db.models import OuterRef, Subquery
+from django.http import Http404
+from django.middleware.csrf import get_token
 from django.shortcuts import get_object_or_404
-from django.urls import reverse
+from django.utils.decorators import method_decorator
 from django.views import generic
+from django.views.decorators.http import condition
 
+from .buffer import comment_buffer
+from .cache import (
+    CachedPageMixin, get_detail_last_modified, get_detail_version,
+    get_home_version, invalidate_comment_fragment, render_comment_fragments
+)
 from .forms import CommentForm
+from .jobs import render_comment_fragment
 from .models import Comment, News
+from .pagination import get_comment_url, get_comments_page
+from .routers import PrimaryDatabaseMixin, reads_from_replica
+
+
+class PageCacheContextMixin:
+    """
+    Добавляет в контекст параметры кэширования фрагментов.
+
+    Страница, прочитанная из реплики, берёт готовые фрагменты из кэша,
+    но не сохраняет свои: реплика может отставать от версии в ключе.
+    """
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context['cache_alias'] = settings.NEWS_CACHE_ALIAS
+        context['cache_timeout'] = (
+            0 if reads_from_replica() else settings.NEWS_CACHE_TIMEOUT
+        )
+        return context
+
+
+class NewsPageCacheContextMixin(PageCacheContextMixin):
+    """Добавляет в контекст версию кэша страницы новости."""
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context['detail_version'] = get_detail_version(self.object.pk)
+        return context
 
 
-class NewsList(generic.ListView):
+class NewsList(CachedPageMixin, PageCacheContextMixin, generic.ListView):
     """Список новостей."""
     model = News
     template_name = 'news/home.html'
 
+    def get_page_cache_key(self):
+        return f'news:page:home:{get_home_version()}'
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context['home_version'] = get_home_version()
+        return context
+
     def get_queryset(self):
         """
         Выводим только несколько последних новостей.
 
         Их количество определяется в настройках проекта.
         """
-        return self.model.objects.prefetch_related(
-            'comment_set'
-        )[:settings.NEWS_COUNT_ON_HOME_PAGE]
+        return self.model.objects.all()[:settings.NEWS_COUNT_ON_HOME_PAGE]
+
+
+class CommentsPageMixin:
+    """Добавляет в контекст страницу комментариев к новости."""
+
+    def get_comments_page(self):
+        try:
+            return get_comments_page(
+                self.kwargs['pk'], self.request.GET.get('cursor')
+            )
+        except ValueError:
+            raise Http404('Некорректный курсор.')
+
+    def get_pending_comments(self):
+        """
+        Комментарии пользователя, ещё ждущие в очереди на сохранение.
+
+        Они показываются в конце ветки, то есть на её последней странице.
+        """
+        user = self.request.user
+        if not (settings.NEWS_COMMENT_BUFFER and user.is_authenticated):
+            return []
+        return comment_buffer.get_pending(self.kwargs['pk'], user.pk)
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        comments, context['next_cursor'] = self.get_comments_page()
+        if context['next_cursor'] is None:
+            comments += self.get_pending_comments()
+        context['comments'] = render_comment_fragments(
+            comments, self.request
+        )
+        return context
+
+
+def query_news_last_modified(pk):
+    """Время изменения новости или свежего комментария к ней."""
+    latest_comment = Comment.objects.filter(
+        news=OuterRef('pk')
+    ).order_by('-created').values('created')[:1]
+    row = News.objects.filter(pk=pk).order_by().values('updated').annotate(
+        comment=Subquery(latest_comment)
+    ).first()
+    if row is None:
+        return None
+    return max(filter(None, (row['updated'], row['comment'])))
+
+
+def get_news_last_modified(request, pk):
+    return get_detail_last_modified(pk, query_news_last_modified)
+
 
+def get_news_etag(request, pk):
+    """
+    Значение ETag для страницы новости.
 
-class NewsDetail(generic.DetailView):
+    Версия страницы меняется с каждым изменением новости и её
+    комментариев. Авторизованный пользователь видит на странице свои
+    ссылки и форму с CSRF-токеном, поэтому для него ETag свой.
+    """
+    parts = [pk, get_detail_version(pk)]
+    if request.user.is_authenticated:
+        # Токен выдаётся до рендеринга, чтобы ETag первого ответа
+        # совпал с ETag следующего запроса с cookie.
+        get_token(request)
+        parts += [request.user.pk, request.META['CSRF_COOKIE']]
+        if settings.NEWS_COMMENT_BUFFER:
+            parts.append(len(comment_buffer.get_pending(pk, request.user.pk)))
+    return hashlib.md5(':'.join(map(str, parts)).encode()).hexdigest()
+
+
+@method_decorator(
+    condition(
+        etag_func=get_news_etag, last_modified_func=get_news_last_modified
+    ),
+    name='get'
+)
+class NewsDetail(
+        CachedPageMixin,
+        NewsPageCacheContextMixin,
+        CommentsPageMixin,
+        generic.DetailView
+):
     model = News
     template_name = 'news/detail.html'
 
-    def get_object(self, queryset=None):
-        obj = get_object_or_404(
-            self.model.objects.prefetch_related('comment_set__author'),
-            pk=self.kwargs['pk']
+    def get_page_cache_key(self):
+        pk = self.kwargs['pk']
+        return (
+            f'news:page:detail:{pk}:{get_detail_version(pk)}:'
+            f'{self.request.GET.get("cursor", "")}'
         )
-        return obj
+
+    def get_object(self, queryset=None):
+        return get_object_or_404(self.model, pk=self.kwargs['pk'])
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
@@ -42,8 +171,21 @@ class NewsDetail(generic.DetailView):
         return context
 
 
+class NewsComments(CommentsPageMixin, generic.TemplateView):
+    """Фрагмент со следующей страницей комментариев к новости."""
+    template_name = 'news/includes/comments.html'
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context['news_id'] = self.kwargs['pk']
+        return context
+
+
 class NewsComment(
         LoginRequiredMixin,
+        PrimaryDatabaseMixin,
+        NewsPageCacheContextMixin,
+        CommentsPageMixin,
         generic.detail.SingleObjectMixin,
         generic.FormView
 ):
@@ -59,12 +201,17 @@ class NewsComment(
         comment = form.save(commit=False)
         comment.news = self.object
         comment.author = self.request.user
-        comment.save()
+        buffered = (
+            settings.NEWS_COMMENT_BUFFER and comment_buffer.append(comment)
+        )
+        if not buffered:
+            comment.save()
+            render_comment_fragment.delay(comment_id=comment.pk)
+        self.comment = comment
         return super().form_valid(form)
 
     def get_success_url(self):
-        post = self.get_object()
-        return reverse('news:detail', kwargs={'pk': post.pk}) + '#comments'
+        return get_comment_url(self.comment)
 
 
 class NewsDetailView(generic.View):
@@ -78,15 +225,18 @@ class NewsDetailView(generic.View):
         return view(request, *args, **kwargs)
 
 
-class CommentBase(LoginRequiredMixin):
+class CommentBase(LoginRequiredMixin, PrimaryDatabaseMixin):
     """Базовый класс для работы с комментариями."""
     model = Comment
 
     def get_success_url(self):
-        comment = self.get_object()
-        return reverse(
-            'news:detail', kwargs={'pk': comment.news.pk}
-        ) + '#comments'
+        """
+        Адрес страницы с комментарием.
+
+        Комментарий уже загружен в self.object, в том числе перед его
+        удалением, поэтому повторно он не запрашивается.
+        """
+        return get_comment_url(self.object)
 
     def get_queryset(self):
         """Пользователь может работать только со своими комментариями."""
@@ -98,6 +248,14 @@ class CommentUpdate(CommentBase, generic.UpdateView):
     template_name = 'news/edit.html'
     form_class = CommentForm
 
+    def get_queryset(self):
+        # Имя автора входит в ключ фрагмента, удаляемого при правке.
+        return super().get_queryset().select_related('author')
+
+    def form_valid(self, form):
+        invalidate_comment_fragment(self.object)
+        return super().form_valid(form)
+
 
 class CommentDelete(CommentBase, generic.DeleteView):
     """Удаление комментария."""
@@ -1,9 +1,15 @@
+import os
+import sys
 from pathlib import Path
 
 from django.urls import reverse_lazy
 
 BASE_DIR = Path(__file__).resolve().parent.parent
 
+# Общий для проектов пакет ya_common лежит рядом с ними.
+if str(BASE_DIR.parent) not in sys.path:
+    sys.path.append(str(BASE_DIR.parent))
+
 SECRET_KEY = 'django-insecure-7)dgs++2!#==aye4rd=5)c)bw0eokiyqx0hts6#t80!$c&$s+('
 
 DEBUG = True
@@ -22,6 +28,7 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
+    'news.routers.PrimaryStickinessMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
@@ -30,6 +37,17 @@ MIDDLEWARE = [
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
 
+# Профилирование доли запросов (ya_common/profiling.py), по умолчанию
+# выключено. Перцентили доступны персоналу по адресу /profiling/.
+PROFILING_SAMPLE_RATE = float(
+    os.environ.get('YANEWS_PROFILING_SAMPLE_RATE', 0)
+)
+PROFILING_WINDOW = 1000
+# Префикс имён метрик в формате Prometheus.
+PROFILING_METRIC_PREFIX = 'yanews'
+if PROFILING_SAMPLE_RATE:
+    MIDDLEWARE.insert(0, 'ya_common.profiling.ProfilingMiddleware')
+
 ROOT_URLCONF = 'yanews.urls'
 
 TEMPLATES = [
@@ -58,6 +76,51 @@ DATABASES = {
     }
 }
 
+# Профиль базы данных: 'default' или 'production'. В боевом профиле
+# соединения переиспользуются между запросами, пишущий процесс не
+# блокирует читающих (WAL), а при занятой базе соединение ждёт
+# освобождения блокировки, а не падает сразу.
+DATABASE_PROFILE = os.environ.get('YANEWS_DATABASE_PROFILE', 'default')
+
+# PRAGMA, выполняемые при открытии каждого соединения с SQLite.
+SQLITE_PRAGMAS = {}
+
+if DATABASE_PROFILE == 'production':
+    DATABASES['default'].update(
+        CONN_MAX_AGE=int(os.environ.get('YANEWS_CONN_MAX_AGE', 600)),
+        OPTIONS={
+            # Время ожидания блокировки базы, секунды.
+            'timeout': float(os.environ.get('YANEWS_DATABASE_TIMEOUT', 20)),
+        },
+    )
+    SQLITE_PRAGMAS = {
+        'journal_mode': 'WAL',
+        'synchronous': 'NORMAL',
+        'mmap_size': 256 * 1024 * 1024,
+        # Отрицательное значение задаёт размер кеша в килобайтах.
+        'cache_size': -64 * 1024,
+        'temp_store': 'MEMORY',
+    }
+
+# Реплики для чтения новостей: пути к копиям базы SQLite через запятую.
+# Реплики наполняются репликацией извне, миграции к ним не применяются.
+NEWS_REPLICA_DATABASES = []
+for number, path in enumerate(
+    filter(None, os.environ.get('YANEWS_REPLICAS', '').split(',')), 1
+):
+    alias = f'replica{number}'
+    DATABASES[alias] = {
+        **DATABASES['default'],
+        'NAME': path,
+        'TEST': {'MIRROR': 'default'},
+    }
+    NEWS_REPLICA_DATABASES.append(alias)
+
+DATABASE_ROUTERS = ['news.routers.ReplicaRouter']
+
+# Сколько секунд после записи пользователь читает из основной базы.
+NEWS_REPLICA_STICKY_SECONDS = 10
+
 
 AUTH_PASSWORD_VALIDATORS = []
 
@@ -80,3 +143,60 @@ LOGIN_URL = reverse_lazy('users:login')
 LOGIN_REDIRECT_URL = reverse_lazy('news:home')
 
 NEWS_COUNT_ON_HOME_PAGE = 10
+
+COMMENTS_COUNT_ON_PAGE = 50
+
+NEWS_FEED_SIZE = 20
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        # Кроме страниц в кэше лежат фрагменты комментариев, и окупаются
+        # они только из заполненного кэша: на ветке из 10 тыс.
+        # комментариев (benchmarks/comment_fragments.py) фрагменты с
+        # пустым кэшем рендерятся в 1,7 раза медленнее общего цикла, с
+        # полным — в 2 раза быстрее. В стандартные 300 записей такая
+        # ветка не помещается и всегда рендерится медленнее общего цикла.
+        # 100 тыс. записей — десяток таких веток; фрагмент занимает от
+        # 150 байт до 1 КБ, так что кэш процесса не превысит ~100 МБ.
+        'OPTIONS': {'MAX_ENTRIES': 100_000},
+    }
+}
+
+NEWS_CACHE_ALIAS = 'default'
+NEWS_CACHE_TIMEOUT = 60 * 5
+# Время жизни ключа версии страниц. Оно должно быть больше
+# NEWS_CACHE_TIMEOUT: истёкшая версия сменится на новую, и записи под
+# старой станут недоступны раньше срока.
+NEWS_CACHE_VERSION_TIMEOUT = 60 * 60
+# Фрагмент комментария не устаревает: после правки у него новый ключ.
+NEWS_COMMENT_FRAGMENT_TIMEOUT = 60 * 60 * 24
+
+# Файл со словарём запрещённых слов: по слову на строке.
+NEWS_BAD_WORDS_FILE = None
+# Как часто, в секундах, проверять, не изменился ли файл словаря.
+NEWS_BAD_WORDS_CHECK_INTERVAL = 5
+
+# Очередь комментариев, сохраняемая пачками в фоновом потоке, для
+# новостей с большим потоком комментариев (news/buffer.py). Очередь
+# хранится в памяти процесса и сохраняется при штатном завершении; при
+# падении процесса или SIGKILL теряются комментарии за последние
+# NEWS_COMMENT_BUFFER_DELAY секунд, но не больше
+# NEWS_COMMENT_BUFFER_MAX_SIZE. Когда очередь полна, комментарий
+# сохраняется сразу.
+NEWS_COMMENT_BUFFER = False
+NEWS_COMMENT_BUFFER_DELAY = 0.5
+NEWS_COMMENT_BUFFER_BATCH_SIZE = 500
+NEWS_COMMENT_BUFFER_MAX_SIZE = 5000
+
+# Фоновые задачи после записи (ya_common/jobs.py, news/jobs.py).
+NEWS_JOBS_EAGER = False
+NEWS_JOBS_MAX_WORKERS = 2
+NEWS_JOBS_MAX_ATTEMPTS = 5
+NEWS_JOBS_RETRY_DELAY = 10
+# Через сколько секунд незавершённую задачу можно забрать снова.
+NEWS_JOBS_TIMEOUT = 60 * 5
+
+# Асинхронные главная страница и страница новости для работы под ASGI.
+NEWS_ASYNC_VIEWS = False
+NEWS_ASYNC_MAX_WORKERS = 8
@@ -0,0 +1,20 @@
+"""
+Бенчмарки проекта YaNote.
+
+Запускаются из директории ya_note командой `python -m benchmarks.<имя>`.
+"""
+import sys
+from functools import partial
+from pathlib import Path
+
+# Общий для проектов пакет ya_common лежит рядом с ними; настройки
+# проекта добавят его в sys.path только в setup(), а обвязка бенчмарков
+# нужна раньше.
+COMMON_DIR = str(Path(__file__).resolve().parent.parent.parent)
+if COMMON_DIR not in sys.path:
+    sys.path.append(COMMON_DIR)
+
+from ya_common import bench  # noqa: E402
+
+setup = partial(bench.setup, 'yanote')
+throughput = bench.throughput
@@ -0,0 +1,84 @@
+"""
+Импорт заметок через массовый API и по одной через форму.
+
+Массовый импорт загружает все заметки пачками по NOTES_BULK_MAX_ITEMS;
+импорт по одной заметке выполняется для небольшой выборки, и время
+для полного объёма оценивается по её скорости.
+
+    python -m benchmarks.bulk_import [--notes 50000] [--sample 500]
+"""
+import argparse
+import json
+import random
+import time
+
+from . import setup
+
+setup(temporary_database=True)
+
+from django.conf import settings  # noqa: E402
+from django.contrib.auth import get_user_model  # noqa: E402
+from django.test import Client  # noqa: E402
+from django.urls import reverse  # noqa: E402
+
+from notes.models import Note  # noqa: E402
+
+User = get_user_model()
+
+TITLES = ('Покупки', 'Идеи', 'Встреча', 'Книги', 'Планы на неделю')
+
+
+def make_notes(count, rng):
+    """Заметки с повторяющимися заголовками и без slug."""
+    return [
+        {'title': rng.choice(TITLES), 'text': f'Текст заметки {i}'}
+        for i in range(count)
+    ]
+
+
+def import_bulk(client, notes):
+    url = reverse('notes:bulk_add')
+    batch_size = settings.NOTES_BULK_MAX_ITEMS
+    for start in range(0, len(notes), batch_size):
+        response = client.post(
+            url, json.dumps({'notes': notes[start:start + batch_size]}),
+            content_type='application/json'
+        )
+        assert not response.json()['errors']
+
+
+def import_one_by_one(client, notes):
+    url = reverse('notes:add')
+    for note in notes:
+        assert client.post(url, note).status_code == 302
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--notes', type=int, default=50_000)
+    parser.add_argument('--sample', type=int, default=500)
+    args = parser.parse_args()
+
+    # Заметки большой пачки не влезают в лимит тела запроса по умолчанию.
+    settings.DATA_UPLOAD_MAX_MEMORY_SIZE = None
+    rng = random.Random(0)
+    client = Client()
+    client.force_login(User.objects.create(username='importer'))
+
+    started = time.perf_counter()
+    import_one_by_one(client, make_notes(args.sample, rng))
+    single_rate = args.sample / (time.perf_counter() - started)
+
+    started = time.perf_counter()
+    import_bulk(client, make_notes(args.notes, rng))
+    bulk_time = time.perf_counter() - started
+
+    print(f'Заметок: {args.notes}, в базе: {Note.objects.count()}')
+    print(f'По одной: {single_rate:.0f} заметок/с, на весь объём '
+          f'~{args.notes / single_rate:.0f} с (оценка по {args.sample})')
+    print(f'Пачками по {settings.NOTES_BULK_MAX_ITEMS}: {bulk_time:.1f} с, '
+          f'{args.notes / bulk_time:.0f} заметок/с')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,144 @@
+"""
+Нагрузка на все маршруты notes.urls на реалистичном объёме данных.
+
+База заполняется долей --scale от полного объёма: 1 млн заметок у
+10 тыс. пользователей. С --database заполненная база сохраняется в
+файле и используется повторно. Маршруты нагружаются
+драйверами client, wsgi и asgi (ya_common/drivers.py), каждый в
+отдельном процессе; для маршрута выводятся запросы в секунду,
+перцентили задержки, память на запрос и ошибки, для процесса — пик
+памяти.
+
+Страницы добавления, редактирования и удаления заметки запрашиваются
+методом GET. Массовое добавление получает настоящую заметку и создаёт
+её, заметки с заголовком LOAD_TITLE удаляются после прогона каждого
+драйвера; массовому изменению и удалению передаются пачки, которые
+ничего не меняют: заметка с прежним текстом и несуществующий slug.
+Запись одной заметки измеряют бенчмарки note_create и bulk_import.
+
+С --save-baseline результаты сохраняются в JSON, с --baseline —
+сравниваются с сохранёнными, и при регрессии больше --tolerance
+команда завершается с ошибкой.
+
+    python -m benchmarks.load [--scale 0.01] [--database load.sqlite3]
+        [--drivers client wsgi asgi] [--seconds 1] [--concurrency 4]
+        [--baseline load.json] [--save-baseline load.json]
+"""
+import json
+from urllib.parse import urlencode
+
+from ya_common.bench import LoadBenchmark
+from ya_common.drivers import Route, get_session_cookies
+
+FULL_VOLUME = {
+    'users': 10_000,
+    'notes': 1_000_000,
+}
+BATCH_SIZE = 10_000
+# Сколько разных заметок перебирает маршрут.
+PATHS_COUNT = 20
+# Заголовок заметок, которые создаёт массовое добавление.
+LOAD_TITLE = 'Нагрузка'
+TITLES = ('Покупки', 'Идеи', 'Встреча', 'Книги', 'Планы на неделю')
+WORDS = (
+    'молоко хлеб звонок отчёт письмо встреча книга фильм поездка '
+    'подарок задача идея список врач ремонт'
+).split()
+
+
+class NotesLoad(LoadBenchmark):
+    """Нагрузка на маршруты YaNote."""
+    project = 'yanote'
+    full_volume = FULL_VOLUME
+
+    def has_data(self):
+        from notes.models import Note
+
+        return Note.objects.exists()
+
+    def seed(self, volume, rng):
+        """Заполняет базу и поисковый индекс."""
+        from django.contrib.auth import get_user_model
+
+        from notes.models import Note
+        from notes.search import rebuild_index
+
+        User = get_user_model()
+        User.objects.bulk_create(
+            (User(username=f'user{i}') for i in range(volume['users'])),
+            batch_size=BATCH_SIZE,
+        )
+        user_ids = list(User.objects.values_list('pk', flat=True))
+        for start in range(0, volume['notes'], BATCH_SIZE):
+            stop = min(start + BATCH_SIZE, volume['notes'])
+            Note.objects.bulk_create(
+                Note(
+                    title=rng.choice(TITLES),
+                    text=' '.join(rng.choices(WORDS, k=20)),
+                    slug=f'note-{i}',
+                    author_id=user_ids[i % len(user_ids)],
+                )
+                for i in range(start, stop)
+            )
+        rebuild_index()
+
+    def get_routes(self):
+        from django.contrib.auth import get_user_model
+        from django.urls import reverse
+
+        from notes.models import Note
+
+        author = get_user_model().objects.order_by('pk').first()
+        cookies = get_session_cookies(author)
+        notes = list(Note.objects.filter(author=author)[:PATHS_COUNT])
+        note = notes[0]
+
+        def paths(name):
+            return [reverse(name, args=(note.slug,)) for note in notes]
+
+        def bulk(name, payload):
+            return Route(
+                name, [reverse(name)], method='POST',
+                body=json.dumps(payload).encode(),
+                content_type='application/json', cookies=cookies,
+            )
+
+        return [
+            Route('notes:home', [reverse('notes:home')]),
+            Route('notes:add', [reverse('notes:add')], cookies=cookies),
+            Route('notes:edit', paths('notes:edit'), cookies=cookies),
+            Route('notes:detail', paths('notes:detail'), cookies=cookies),
+            Route('notes:delete', paths('notes:delete'), cookies=cookies),
+            Route('notes:list', [reverse('notes:list')], cookies=cookies),
+            Route(
+                'notes:search',
+                [
+                    f'{reverse("notes:search")}?{urlencode({"q": word})}'
+                    for word in WORDS
+                ],
+                cookies=cookies,
+            ),
+            bulk('notes:bulk_add', {'notes': [
+                {'title': LOAD_TITLE, 'text': ' '.join(WORDS[:5])}
+            ]}),
+            bulk('notes:bulk_edit', {'notes': [
+                {'slug': note.slug, 'changes': {'text': note.text}}
+            ]}),
+            bulk('notes:bulk_delete', {'slugs': ['no-such-note']}),
+            Route(
+                'notes:success', [reverse('notes:success')], cookies=cookies
+            ),
+        ]
+
+    def after_driver(self):
+        """Удаляет заметки, созданные массовым добавлением."""
+        from django.db import connection
+
+        from notes.models import Note
+
+        Note.objects.filter(title=LOAD_TITLE).delete()
+        connection.close()
+
+
+if __name__ == '__main__':
+    NotesLoad().main()
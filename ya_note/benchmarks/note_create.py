@@ -0,0 +1,78 @@
+"""
+Конкурентное создание заметок с одинаковым заголовком.
+
+Все потоки одновременно создают заметки без slug, поэтому каждая
+заметка сталкивается с уже занятым slug. Ожидается ноль ответов 500.
+
+    python -m benchmarks.note_create [--threads 16] [--notes 50]
+"""
+import argparse
+import threading
+import time
+from collections import Counter
+
+from . import setup
+
+setup(temporary_database=True)
+
+from django.contrib.auth import get_user_model  # noqa: E402
+from django.db import connection  # noqa: E402
+from django.test import Client  # noqa: E402
+from django.urls import reverse  # noqa: E402
+
+from notes.models import Note  # noqa: E402
+
+User = get_user_model()
+
+
+lock = threading.Lock()
+
+
+def worker(user, notes, barrier, statuses):
+    client = Client(raise_request_exception=False)
+    client.force_login(user)
+    url = reverse('notes:add')
+    barrier.wait()
+    for _ in range(notes):
+        response = client.post(url, {'title': 'Заметка', 'text': 'Текст'})
+        with lock:
+            statuses[response.status_code] += 1
+    connection.close()
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--threads', type=int, default=16)
+    parser.add_argument('--notes', type=int, default=50)
+    args = parser.parse_args()
+
+    users = [
+        User.objects.create(username=f'user{i}') for i in range(args.threads)
+    ]
+    statuses = Counter()
+    barrier = threading.Barrier(args.threads + 1)
+    threads = [
+        threading.Thread(
+            target=worker, args=(user, args.notes, barrier, statuses)
+        )
+        for user in users
+    ]
+    for thread in threads:
+        thread.start()
+    barrier.wait()
+    started = time.perf_counter()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+
+    total = args.threads * args.notes
+    print(f'Потоков: {args.threads}, запросов: {total}')
+    print(f'Время: {elapsed:.2f} с, {total / elapsed:.0f} заметок/с')
+    print(f'Ответы: {dict(statuses)}')
+    print(f'Заметок в базе: {Note.objects.count()}, '
+          f'уникальных slug: {Note.objects.values("slug").distinct().count()}')
+    print(f'Ответов 500: {statuses[500]}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,106 @@
+"""
+Задержка поиска по заметкам: индекс FTS5 против icontains.
+
+    python -m benchmarks.search [--notes 1000000] [--users 10]
+"""
+import argparse
+import itertools
+import random
+import statistics
+import time
+
+from . import setup
+
+setup(temporary_database=True)
+
+from django.contrib.auth import get_user_model  # noqa: E402
+from django.db.models import Q  # noqa: E402
+
+from notes.models import Note  # noqa: E402
+from notes.search import rebuild_index, search  # noqa: E402
+
+User = get_user_model()
+SYLLABLES = (
+    'ба ве ги до жу за ки ло му не по ру са те фу хи цо чу ша ще ю я '
+    'ан ер ил ок ум ыр ют ял'
+).split()
+VOCABULARY_SIZE = 50_000
+QUERIES_COUNT = 10
+BATCH_SIZE = 10_000
+
+
+def make_vocabulary(rng):
+    """
+    Словарь и накопленные веса слов.
+
+    Частоты слов убывают по закону Ципфа.
+    """
+    words = list({
+        ''.join(rng.choices(SYLLABLES, k=rng.randint(2, 4)))
+        for _ in range(VOCABULARY_SIZE)
+    })
+    weights = list(itertools.accumulate(
+        1 / rank for rank in range(1, len(words) + 1)
+    ))
+    return words, weights
+
+
+def seed(notes, users, rng, words, weights):
+    authors = [
+        User.objects.create(username=f'user{i}') for i in range(users)
+    ]
+    for start in range(0, notes, BATCH_SIZE):
+        Note.objects.bulk_create(
+            Note(
+                title=' '.join(rng.choices(words, cum_weights=weights, k=3)),
+                text=' '.join(
+                    rng.choices(words, cum_weights=weights, k=30)
+                ),
+                slug=f'note-{number}',
+                author=authors[number % users],
+            )
+            for number in range(start, min(start + BATCH_SIZE, notes))
+        )
+    rebuild_index()
+    return authors[0]
+
+
+def icontains(queryset, query, author):
+    for word in query.split():
+        queryset = queryset.filter(
+            Q(title__icontains=word) | Q(text__icontains=word)
+        )
+    return queryset
+
+
+def measure(find, author, queries, repeat=5):
+    timings = []
+    queryset = Note.objects.filter(author=author)
+    for _ in range(repeat):
+        for query in queries:
+            started = time.perf_counter()
+            list(find(queryset, query, author).values_list('id')[:20])
+            timings.append((time.perf_counter() - started) * 1000)
+    return statistics.median(timings), max(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--notes', type=int, default=1_000_000)
+    parser.add_argument('--users', type=int, default=10)
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    words, weights = make_vocabulary(rng)
+    started = time.perf_counter()
+    author = seed(args.notes, args.users, rng, words, weights)
+    print(f'Заметок: {args.notes}, пользователей: {args.users}, '
+          f'заполнение: {time.perf_counter() - started:.1f} с')
+    queries = rng.sample(words, QUERIES_COUNT)
+    for name, find in (('FTS5', search), ('icontains', icontains)):
+        median, worst = measure(find, author, queries)
+        print(f'{name:>10}: медиана {median:.2f} мс, максимум {worst:.2f} мс')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,79 @@
+"""
+Создание заметки через форму с кешем slugify и без него.
+
+Заголовки выбираются из небольшого набора, как у типичных заметок
+вроде «Покупки» или «Идеи», поэтому кеш почти всегда попадает.
+Отдельно измеряется сама транслитерация: pytils, str.translate и кеш.
+Время создания заметки определяют запросы к базе, а прогоны идут по
+растущей таблице, поэтому разница между ними в пределах шума.
+
+    python -m benchmarks.slug_cache [--notes 2000]
+"""
+import argparse
+import itertools
+import time
+
+from . import setup, throughput
+
+setup(temporary_database=True)
+
+from django.contrib.auth import get_user_model  # noqa: E402
+from pytils.translit import slugify as pytils_slugify  # noqa: E402
+
+from notes import models  # noqa: E402
+from notes.forms import NoteForm  # noqa: E402
+from notes.slugs import (  # noqa: E402
+    clear_slugify_cache, get_slugify_stats, slugify, slugify_one,
+)
+
+User = get_user_model()
+
+TITLES = (
+    'Покупки', 'Идеи', 'Встреча с командой', 'Книги на лето',
+    'Планы на неделю', 'Съездить к бабушке', 'Рецепты', 'Фильмы',
+)
+
+
+def create_notes(author, count, prefix):
+    """
+    Заметок в секунду при создании через NoteForm.
+
+    Префикс заголовков у каждого прогона свой, чтобы прогоны одинаково
+    сталкивались с занятыми slug.
+    """
+    titles = itertools.cycle([f'{prefix} {title}' for title in TITLES])
+    started = time.perf_counter()
+    for i in range(count):
+        form = NoteForm(data={'title': next(titles), 'text': f'Текст {i}'})
+        assert form.is_valid()
+        form.instance.author = author
+        form.save()
+    return count / (time.perf_counter() - started)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--notes', type=int, default=2000)
+    args = parser.parse_args()
+
+    for name, func in (
+        ('pytils', pytils_slugify),
+        ('str.translate', slugify_one),
+        ('кеш', slugify),
+    ):
+        rate = throughput(lambda: [func(title) for title in TITLES])
+        print(f'{name}: {rate * len(TITLES):,.0f} заголовков/с')
+
+    author = User.objects.create(username='author')
+    clear_slugify_cache()
+    with_cache = create_notes(author, args.notes, 'С кешем')
+    models.slugify = pytils_slugify
+    without_cache = create_notes(author, args.notes, 'Без кеша')
+    models.slugify = slugify
+    print(f'Создание через форму, pytils: {without_cache:.0f} заметок/с')
+    print(f'Создание через форму, кеш: {with_cache:.0f} заметок/с')
+    print(f'Кеш: {get_slugify_stats()}')
+
+
+if __name__ == '__main__':
+    main()
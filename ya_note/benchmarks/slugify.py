@@ -0,0 +1,47 @@
+"""
+Генерация slug для пачки заголовков: slugify_many против slugify из
+pytils, вызываемого для каждого заголовка.
+
+    python -m benchmarks.slugify [--titles 10000]
+"""
+import argparse
+import random
+
+from . import setup, throughput
+
+setup()
+
+from pytils.translit import slugify  # noqa: E402
+
+from notes.slugs import slugify_many  # noqa: E402
+
+WORDS = (
+    'Покупки', 'идеи', 'встреча', 'книги', 'планы', 'на', 'неделю',
+    'съездить', 'к', 'бабушке', '&', '—', 'Ёлка', '2024', 'notes', '«цитата»',
+)
+
+
+def make_titles(count, rng):
+    return [
+        ' '.join(rng.choice(WORDS) for _ in range(rng.randint(1, 8)))
+        for _ in range(count)
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--titles', type=int, default=10_000)
+    args = parser.parse_args()
+
+    titles = make_titles(args.titles, random.Random(0))
+    assert slugify_many(titles) == [slugify(title) for title in titles]
+    single = throughput(lambda: [slugify(title) for title in titles])
+    batch = throughput(lambda: slugify_many(titles))
+    print(f'Заголовков в пачке: {args.titles}')
+    print(f'slugify по одному: {single * args.titles:,.0f} заголовков/с')
+    print(f'slugify_many: {batch * args.titles:,.0f} заголовков/с '
+          f'(x{batch / single:.1f})')
+
+
+if __name__ == '__main__':
+    main()
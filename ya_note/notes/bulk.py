@@ -0,0 +1,185 @@
+"""
+Массовое создание, изменение и удаление заметок.
+
+Каждая заметка проверяется формой NoteForm, как при работе с одной
+заметкой, но занятость slug для всей пачки проверяется одним запросом,
+а сохраняются заметки через bulk_create и bulk_update. Ошибки
+возвращаются для каждой заметки отдельно вместе с её номером в пачке;
+заметки без ошибок сохраняются.
+"""
+from operator import itemgetter
+
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+
+from .forms import WARNING, NoteForm
+from .models import Note
+from .search import index_notes
+from .slugs import SlugAllocator
+
+by_index = itemgetter(0)
+by_error_index = itemgetter('index')
+
+NOT_FOUND = 'Заметка не найдена.'
+NOT_AN_OBJECT = 'Ожидается объект с полями заметки.'
+DUPLICATE = 'Заметка уже есть в этой пачке.'
+CONFLICT = 'Slug заняли во время сохранения, повторите запрос.'
+
+
+def get_slug(item):
+    slug = item.get('slug')
+    return slug if isinstance(slug, str) else None
+
+
+def item_error(index, field, message):
+    return {'index': index, 'errors': {field: [message]}}
+
+
+def form_error(index, form):
+    return {
+        'index': index,
+        'errors': {
+            field: list(messages) for field, messages in form.errors.items()
+        }
+    }
+
+
+def assign_slugs(allocator, indexed_notes, errors):
+    """Проставляет slug заметкам; заметки с занятым slug отбрасывает."""
+    assigned = []
+    for index, note in indexed_notes:
+        if not note.slug:
+            note.slug = allocator.generate(note.title)
+        elif not allocator.claim(note.slug):
+            errors.append(item_error(index, 'slug', note.slug + WARNING))
+            continue
+        assigned.append((index, note))
+    return assigned
+
+
+def conflict(indexed_notes, errors):
+    """Пачку опередил другой запрос: ни одна заметка не сохранена."""
+    errors.extend(
+        item_error(index, 'slug', CONFLICT) for index, _ in indexed_notes
+    )
+    return []
+
+
+def create_notes(author, items):
+    """
+    Создаёт заметки автора.
+
+    Возвращает список созданных заметок с их номерами в пачке и список
+    ошибок.
+    """
+    errors = []
+    valid = []
+    for index, item in enumerate(items):
+        if not isinstance(item, dict):
+            errors.append(item_error(index, '__all__', NOT_AN_OBJECT))
+            continue
+        form = NoteForm(data=item)
+        if form.is_valid():
+            form.instance.author = author
+            valid.append((index, form.instance))
+        else:
+            errors.append(form_error(index, form))
+    created = assign_slugs(
+        SlugAllocator(note for _, note in valid), valid, errors
+    )
+    notes = [note for _, note in created]
+    try:
+        with transaction.atomic():
+            Note.objects.bulk_create(notes)
+            # SQLite не возвращает первичные ключи из bulk_create.
+            ids = dict(Note.objects.filter(
+                slug__in=[note.slug for note in notes]
+            ).values_list('slug', 'id'))
+            for note in notes:
+                note.pk = ids[note.slug]
+            index_notes(notes)
+    except IntegrityError:
+        created = conflict(created, errors)
+    return created, sorted(errors, key=by_error_index)
+
+
+def update_notes(author, items):
+    """
+    Изменяет заметки автора.
+
+    Элемент пачки — slug заметки и словарь changes с новыми значениями
+    полей формы. Возвращает список изменённых заметок с их номерами в
+    пачке и список ошибок.
+    """
+    errors = []
+    notes = Note.objects.filter(author=author, slug__in=[
+        get_slug(item) for item in items if isinstance(item, dict)
+    ]).in_bulk(field_name='slug')
+    seen = set()
+    valid = []
+    renamed = []
+    for index, item in enumerate(items):
+        if not isinstance(item, dict):
+            errors.append(item_error(index, '__all__', NOT_AN_OBJECT))
+            continue
+        note = notes.get(get_slug(item))
+        if note is None or note.pk in seen:
+            errors.append(item_error(
+                index, 'slug', DUPLICATE if note else NOT_FOUND
+            ))
+            continue
+        seen.add(note.pk)
+        original_slug = note.slug
+        changes = item.get('changes')
+        form = NoteForm(data={
+            'title': note.title,
+            'text': note.text,
+            'slug': note.slug,
+            **(changes if isinstance(changes, dict) else {}),
+        }, instance=note)
+        if not form.is_valid():
+            errors.append(form_error(index, form))
+        elif note.slug == original_slug:
+            valid.append((index, note))
+        else:
+            renamed.append((index, note))
+    updated = valid + assign_slugs(
+        SlugAllocator(note for _, note in renamed), renamed, errors
+    )
+    now = timezone.now()
+    for _, note in updated:
+        note.updated = now
+    notes = [note for _, note in updated]
+    try:
+        with transaction.atomic():
+            Note.objects.bulk_update(
+                notes, ('title', 'text', 'slug', 'updated')
+            )
+            index_notes(notes)
+    except IntegrityError:
+        updated = conflict(updated, errors)
+    return sorted(updated, key=by_index), sorted(errors, key=by_error_index)
+
+
+def delete_notes(author, slugs):
+    """
+    Удаляет заметки автора по slug.
+
+    Возвращает список удалённых slug с их номерами в пачке и список
+    ошибок.
+    """
+    slugs = [slug if isinstance(slug, str) else None for slug in slugs]
+    ids = dict(Note.objects.filter(
+        author=author, slug__in=[slug for slug in slugs if slug]
+    ).values_list('slug', 'id'))
+    errors = []
+    deleted = []
+    for index, slug in enumerate(slugs):
+        if ids.pop(slug, None) is None:
+            errors.append(item_error(index, 'slug', NOT_FOUND))
+        else:
+            deleted.append((index, slug))
+    Note.objects.filter(
+        author=author, slug__in=[slug for _, slug in deleted]
+    ).delete()
+    return deleted, errors
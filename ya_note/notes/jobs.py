@@ -0,0 +1,26 @@
+"""
+Фоновые задачи YaNote.
+
+Задачи выполняет общий ya_common.jobs.JobRunner с настройками
+NOTES_JOBS_*.
+"""
+from ya_common.jobs import JobRunner
+
+from .models import Job, Note
+from .search import index_notes, unindex_notes
+
+runner = JobRunner(Job, 'NOTES_JOBS')
+job = runner.job
+get_metrics = runner.get_metrics
+
+
+@job
+def reindex_note(note_id):
+    """Обновляет заметку в поисковом индексе или удаляет её оттуда."""
+    notes = list(
+        Note.objects.filter(pk=note_id).only('title', 'text', 'author_id')
+    )
+    if notes:
+        index_notes(notes)
+    else:
+        unindex_notes([note_id])
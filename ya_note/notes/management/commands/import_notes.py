@@ -0,0 +1,70 @@
+import json
+import sys
+from itertools import islice
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+
+from notes.bulk import create_notes
+
+User = get_user_model()
+
+
+def read_items(stream):
+    """Заметки из JSON Lines; строка с некорректным JSON даёт None."""
+    for line in stream:
+        if not line.strip():
+            continue
+        try:
+            yield json.loads(line)
+        except ValueError:
+            yield None
+
+
+class Command(BaseCommand):
+    help = (
+        'Импортирует заметки пользователя из файла JSON Lines: по объекту '
+        'с полями title, text и необязательным slug в каждой строке.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='Путь к файлу или - для stdin.')
+        parser.add_argument(
+            '--author', required=True, help='Имя пользователя-автора.'
+        )
+        parser.add_argument(
+            '--batch-size', type=int, default=settings.NOTES_BULK_MAX_ITEMS,
+            help='Сколько заметок сохранять за раз.'
+        )
+
+    def handle(self, *args, **options):
+        try:
+            author = User.objects.get(username=options['author'])
+        except User.DoesNotExist:
+            raise CommandError(
+                f'Пользователь {options["author"]} не найден.'
+            )
+        if options['path'] == '-':
+            return self.import_stream(sys.stdin, author, options)
+        with open(options['path'], encoding='utf-8') as stream:
+            return self.import_stream(stream, author, options)
+
+    def import_stream(self, stream, author, options):
+        items = read_items(stream)
+        batch_size = options['batch_size']
+        start = created_count = error_count = 0
+        while batch := list(islice(items, batch_size)):
+            created, errors = create_notes(author, batch)
+            created_count += len(created)
+            error_count += len(errors)
+            for error in errors:
+                self.stderr.write(
+                    f'Заметка {start + error["index"] + 1}: '
+                    + json.dumps(error['errors'], ensure_ascii=False)
+                )
+            start += len(batch)
+        self.stdout.write(self.style.SUCCESS(
+            f'Импортировано заметок: {created_count}, с ошибками: '
+            f'{error_count}'
+        ))
@@ -0,0 +1,13 @@
+from django.core.management.base import BaseCommand
+
+from notes.search import rebuild_index
+
+
+class Command(BaseCommand):
+    help = 'Перестраивает полнотекстовый индекс заметок.'
+
+    def handle(self, *args, **options):
+        count = rebuild_index()
+        self.stdout.write(
+            self.style.SUCCESS(f'Проиндексировано заметок: {count}')
+        )
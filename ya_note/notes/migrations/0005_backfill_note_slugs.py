@@ -0,0 +1,127 @@
+"""
+Генерирует slug заметкам, сохранённым без него в обход save().
+
+Алгоритм — копия notes/slugs.py на момент миграции: код приложения
+может измениться, а миграция должна давать тот же результат, что
+и SlugAllocator, по которому она написана.
+"""
+import re
+from collections import Counter
+
+from django.db import migrations
+from django.db.models import IntegerField, Max
+from django.db.models.functions import Cast, Substr
+from pytils.translit import ALPHABET, translify
+
+# Кандидатов в пачке не больше, чем заметок, так что запрос занятых
+# укладывается в 999 параметров SQLite.
+BATCH_SIZE = 500
+SEPARATOR = '\x00'
+SEPARATOR_STANDIN = '\x01'
+AMPERSAND = re.compile(r'&amp;|&')
+SPACES = re.compile(r'[-\s]+')
+NOT_SLUG = re.compile(r'[^\w\s-]')
+
+
+class TranslationTable(dict):
+
+    def __missing__(self, key):
+        return None
+
+
+TRANSLATION = TranslationTable(
+    (ord(symbol), NOT_SLUG.sub('', translify(symbol)).lower())
+    for symbol in ALPHABET if len(symbol) == 1
+)
+TRANSLATION[ord(SEPARATOR)] = SEPARATOR
+
+
+def slugify_many(titles):
+    text = SEPARATOR.join(
+        str(title).lower().replace(SEPARATOR, SEPARATOR_STANDIN)
+        for title in titles
+    )
+    text = SPACES.sub('-', AMPERSAND.sub(' and ', text))
+    return text.translate(TRANSLATION).split(SEPARATOR)
+
+
+def max_slug_suffix(Note, base):
+    number = Note.objects.filter(
+        slug__gt=f'{base}-',
+        slug__lt=f'{base}.',
+        slug__regex=rf'^{re.escape(base)}-[0-9]+$',
+    ).aggregate(
+        number=Max(Cast(Substr('slug', len(base) + 2), IntegerField()))
+    )['number']
+    return max(number or 1, 1)
+
+
+def allocate_slugs(Note, notes, max_length):
+    """
+    Проставляет slug пачке заметок без slug.
+
+    Основы считаются одним вызовом slugify_many, занятые кандидаты —
+    основа и её варианты с суффиксами -2 … -N для N повторов в пачке —
+    выбираются одним запросом; наибольший суффикс запрашивается, только
+    если все кандидаты основы заняты.
+    """
+    def with_suffix(base, number):
+        suffix = f'-{number}'
+        return base[:max_length - len(suffix)] + suffix
+
+    titles = Counter(note.title for note in notes)
+    bases = {
+        title: base[:max_length]
+        for title, base in zip(titles, slugify_many(list(titles)))
+    }
+    counts = Counter()
+    for title, count in titles.items():
+        counts[bases[title]] += count
+    checked = set()
+    for base, count in counts.items():
+        checked.add(base)
+        checked.update(
+            with_suffix(base, number) for number in range(2, count + 1)
+        )
+    taken = set(Note.objects.filter(
+        slug__in=checked
+    ).values_list('slug', flat=True))
+    suffixes = {}
+    looked_up = set()
+    for note in notes:
+        base = slug = bases[note.title]
+        number = suffixes.get(base, 1)
+        while slug in taken or not (slug in checked or base in looked_up):
+            if slug not in taken:
+                number = max(number - 1, max_slug_suffix(Note, base))
+                looked_up.add(base)
+            number += 1
+            slug = with_suffix(base, number)
+        suffixes[base] = number
+        taken.add(slug)
+        note.slug = slug
+
+
+def backfill_slugs(apps, schema_editor):
+    Note = apps.get_model('notes', 'Note')
+    max_length = Note._meta.get_field('slug').max_length
+    pks = list(Note.objects.filter(slug='').order_by('pk').values_list(
+        'pk', flat=True
+    ))
+    for start in range(0, len(pks), BATCH_SIZE):
+        notes = list(Note.objects.filter(
+            pk__in=pks[start:start + BATCH_SIZE]
+        ).order_by('pk').only('title', 'slug'))
+        allocate_slugs(Note, notes, max_length)
+        Note.objects.bulk_update(notes, ('slug',))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('notes', '0004_note_updated'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_slugs, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 3.2.15 on 2026-10-18 19:44
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('notes', '0006_job'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='note',
+            name='note_author_id_idx',
+        ),
+    ]
@@ -1,7 +1,11 @@
 from django.conf import settings
-from django.db import models
+from django.db import IntegrityError, models, transaction
 
-from pytils.translit import slugify
+from ya_common.jobs import AbstractJob
+
+from .slugs import max_slug_suffix, slugify
+
+SLUG_ATTEMPTS = 10
 
 
 class Note(models.Model):
@@ -27,12 +31,48 @@ class Note(models.Model):
         settings.AUTH_USER_MODEL,
         on_delete=models.CASCADE,
     )
+    updated = models.DateTimeField(auto_now=True)
 
     def __str__(self):
         return self.title
 
     def save(self, *args, **kwargs):
-        if not self.slug:
-            max_slug_length = self._meta.get_field('slug').max_length
-            self.slug = slugify(self.title)[:max_slug_length]
-        super().save(*args, **kwargs)
+        """
+        Сохраняет заметку, при необходимости генерируя slug из заголовка.
+
+        Уникальность slug проверяет база данных: если сгенерированный slug
+        уже занят, к нему добавляется суффикс -2, -3 и т. д.
+        """
+        if self.slug:
+            return super().save(*args, **kwargs)
+        max_slug_length = self._meta.get_field('slug').max_length
+        base = slugify(self.title)[:max_slug_length]
+        self.slug = base
+        for attempt in range(1, SLUG_ATTEMPTS + 1):
+            try:
+                with transaction.atomic():
+                    return super().save(*args, **kwargs)
+            except IntegrityError:
+                if attempt == SLUG_ATTEMPTS or not self.slug_taken():
+                    raise
+                self.slug = self.next_slug(base, attempt)
+
+    def slug_taken(self):
+        return Note.objects.filter(
+            slug=self.slug
+        ).exclude(pk=self.pk).exists()
+
+    @classmethod
+    def max_slug_suffix(cls, base):
+        """Наибольший числовой суффикс среди занятых slug вида base-N."""
+        return max_slug_suffix(cls, base)
+
+    def next_slug(self, base, attempt):
+        """Slug с суффиксом, следующим за уже занятыми."""
+        max_slug_length = self._meta.get_field('slug').max_length
+        suffix = f'-{self.max_slug_suffix(base) + attempt}'
+        return base[:max_slug_length - len(suffix)] + suffix
+
+
+class Job(AbstractJob):
+    """Отложенная задача, см. ya_common/jobs.py."""
@@ -0,0 +1,90 @@
+"""
+Полнотекстовый поиск по заметкам.
+
+Индекс хранится в виртуальной таблице SQLite FTS5 и обновляется
+обработчиками сохранения и удаления заметок; при сохранении — отложенной
+задачей reindex_note. На других СУБД поиск
+выполняется обычным icontains.
+"""
+import re
+
+from django.db import connection
+from django.db.models import Q
+from django.db.models.expressions import RawSQL
+
+TABLE = 'notes_note_fts'
+WORD = re.compile(r'\w+')
+
+
+def is_available():
+    return connection.vendor == 'sqlite'
+
+
+def get_words(query):
+    return WORD.findall(query or '')
+
+
+def to_match_query(words):
+    """Поиск заметок, где есть все слова запроса, как префиксы."""
+    return ' '.join(f'"{word}"*' for word in words)
+
+
+def index_notes(notes):
+    """Добавляет заметки в индекс или обновляет их."""
+    if not is_available():
+        return
+    rows = [(note.pk, note.title, note.text, note.author_id) for note in notes]
+    with connection.cursor() as cursor:
+        cursor.executemany(
+            f'DELETE FROM {TABLE} WHERE rowid = %s',
+            [(row[0],) for row in rows]
+        )
+        cursor.executemany(
+            f'INSERT INTO {TABLE} (rowid, title, text, author_id) '
+            'VALUES (%s, %s, %s, %s)',
+            rows
+        )
+
+
+def unindex_notes(note_ids):
+    """Удаляет заметки из индекса."""
+    if not is_available():
+        return
+    with connection.cursor() as cursor:
+        cursor.executemany(
+            f'DELETE FROM {TABLE} WHERE rowid = %s',
+            [(note_id,) for note_id in note_ids]
+        )
+
+
+def rebuild_index():
+    """Перестраивает индекс по таблице заметок. Возвращает число заметок."""
+    if not is_available():
+        return 0
+    with connection.cursor() as cursor:
+        cursor.execute(f'DELETE FROM {TABLE}')
+        cursor.execute(
+            f'INSERT INTO {TABLE} (rowid, title, text, author_id) '
+            'SELECT id, title, text, author_id FROM notes_note'
+        )
+        cursor.execute(f"INSERT INTO {TABLE} ({TABLE}) VALUES ('optimize')")
+        cursor.execute(f'SELECT COUNT(*) FROM {TABLE}')
+        return cursor.fetchone()[0]
+
+
+def search(queryset, query, author):
+    """Заметки автора из queryset, подходящие под поисковый запрос."""
+    words = get_words(query)
+    if not words:
+        return queryset.none()
+    if not is_available():
+        for word in words:
+            queryset = queryset.filter(
+                Q(title__icontains=word) | Q(text__icontains=word)
+            )
+        return queryset
+    return queryset.filter(id__in=RawSQL(
+        f'SELECT rowid FROM {TABLE} WHERE {TABLE} MATCH %s '
+        'AND author_id = %s',
+        (to_match_query(words), author.pk)
+    ))
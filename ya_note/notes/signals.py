@@ -0,0 +1,29 @@
+from django.db.backends.signals import connection_created
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from ya_common.sqlite import apply_sqlite_pragmas
+
+from .jobs import reindex_note
+from .models import Note
+from .search import unindex_notes
+
+
+@receiver(post_save, sender=Note)
+def index_note(sender, instance, **kwargs):
+    """
+    Обновление поискового индекса при сохранении заметки откладываем.
+
+    Так сохранение заметки в NoteCreate и NoteUpdate не ждёт записи в
+    индекс FTS5.
+    """
+    reindex_note.delay(note_id=instance.pk)
+
+
+@receiver(post_delete, sender=Note)
+def unindex_note(sender, instance, **kwargs):
+    """Удаляем заметку из поискового индекса."""
+    unindex_notes([instance.pk])
+
+
+connection_created.connect(apply_sqlite_pragmas)
@@ -0,0 +1,222 @@
+"""
+Генерация slug для заметок пачками.
+
+slugify из pytils обрабатывает заголовок посимвольно и ищет каждый
+символ в списке допустимых, поэтому для больших пачек заметно медленнее
+одного вызова str.translate. Здесь все заголовки пачки склеиваются
+через разделитель и проходят общие регулярные выражения и одну таблицу
+перевода, построенную из таблицы транслитерации pytils: результат для
+каждого заголовка совпадает со slugify из pytils.
+"""
+import re
+import threading
+from collections import Counter
+from functools import lru_cache
+
+from django.conf import settings
+from django.core.signals import setting_changed
+from django.db.models import IntegerField, Max
+from django.db.models.functions import Cast, Substr
+from django.dispatch import receiver
+from pytils.translit import ALPHABET, translify
+
+SEPARATOR = '\x00'
+# Заменяет разделитель в заголовках: так же разрывает последовательности
+# пробелов и дефисов и так же удаляется при переводе.
+SEPARATOR_STANDIN = '\x01'
+AMPERSAND = re.compile(r'&amp;|&')
+SPACES = re.compile(r'[-\s]+')
+NOT_SLUG = re.compile(r'[^\w\s-]')
+
+
+class TranslationTable(dict):
+    """Таблица для str.translate, удаляющая символы не из таблицы."""
+
+    def __missing__(self, key):
+        return None
+
+
+TRANSLATION = TranslationTable(
+    (ord(symbol), NOT_SLUG.sub('', translify(symbol)).lower())
+    for symbol in ALPHABET if len(symbol) == 1
+)
+TRANSLATION[ord(SEPARATOR)] = SEPARATOR
+
+
+def slugify_many(titles):
+    """Список slug для заголовков, как у pytils.translit.slugify."""
+    if not titles:
+        return []
+    text = SEPARATOR.join(
+        str(title).lower().replace(SEPARATOR, SEPARATOR_STANDIN)
+        for title in titles
+    )
+    text = SPACES.sub('-', AMPERSAND.sub(' and ', text))
+    return text.translate(TRANSLATION).split(SEPARATOR)
+
+
+def slugify_one(title):
+    """Slug для одного заголовка, без кеша."""
+    return slugify_many((title,))[0]
+
+
+_cached_slugify = None
+_cache_lock = threading.Lock()
+
+
+def get_cached_slugify():
+    """
+    slugify_one с кешем размера NOTES_SLUGIFY_CACHE_SIZE.
+
+    Кеш создаётся при первом вызове, а не при импорте, и пересоздаётся
+    при изменении настройки: так размер берётся из действующих настроек.
+    """
+    global _cached_slugify
+    cached = _cached_slugify
+    if cached is None:
+        with _cache_lock:
+            if _cached_slugify is None:
+                _cached_slugify = lru_cache(
+                    maxsize=settings.NOTES_SLUGIFY_CACHE_SIZE
+                )(slugify_one)
+            cached = _cached_slugify
+    return cached
+
+
+def clear_slugify_cache():
+    """Сбрасывает кеш slugify вместе со статистикой."""
+    global _cached_slugify
+    with _cache_lock:
+        _cached_slugify = None
+
+
+@receiver(setting_changed)
+def slugify_setting_changed(setting, **kwargs):
+    if setting == 'NOTES_SLUGIFY_CACHE_SIZE':
+        clear_slugify_cache()
+
+
+def slugify(title):
+    """
+    Slug для одного заголовка.
+
+    Заметки часто создаются с одинаковыми заголовками, поэтому результаты
+    кешируются; размер кеша задаёт NOTES_SLUGIFY_CACHE_SIZE.
+    """
+    return get_cached_slugify()(title)
+
+
+def get_slugify_stats():
+    """Попадания, промахи и заполненность кеша slugify."""
+    info = get_cached_slugify().cache_info()
+    calls = info.hits + info.misses
+    return {
+        'hits': info.hits,
+        'misses': info.misses,
+        'hit_ratio': info.hits / calls if calls else 0.0,
+        'size': info.currsize,
+        'max_size': info.maxsize,
+    }
+
+
+def max_slug_suffix(model, base):
+    """
+    Наибольший числовой суффикс среди занятых slug вида base-N.
+
+    Максимум считает база: slug с префиксом base- выбираются диапазоном
+    по индексу slug ('.' следует за '-'), и в приложение не загружаются.
+    """
+    number = model.objects.filter(
+        slug__gt=f'{base}-',
+        slug__lt=f'{base}.',
+        slug__regex=rf'^{re.escape(base)}-[0-9]+$',
+    ).aggregate(
+        number=Max(Cast(Substr('slug', len(base) + 2), IntegerField()))
+    )['number']
+    return max(number or 1, 1)
+
+
+class SlugAllocator:
+    """
+    Раздаёт заметкам пачки уникальные slug.
+
+    Основы slug для всех заголовков пачки считаются одним вызовом
+    slugify_many. Для основы, которая встречается в пачке N раз,
+    кандидатами считаются сама основа и варианты с суффиксами -2 … -N;
+    занятые из них выбираются из базы одним запросом. Отдельный запрос
+    наибольшего суффикса нужен, только если все проверенные кандидаты
+    основы заняты. Модель передаётся явно, чтобы распределитель работал
+    и с историческими моделями в миграциях.
+    """
+
+    def __init__(self, notes, model=None):
+        if model is None:
+            from .models import Note
+            model = Note
+        self.model = model
+        self.max_length = model._meta.get_field('slug').max_length
+        notes = list(notes)
+        titles = Counter(note.title for note in notes if not note.slug)
+        self.bases = {
+            title: base[:self.max_length]
+            for title, base in zip(titles, slugify_many(list(titles)))
+        }
+        counts = Counter()
+        for title, count in titles.items():
+            counts[self.bases[title]] += count
+        self.checked = {note.slug for note in notes if note.slug}
+        for base, count in counts.items():
+            self.checked.add(base)
+            self.checked.update(
+                self.with_suffix(base, number)
+                for number in range(2, count + 1)
+            )
+        self.taken = set(model.objects.filter(
+            slug__in=self.checked
+        ).values_list('slug', flat=True))
+        self.suffixes = {}
+        self.looked_up = set()
+
+    def get_base(self, title):
+        if title not in self.bases:
+            self.bases[title] = slugify(title)[:self.max_length]
+        return self.bases[title]
+
+    def with_suffix(self, base, number):
+        suffix = f'-{number}'
+        return base[:self.max_length - len(suffix)] + suffix
+
+    def claim(self, slug):
+        """Занимает заданный slug. Возвращает False, если он уже занят."""
+        if slug in self.taken:
+            return False
+        self.taken.add(slug)
+        return True
+
+    def generate(self, title):
+        """Slug из заголовка, при необходимости с суффиксом -2, -3 и т. д."""
+        base = slug = self.get_base(title)
+        number = self.suffixes.get(base, 1)
+        while slug in self.taken or not (
+            slug in self.checked or base in self.looked_up
+        ):
+            if slug not in self.taken:
+                # Кандидат не проверялся: продолжаем за наибольшим
+                # суффиксом основы в базе.
+                number = max(number - 1, max_slug_suffix(self.model, base))
+                self.looked_up.add(base)
+            number += 1
+            slug = self.with_suffix(base, number)
+        self.suffixes[base] = number
+        self.taken.add(slug)
+        return slug
+
+
+def allocate_slugs(notes, model=None):
+    """Проставляет уникальные slug заметкам, у которых его нет."""
+    notes = list(notes)
+    allocator = SlugAllocator(notes, model)
+    for note in notes:
+        if not note.slug:
+            note.slug = allocator.generate(note.title)
+    return notes
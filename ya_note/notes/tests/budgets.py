@@ -0,0 +1,68 @@
+"""
+Бюджеты запросов к базе данных и времени ответа для страниц проекта.
+
+Таблица BUDGETS — единственное место, где задаются бюджеты: по строке
+на адрес, метод и клиента. Клиенты — атрибуты TestCase: анонимный client,
+author_client автора заметки и reader_client другого пользователя.
+Массовые операции принимают только POST с пачкой в JSON; пачки тоже
+атрибуты TestCase.
+Проверяет бюджеты плагин ya_common.budgets.
+"""
+from ya_common.budgets import Budget
+
+PAGE_MS = 250
+NOTE = 'note_slug'
+NEW = 'new_notes'
+CHANGES = 'note_changes'
+SLUGS = 'slugs'
+ANONYMOUS = 'client'
+AUTHOR = 'author_client'
+READER = 'reader_client'
+
+BUDGETS = (
+    Budget('notes:home', None, ANONYMOUS, 'get', 0, PAGE_MS),
+    Budget('notes:home', None, AUTHOR, 'get', 2, PAGE_MS),
+    Budget('notes:home', None, READER, 'get', 2, PAGE_MS),
+    Budget('notes:add', None, ANONYMOUS, 'get', 0, PAGE_MS),
+    Budget('notes:add', None, AUTHOR, 'get', 2, PAGE_MS),
+    Budget('notes:add', None, READER, 'get', 2, PAGE_MS),
+    Budget('notes:add', None, AUTHOR, 'post', 8, PAGE_MS),
+    Budget('notes:edit', NOTE, ANONYMOUS, 'get', 0, PAGE_MS),
+    Budget('notes:edit', NOTE, AUTHOR, 'get', 3, PAGE_MS),
+    Budget('notes:edit', NOTE, READER, 'get', 3, PAGE_MS),
+    Budget('notes:edit', NOTE, AUTHOR, 'post', 9, PAGE_MS),
+    Budget('notes:detail', NOTE, ANONYMOUS, 'get', 0, PAGE_MS),
+    Budget('notes:detail', NOTE, AUTHOR, 'get', 3, PAGE_MS),
+    Budget('notes:detail', NOTE, READER, 'get', 3, PAGE_MS),
+    Budget('notes:delete', NOTE, ANONYMOUS, 'get', 0, PAGE_MS),
+    Budget('notes:delete', NOTE, AUTHOR, 'get', 3, PAGE_MS),
+    Budget('notes:delete', NOTE, READER, 'get', 3, PAGE_MS),
+    Budget('notes:delete', NOTE, AUTHOR, 'post', 5, PAGE_MS),
+    Budget('notes:list', None, ANONYMOUS, 'get', 0, PAGE_MS),
+    Budget('notes:list', None, AUTHOR, 'get', 4, PAGE_MS),
+    Budget('notes:list', None, READER, 'get', 3, PAGE_MS),
+    Budget('notes:search', None, ANONYMOUS, 'get', 0, PAGE_MS),
+    Budget('notes:search', None, AUTHOR, 'get', 2, PAGE_MS),
+    Budget('notes:search', None, READER, 'get', 2, PAGE_MS),
+    Budget('notes:bulk_add', None, ANONYMOUS, 'post', 0, PAGE_MS, NEW),
+    Budget('notes:bulk_add', None, AUTHOR, 'post', 9, PAGE_MS, NEW),
+    Budget('notes:bulk_add', None, READER, 'post', 19, PAGE_MS, NEW),
+    Budget('notes:bulk_edit', None, ANONYMOUS, 'post', 0, PAGE_MS, CHANGES),
+    Budget('notes:bulk_edit', None, AUTHOR, 'post', 8, PAGE_MS, CHANGES),
+    Budget('notes:bulk_edit', None, READER, 'post', 7, PAGE_MS, CHANGES),
+    Budget('notes:bulk_delete', None, ANONYMOUS, 'post', 0, PAGE_MS, SLUGS),
+    Budget('notes:bulk_delete', None, AUTHOR, 'post', 6, PAGE_MS, SLUGS),
+    Budget('notes:bulk_delete', None, READER, 'post', 3, PAGE_MS, SLUGS),
+    Budget('notes:success', None, ANONYMOUS, 'get', 0, PAGE_MS),
+    Budget('notes:success', None, AUTHOR, 'get', 2, PAGE_MS),
+    Budget('notes:success', None, READER, 'get', 2, PAGE_MS),
+    Budget('users:login', None, ANONYMOUS, 'get', 0, PAGE_MS),
+    Budget('users:login', None, AUTHOR, 'get', 2, PAGE_MS),
+    Budget('users:login', None, READER, 'get', 2, PAGE_MS),
+    Budget('users:logout', None, ANONYMOUS, 'get', 0, PAGE_MS),
+    Budget('users:logout', None, AUTHOR, 'get', 4, PAGE_MS),
+    Budget('users:logout', None, READER, 'get', 4, PAGE_MS),
+    Budget('users:signup', None, ANONYMOUS, 'get', 0, PAGE_MS),
+    Budget('users:signup', None, AUTHOR, 'get', 0, PAGE_MS),
+    Budget('users:signup', None, READER, 'get', 0, PAGE_MS),
+)
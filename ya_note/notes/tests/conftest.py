@@ -0,0 +1,11 @@
+from django.conf import settings
+
+
+def pytest_configure(config):
+    """
+    Отложенные задачи в тестах выполняются сразу.
+
+    Бюджеты запросов и времени проверяет плагин ya_common.budgets.
+    """
+    settings.NOTES_JOBS_EAGER = True
+    config.pluginmanager.import_plugin('ya_common.budgets')
@@ -0,0 +1,79 @@
+from django.contrib.auth import get_user_model
+from django.test import TestCase, Client
+from django.urls import reverse
+
+from notes.models import Note
+from notes.tests.budgets import BUDGETS
+from notes.urls import urlpatterns
+from ya_common.budgets import budget_id, query_budget
+from yanote.urls import auth_urls
+
+User = get_user_model()
+NOTES_COUNT = 10
+
+
+class TestBudgets(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        author = User.objects.create(username='Author')
+        reader = User.objects.create(username='Reader')
+
+        cls.author_client = Client()
+        cls.reader_client = Client()
+
+        cls.author_client.force_login(author)
+        cls.reader_client.force_login(reader)
+
+        for i in range(NOTES_COUNT):
+            cls.note = Note.objects.create(
+                title=f'Заметка {i}',
+                text='Текст заметки',
+                slug=f'note-{i}',
+                author=author
+            )
+        cls.note_slug = (cls.note.slug,)
+        cls.form_data = {'title': 'Заметка', 'text': 'Новый текст'}
+        cls.new_notes = {'notes': [
+            {'title': f'Пачка {i}', 'text': 'Текст заметки'}
+            for i in range(NOTES_COUNT)
+        ]}
+        # Последнюю заметку удаляет бюджет notes:delete, поэтому пачки
+        # изменения и удаления берут заметки из начала.
+        cls.note_changes = {'notes': [
+            {'slug': f'note-{i}', 'changes': {'text': 'Новый текст'}}
+            for i in range(NOTES_COUNT // 2)
+        ]}
+        cls.slugs = {'slugs': [f'note-{NOTES_COUNT // 2}', 'no-such-note']}
+
+    def test_budgets_cover_all_routes(self):
+        """Бюджеты заданы для каждого адреса и каждого клиента."""
+        names = {f'notes:{pattern.name}' for pattern in urlpatterns} | {
+            f'users:{pattern.name}' for pattern in auth_urls[0]
+        }
+        clients = {budget.client for budget in BUDGETS}
+        covered = {(budget.name, budget.client) for budget in BUDGETS}
+        self.assertEqual(covered, {
+            (name, client) for name in names for client in clients
+        })
+
+    def test_view_budgets(self):
+        """Страницы укладываются в бюджеты запросов и времени."""
+        for number, budget in enumerate(BUDGETS):
+            with self.subTest(budget=budget_id(budget)):
+                client = getattr(self, budget.client)
+                args = getattr(self, budget.args) if budget.args else None
+                url = reverse(budget.name, args=args)
+                kwargs = {}
+                if budget.json:
+                    kwargs = {
+                        'data': getattr(self, budget.json),
+                        'content_type': 'application/json',
+                    }
+                elif budget.method == 'post':
+                    slug = args[0] if args else f'budget-{number}'
+                    kwargs = {'data': dict(self.form_data, slug=slug)}
+                with query_budget(
+                        budget_id(budget), budget.queries, budget.milliseconds
+                ):
+                    getattr(client, budget.method)(url, **kwargs)
@@ -0,0 +1,142 @@
+import json
+from http import HTTPStatus
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase, Client, override_settings
+from django.urls import reverse
+
+from notes.forms import WARNING
+from notes.models import Note
+from notes.search import search
+
+User = get_user_model()
+
+
+class TestBulk(TestCase):
+    ADD_URL = reverse('notes:bulk_add')
+    EDIT_URL = reverse('notes:bulk_edit')
+    DELETE_URL = reverse('notes:bulk_delete')
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = User.objects.create(username='Author')
+        cls.reader = User.objects.create(username='Reader')
+        cls.author_client = Client()
+        cls.author_client.force_login(cls.author)
+        cls.note = Note.objects.create(
+            title='Заметка', text='Текст', slug='zametka', author=cls.author
+        )
+        cls.reader_note = Note.objects.create(
+            title='Чужая', text='Текст', slug='chuzhaya', author=cls.reader
+        )
+
+    def post(self, url, data):
+        return self.author_client.post(
+            url, json.dumps(data), content_type='application/json'
+        )
+
+    def test_create(self):
+        """Заметки создаются пачкой, ошибки возвращаются по номерам."""
+        response = self.post(self.ADD_URL, {'notes': [
+            {'title': 'Заметка', 'text': 'Первая'},
+            {'title': 'Заметка', 'text': 'Вторая'},
+            {'title': 'Своя', 'text': 'Текст', 'slug': 'own'},
+            {'title': 'Занятая', 'text': 'Текст', 'slug': 'chuzhaya'},
+            {'title': 'Без текста'},
+            'не объект',
+        ]})
+        self.assertEqual(response.status_code, HTTPStatus.OK)
+        result = response.json()
+        self.assertEqual(
+            [(item['index'], item['slug']) for item in result['created']],
+            [(0, 'zametka-2'), (1, 'zametka-3'), (2, 'own')]
+        )
+        self.assertEqual(
+            [error['index'] for error in result['errors']], [3, 4, 5]
+        )
+        self.assertEqual(
+            result['errors'][0]['errors'], {'slug': ['chuzhaya' + WARNING]}
+        )
+        self.assertIn('text', result['errors'][1]['errors'])
+        self.assertEqual(
+            Note.objects.filter(author=self.author).count(), 4
+        )
+        self.assertEqual(
+            search(Note.objects.all(), 'Вторая', self.author).get().slug,
+            'zametka-3'
+        )
+
+    def test_create_queries_do_not_grow(self):
+        """Число запросов не зависит от размера пачки."""
+        for count in (10, 100):
+            notes = [
+                {'title': 'Заметка', 'text': f'Текст {count}-{i}'}
+                for i in range(count)
+            ]
+            # Сессия, пользователь, занятые slug, суффикс основы,
+            # а в точке сохранения — вставка, первичные ключи и два
+            # запроса индекса поиска.
+            with self.subTest(count=count), self.assertNumQueries(10):
+                self.post(self.ADD_URL, {'notes': notes})
+        self.assertEqual(
+            Note.objects.filter(slug__startswith='zametka').count(), 111
+        )
+
+    def test_update(self):
+        """Заметки изменяются пачкой; чужие и занятые slug — ошибки."""
+        other = Note.objects.create(
+            title='Другая', text='Текст', slug='drugaya', author=self.author
+        )
+        response = self.post(self.EDIT_URL, {'notes': [
+            {'slug': 'zametka', 'changes': {'text': 'Новый текст'}},
+            {'slug': 'drugaya', 'changes': {'slug': 'zametka'}},
+            {'slug': 'chuzhaya', 'changes': {'text': 'Взлом'}},
+            {'slug': 'zametka', 'changes': {'text': 'Ещё раз'}},
+            {'slug': 'drugaya', 'changes': {'slug': ''}},
+        ]})
+        result = response.json()
+        self.assertEqual(
+            [(item['index'], item['slug']) for item in result['updated']],
+            [(0, 'zametka')]
+        )
+        self.assertEqual(
+            [error['index'] for error in result['errors']], [1, 2, 3, 4]
+        )
+        self.note.refresh_from_db()
+        self.assertEqual(self.note.text, 'Новый текст')
+        other.refresh_from_db()
+        self.assertEqual(other.slug, 'drugaya')
+        self.reader_note.refresh_from_db()
+        self.assertEqual(self.reader_note.text, 'Текст')
+
+    def test_update_generates_slug(self):
+        """Пустой slug генерируется из заголовка, как при сохранении."""
+        response = self.post(self.EDIT_URL, {'notes': [
+            {'slug': 'zametka', 'changes': {'title': 'Новое', 'slug': ''}},
+        ]})
+        self.assertEqual(response.json()['updated'][0]['slug'], 'novoe')
+        self.assertTrue(Note.objects.filter(slug='novoe').exists())
+
+    def test_delete(self):
+        """Удаляются только свои заметки."""
+        response = self.post(
+            self.DELETE_URL, {'slugs': ['zametka', 'chuzhaya', 'net']}
+        )
+        result = response.json()
+        self.assertEqual(result['deleted'], [{'slug': 'zametka', 'index': 0}])
+        self.assertEqual(
+            [error['index'] for error in result['errors']], [1, 2]
+        )
+        self.assertFalse(Note.objects.filter(slug='zametka').exists())
+        self.assertTrue(Note.objects.filter(slug='chuzhaya').exists())
+
+    @override_settings(NOTES_BULK_MAX_ITEMS=2)
+    def test_bad_requests(self):
+        """Некорректное тело и слишком длинная пачка отклоняются целиком."""
+        for data in ({'notes': [{}, {}, {}]}, {'notes': {}}, [], 'notes'):
+            with self.subTest(data=data):
+                response = self.post(self.ADD_URL, data)
+                self.assertEqual(
+                    response.status_code, HTTPStatus.BAD_REQUEST
+                )
+        self.assertEqual(Note.objects.count(), 2)
@@ -0,0 +1,86 @@
+import time
+from http import HTTPStatus
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase, Client
+from django.urls import reverse
+
+from notes.models import Note
+
+User = get_user_model()
+
+REPEAT = 20
+ROUNDS = 5
+
+
+def cpu_time(func):
+    """
+    Процессорное время REPEAT вызовов func в текущем потоке.
+
+    Берётся лучший из ROUNDS замеров, чтобы тест не зависел от соседних
+    процессов, например при параллельном запуске тестов.
+    """
+    rounds = []
+    for _ in range(ROUNDS):
+        started = time.thread_time()
+        for _ in range(REPEAT):
+            func()
+        rounds.append(time.thread_time() - started)
+    return min(rounds)
+
+
+class TestConditionalDetail(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = User.objects.create(username='Author')
+        cls.author_client = Client()
+        cls.author_client.force_login(cls.author)
+        cls.note = Note.objects.create(
+            title='Заголовок', text='Текст', slug='note', author=cls.author
+        )
+        cls.url = reverse('notes:detail', args=(cls.note.slug,))
+
+    def test_revalidation(self):
+        """
+        Неизменившаяся заметка отдаётся кодом 304 без рендеринга.
+
+        Запросы те же, что и для страницы: сессия, пользователь и
+        заметка. Процессорного времени проверка тратит меньше.
+        """
+        response = self.author_client.get(self.url)
+        for header, value in (
+            ('HTTP_IF_NONE_MATCH', 'ETag'),
+            ('HTTP_IF_MODIFIED_SINCE', 'Last-Modified'),
+        ):
+            with self.subTest(header=header), self.assertNumQueries(3):
+                not_modified = self.author_client.get(
+                    self.url, **{header: response[value]}
+                )
+                self.assertEqual(
+                    not_modified.status_code, HTTPStatus.NOT_MODIFIED
+                )
+                self.assertEqual(not_modified.content, b'')
+        etag = response['ETag']
+        revalidation = cpu_time(
+            lambda: self.author_client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        )
+        render = cpu_time(lambda: self.author_client.get(self.url))
+        self.assertLess(revalidation, render)
+
+    def test_update_changes_etag(self):
+        """После изменения заметки страница отдаётся заново."""
+        etag = self.author_client.get(self.url)['ETag']
+        self.note.text = 'Новый текст'
+        self.note.save()
+        response = self.author_client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, HTTPStatus.OK)
+        self.assertNotEqual(response['ETag'], etag)
+
+    def test_other_user_gets_not_found(self):
+        """Чужая заметка недоступна и с заголовками условного запроса."""
+        etag = self.author_client.get(self.url)['ETag']
+        reader = User.objects.create(username='Reader')
+        self.client.force_login(reader)
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, HTTPStatus.NOT_FOUND)
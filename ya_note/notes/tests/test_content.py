@@ -1,4 +1,10 @@
+import tracemalloc
+from io import StringIO
+
+from django.conf import settings
 from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.db import connection
 from django.test import TestCase, Client
 from django.urls import reverse
 
@@ -56,3 +62,118 @@ class TestContent(TestCase):
                 response = self.author_client.get(url)
                 self.assertIn('form', response.context)
                 self.assertIsInstance(response.context['form'], NoteForm)
+
+
+class TestSearch(TestCase):
+    LIST_URL = reverse('notes:list')
+    SEARCH_URL = reverse('notes:search')
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = User.objects.create(username='Author')
+        reader = User.objects.create(username='Reader')
+
+        cls.author_client = Client()
+        cls.author_client.force_login(cls.author)
+
+        cls.note = Note.objects.create(
+            title='Покупки', text='Купить молоко', author=cls.author
+        )
+        Note.objects.create(
+            title='Дела', text='Позвонить маме', author=cls.author
+        )
+        Note.objects.create(
+            title='Покупки', text='Купить молоко', author=reader
+        )
+
+    def search(self, query):
+        response = self.author_client.get(self.LIST_URL, {'q': query})
+        return list(response.context['object_list'])
+
+    def test_search_by_title_and_text(self):
+        """Поиск находит заметки по словам заголовка и текста."""
+        for query in ('покупки', 'Молок', 'купить молоко'):
+            with self.subTest(query=query):
+                self.assertEqual(self.search(query), [self.note])
+
+    def test_search_index_follows_changes(self):
+        """Индекс обновляется при изменении и удалении заметки."""
+        self.note.text = 'Купить хлеб'
+        self.note.save()
+        self.assertEqual(self.search('молоко'), [])
+        self.assertEqual(self.search('хлеб'), [self.note])
+        self.note.delete()
+        self.assertEqual(self.search('хлеб'), [])
+
+    def test_search_endpoint(self):
+        """Поиск в формате JSON возвращает заметки пользователя."""
+        response = self.author_client.get(self.SEARCH_URL, {'q': 'молоко'})
+        self.assertEqual(response.json(), {'results': [{
+            'id': self.note.id,
+            'slug': self.note.slug,
+            'title': self.note.title,
+            'url': reverse('notes:detail', args=(self.note.slug,)),
+        }]})
+
+    def test_rebuild_search_index(self):
+        """Команда rebuild_search_index восстанавливает индекс."""
+        with connection.cursor() as cursor:
+            cursor.execute('DELETE FROM notes_note_fts')
+        self.assertEqual(self.search('молоко'), [])
+        call_command('rebuild_search_index', stdout=StringIO())
+        self.assertEqual(self.search('молоко'), [self.note])
+
+
+class TestNotesListPagination(TestCase):
+    LIST_URL = reverse('notes:list')
+    NOTES_COUNT = 100_000
+    # Запросы: сессия, пользователь, количество заметок, страница.
+    MAX_QUERIES = 4
+    MAX_MEMORY = 2 * 1024 * 1024
+
+    @classmethod
+    def setUpTestData(cls):
+        author = User.objects.create(username='Author')
+        cls.author_client = Client()
+        cls.author_client.force_login(author)
+        Note.objects.bulk_create(
+            (
+                Note(
+                    title=f'Заметка {i}',
+                    text='Длинный текст заметки. ' * 50,
+                    slug=f'note-{i}',
+                    author=author
+                )
+                for i in range(cls.NOTES_COUNT)
+            ),
+            batch_size=5000
+        )
+
+    def test_list_is_paginated(self):
+        """На странице списка не больше NOTES_COUNT_ON_PAGE заметок."""
+        response = self.author_client.get(self.LIST_URL, {'page': 2})
+        object_list = response.context['object_list']
+        self.assertEqual(len(object_list), settings.NOTES_COUNT_ON_PAGE)
+        self.assertEqual(
+            response.context['paginator'].count, self.NOTES_COUNT
+        )
+
+    def test_list_defers_text(self):
+        """Текст заметок в списке не загружается."""
+        response = self.author_client.get(self.LIST_URL)
+        note = response.context['object_list'][0]
+        self.assertEqual(
+            note.get_deferred_fields(), {'text', 'author_id', 'updated'}
+        )
+
+    def test_list_queries_and_memory(self):
+        """Число запросов и память не растут с числом заметок."""
+        self.author_client.get(self.LIST_URL)
+        tracemalloc.start()
+        try:
+            with self.assertNumQueries(self.MAX_QUERIES):
+                self.author_client.get(self.LIST_URL)
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+        self.assertLess(peak, self.MAX_MEMORY)
@@ -0,0 +1,27 @@
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.test import TestCase, override_settings
+
+
+def pragma(connection, name):
+    with connection.cursor() as cursor:
+        cursor.execute(f'PRAGMA {name}')
+        return cursor.fetchone()[0]
+
+
+class TestSqlitePragmas(TestCase):
+
+    @override_settings(
+        SQLITE_PRAGMAS={'cache_size': -4096, 'synchronous': 'NORMAL'}
+    )
+    def test_pragmas_applied_to_new_connection(self):
+        """
+        Новое соединение настраивается по SQLITE_PRAGMAS.
+
+        Соединение открывается отдельно от общего соединения тестов,
+        чтобы PRAGMA не достались следующим тестам.
+        """
+        connection = connections.create_connection(DEFAULT_DB_ALIAS)
+        self.addCleanup(connection.close)
+        self.assertEqual(pragma(connection, 'cache_size'), -4096)
+        # 1 — NORMAL.
+        self.assertEqual(pragma(connection, 'synchronous'), 1)
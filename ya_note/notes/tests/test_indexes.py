@@ -0,0 +1,64 @@
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import TestCase, Client
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from notes.models import Note
+from ya_common.plans import slow_plan_steps
+
+User = get_user_model()
+
+
+class TestIndexes(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = User.objects.create(username='Author')
+        reader = User.objects.create(username='Reader')
+        cls.author_client = Client()
+        cls.author_client.force_login(cls.author)
+        for user in (cls.author, reader):
+            Note.objects.bulk_create(
+                Note(
+                    title=f'Заметка {i}',
+                    text='Текст',
+                    slug=f'{user.username}-{i}',
+                    author=user
+                )
+                for i in range(10)
+            )
+        cls.note = Note.objects.filter(author=cls.author).first()
+
+    def test_views_use_indexes(self):
+        """Страницы заметок не просматривают таблицы целиком."""
+        urls = (
+            ('notes:list', None, None),
+            ('notes:list', None, {'q': 'Заметка', 'page': 2}),
+            ('notes:search', None, {'q': 'Заметка'}),
+            ('notes:detail', (self.note.slug,), None),
+            ('notes:edit', (self.note.slug,), None),
+            ('notes:delete', (self.note.slug,), None),
+        )
+        for name, args, data in urls:
+            with self.subTest(name=name, data=data):
+                with CaptureQueriesContext(connection) as context:
+                    self.author_client.get(reverse(name, args=args), data)
+                self.assertEqual(
+                    slow_plan_steps(context.captured_queries), []
+                )
+
+    def test_note_write_uses_indexes(self):
+        """Создание и редактирование заметки используют индексы."""
+        form_data = {'title': 'Новая заметка', 'text': 'Текст'}
+        urls = (
+            reverse('notes:add'),
+            reverse('notes:edit', args=(self.note.slug,)),
+        )
+        for url in urls:
+            with self.subTest(url=url):
+                with CaptureQueriesContext(connection) as context:
+                    self.author_client.post(url, form_data)
+                self.assertEqual(
+                    slow_plan_steps(context.captured_queries), []
+                )
@@ -0,0 +1,104 @@
+from datetime import timedelta
+from io import StringIO
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from notes.jobs import get_metrics, job, runner
+from notes.models import Job, Note
+from notes.search import search
+
+User = get_user_model()
+
+calls = []
+
+
+@job
+def flaky(fail):
+    calls.append(fail)
+    if fail:
+        raise ValueError('Сбой')
+
+
+@override_settings(
+    NOTES_JOBS_EAGER=False,
+    NOTES_JOBS_RETRY_DELAY=0,
+    NOTES_JOBS_MAX_ATTEMPTS=2,
+)
+class TestJobs(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = User.objects.create(username='Author')
+        cls.author_client = Client()
+        cls.author_client.force_login(cls.author)
+
+    def setUp(self):
+        calls.clear()
+
+    def found(self, query):
+        return list(search(Note.objects.all(), query, self.author))
+
+    def test_note_indexed_by_job(self):
+        """Заметка попадает в поисковый индекс отложенной задачей."""
+        self.author_client.post(
+            reverse('notes:add'), {'title': 'Покупки', 'text': 'Молоко'}
+        )
+        self.assertEqual(
+            Job.objects.get().name, 'notes.jobs.reindex_note'
+        )
+        self.assertEqual(self.found('молоко'), [])
+        self.assertEqual(runner.drain(), 1)
+        self.assertEqual(self.found('молоко'), [Note.objects.get()])
+        self.assertFalse(Job.objects.exists())
+
+    def test_retry_then_fail(self):
+        """Упавшая задача повторяется, а исчерпав попытки, остаётся."""
+        queued = flaky.delay(fail=True)
+        self.assertEqual(runner.drain(), 0)
+        self.assertEqual(calls, [True, True])
+        queued.refresh_from_db()
+        self.assertEqual((queued.state, queued.attempts), (Job.FAILED, 2))
+        self.assertIn('ValueError', queued.last_error)
+
+    def test_claimed_once(self):
+        """Задачу, которую уже взяли, второй раз не выполнить."""
+        queued = flaky.delay(fail=False)
+        self.assertTrue(runner.run(queued.pk))
+        self.assertFalse(runner.run(queued.pk))
+        self.assertEqual(calls, [False])
+
+    def test_drain_runs_stale_job(self):
+        """Задачу, зависшую у остановленного процесса, выполняет drain."""
+        queued = flaky.delay(fail=False)
+        Job.objects.filter(pk=queued.pk).update(
+            state=Job.RUNNING, attempts=1,
+            started=timezone.now() - timedelta(
+                seconds=settings.NOTES_JOBS_TIMEOUT + 1
+            ),
+        )
+        self.assertEqual(runner.drain(), 1)
+        self.assertEqual(calls, [False])
+        self.assertFalse(Job.objects.filter(pk=queued.pk).exists())
+
+    def test_drain_skips_running_job(self):
+        """Задачу, которую выполняют прямо сейчас, drain не трогает."""
+        queued = flaky.delay(fail=False)
+        Job.objects.filter(pk=queued.pk).update(
+            state=Job.RUNNING, started=timezone.now()
+        )
+        self.assertEqual(runner.drain(), 0)
+        self.assertEqual(calls, [])
+
+    def test_drain_command_metrics(self):
+        flaky.delay(fail=False)
+        flaky.delay(fail=False)
+        stdout = StringIO()
+        call_command('drain_jobs', '--limit', '1', stdout=stdout)
+        self.assertIn('Выполнено задач: 1', stdout.getvalue())
+        self.assertIn('depth: 1', stdout.getvalue())
+        self.assertEqual(get_metrics()['depth'], 1)
@@ -52,6 +52,18 @@ class TestCreateNote(TestCase):
         expected_slug = slugify(self.form_data['title'])
         self.assertEqual(note.slug, expected_slug)
 
+    def test_empty_slug_collision_gets_suffix(self):
+        """Занятый автоматический slug дополняется суффиксом."""
+        self.form_data.pop('slug')
+        for _ in range(3):
+            self.author_client.post(self.add_url, self.form_data)
+        expected_slug = slugify(self.form_data['title'])
+        self.assertQuerysetEqual(
+            Note.objects.order_by('pk').values_list('slug', flat=True),
+            (expected_slug, f'{expected_slug}-2', f'{expected_slug}-3'),
+            transform=str
+        )
+
     def test_not_unique_slug(self):
         """Проверка создания заметки с одинаковым slug."""
         self.author_client.post(self.add_url, self.form_data)
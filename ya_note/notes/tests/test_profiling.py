@@ -0,0 +1,72 @@
+from django.contrib.auth import get_user_model
+from django.test import Client, TestCase, modify_settings, override_settings
+from django.urls import reverse
+
+from ya_common.profiling import stats
+
+User = get_user_model()
+
+
+@modify_settings(
+    MIDDLEWARE={'prepend': 'ya_common.profiling.ProfilingMiddleware'}
+)
+@override_settings(PROFILING_SAMPLE_RATE=1)
+class TestProfiling(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = User.objects.create(username='Author')
+        cls.author_client = Client()
+        cls.author_client.force_login(cls.author)
+        cls.staff = User.objects.create(username='Staff', is_staff=True)
+        cls.staff_client = Client()
+        cls.staff_client.force_login(cls.staff)
+
+    def setUp(self):
+        stats.clear()
+        self.addCleanup(stats.clear)
+
+    def test_request_profiled(self):
+        """Запрос измеряется и учитывается под именем адреса."""
+        self.author_client.get(reverse('notes:list'))
+        summary = stats.summary()['notes:list']
+        self.assertEqual(summary['count'], 1)
+        self.assertGreater(summary['sql_queries']['0.5'], 0)
+        self.assertGreater(summary['template_seconds']['0.5'], 0)
+        self.assertLess(
+            summary['template_seconds']['0.5'], summary['seconds']['0.5']
+        )
+        self.assertGreater(summary['cpu_seconds']['0.5'], 0)
+
+    @override_settings(PROFILING_SAMPLE_RATE=0)
+    def test_not_sampled(self):
+        self.author_client.get(reverse('notes:list'))
+        self.assertEqual(stats.summary(), {})
+
+    def test_stats_view(self):
+        """Перцентили доступны только персоналу, в JSON и для Prometheus."""
+        url = reverse('profiling')
+        self.author_client.get(reverse('notes:list'))
+        self.assertEqual(self.author_client.get(url).status_code, 404)
+        self.assertEqual(
+            self.staff_client.get(url).json()['notes:list']['count'], 1
+        )
+        text = self.staff_client.get(
+            url, {'format': 'prometheus'}
+        ).content.decode()
+        self.assertIn(
+            'yanote_request_seconds_count{view="notes:list"} 1', text
+        )
+        queries = stats.summary()['notes:list']['sql_queries']['0.5']
+        self.assertIn(
+            f'yanote_request_sql_queries_sum{{view="notes:list"}} {queries}',
+            text
+        )
+
+    @override_settings(PROFILING_METRIC_PREFIX='custom')
+    def test_metric_prefix(self):
+        self.author_client.get(reverse('notes:list'))
+        text = self.staff_client.get(
+            reverse('profiling'), {'format': 'prometheus'}
+        ).content.decode()
+        self.assertIn('custom_request_seconds_sum{view="notes:list"}', text)
@@ -48,6 +48,7 @@ class TestRoutes(TestCase):
         """Проверка страниц для авторизованного пользователя."""
         urls = (
             'notes:list',
+            'notes:search',
             'notes:success',
             'notes:add',
         )
@@ -62,6 +63,7 @@ class TestRoutes(TestCase):
         login_url = reverse('users:login')
         urls = (
             ('notes:list', None),
+            ('notes:search', None),
             ('notes:success', None),
             ('notes:add', None),
             ('notes:detail', (self.note.slug,)),
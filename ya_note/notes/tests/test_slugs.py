@@ -0,0 +1,200 @@
+import json
+from importlib import import_module
+from io import StringIO
+from tempfile import NamedTemporaryFile
+
+from django.apps import apps
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.test import SimpleTestCase, TestCase, override_settings
+from pytils.translit import slugify
+
+from notes.models import Note
+from notes.slugs import (
+    allocate_slugs, clear_slugify_cache, get_slugify_stats, max_slug_suffix,
+    slugify as cached_slugify, slugify_many
+)
+
+User = get_user_model()
+backfill = import_module('notes.migrations.0005_backfill_note_slugs')
+
+
+class TestSlugifyMany(SimpleTestCase):
+    TITLES = (
+        'Заметка',
+        'Щука & Ёж — №1…',
+        'Съешь же ещё этих мягких французских булок',
+        '  --Пробелы\tи\nдефисы--  ',
+        'Tom &amp; Jerry',
+        '«Кавычки» и ‘апострофы’',
+        'Ünïcödé 中文 émoji 🙂',
+        'under_score',
+        'Разделитель\x00внутри \x00 заголовка',
+        '',
+    )
+
+    def test_matches_pytils(self):
+        """Slug для каждого заголовка совпадает со slugify из pytils."""
+        self.assertEqual(
+            slugify_many(self.TITLES),
+            [slugify(title) for title in self.TITLES]
+        )
+
+    def test_empty(self):
+        self.assertEqual(slugify_many([]), [])
+
+
+class TestMaxSlugSuffix(TestCase):
+
+    def test_max_suffix(self):
+        """Наибольший суффикс считается числом, одним запросом."""
+        author = User.objects.create(username='Author')
+        Note.objects.bulk_create(
+            Note(title='Заметка', text='Текст', slug=slug, author=author)
+            for slug in (
+                'pokupki', 'pokupki-2', 'pokupki-10', 'pokupki-x',
+                'pokupki-3-1', 'pokupki2-99', 'pokupkii-50',
+            )
+        )
+        with self.assertNumQueries(1):
+            self.assertEqual(max_slug_suffix(Note, 'pokupki'), 10)
+        self.assertEqual(max_slug_suffix(Note, 'idei'), 1)
+
+
+class TestSlugifyCache(TestCase):
+
+    def setUp(self):
+        clear_slugify_cache()
+        self.addCleanup(clear_slugify_cache)
+
+    def test_stats(self):
+        """Повторная транслитерация заголовка берётся из кеша."""
+        author = User.objects.create(username='Author')
+        for _ in range(3):
+            Note.objects.create(title='Заметка', text='Текст', author=author)
+        self.assertEqual(cached_slugify('Заметка'), slugify('Заметка'))
+        stats = get_slugify_stats()
+        self.assertEqual((stats['hits'], stats['misses']), (3, 1))
+        self.assertEqual(stats['hit_ratio'], 0.75)
+        self.assertEqual(stats['size'], 1)
+
+    def test_size_from_settings(self):
+        """Размер кеша берётся из действующих настроек."""
+        with override_settings(NOTES_SLUGIFY_CACHE_SIZE=2):
+            for title in ('Заметка', 'Идеи', 'Книги'):
+                cached_slugify(title)
+            stats = get_slugify_stats()
+            self.assertEqual((stats['max_size'], stats['size']), (2, 2))
+        self.assertEqual(
+            get_slugify_stats()['max_size'], settings.NOTES_SLUGIFY_CACHE_SIZE
+        )
+
+
+class TestAllocateSlugs(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = User.objects.create(username='Author')
+        Note.objects.create(title='Заметка', text='Текст', author=cls.author)
+        Note.objects.create(title='Заметка', text='Текст', author=cls.author)
+
+    def test_allocate(self):
+        """Повторы в пачке и занятые в базе slug получают суффиксы."""
+        notes = [
+            Note(title=title, text='Текст', author=self.author)
+            for title in ('Заметка', 'Новая', 'Новая', 'Заметка')
+        ]
+        # Занятые кандидаты и наибольший суффикс для занятой основы.
+        with self.assertNumQueries(2):
+            allocate_slugs(notes)
+        self.assertEqual(
+            [note.slug for note in notes],
+            ['zametka-3', 'novaya', 'novaya-2', 'zametka-4']
+        )
+
+    def test_allocate_one_query(self):
+        """Без занятых в базе кандидатов нужен один запрос."""
+        notes = [
+            Note(title='Новая', text='Текст', author=self.author)
+            for _ in range(3)
+        ]
+        with self.assertNumQueries(1):
+            allocate_slugs(notes)
+        self.assertEqual(
+            [note.slug for note in notes], ['novaya', 'novaya-2', 'novaya-3']
+        )
+
+
+class TestBackfillMigration(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = User.objects.create(username='Author')
+        Note.objects.create(title='Заметка', text='Текст', author=cls.author)
+        Note.objects.create(title='Заметка', text='Текст', author=cls.author)
+
+    def test_matches_allocator(self):
+        """Копия алгоритма в миграции раздаёт те же slug, что и сервис."""
+        titles = ('Заметка', 'Новая', 'Новая', 'Заметка', '')
+        notes, frozen = (
+            [Note(title=title, author=self.author) for title in titles]
+            for _ in range(2)
+        )
+        allocate_slugs(notes)
+        with self.assertNumQueries(2):
+            backfill.allocate_slugs(Note, frozen, 100)
+        self.assertEqual(
+            [note.slug for note in frozen], [note.slug for note in notes]
+        )
+
+    def test_backfill(self):
+        """Миграция проставляет slug заметке, сохранённой без него."""
+        Note.objects.bulk_create(
+            [Note(title='Заметка', text='Текст', author=self.author)]
+        )
+        backfill.backfill_slugs(apps, None)
+        self.assertEqual(
+            sorted(Note.objects.values_list('slug', flat=True)),
+            ['zametka', 'zametka-2', 'zametka-3']
+        )
+
+
+class TestImportNotes(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = User.objects.create(username='Author')
+
+    def import_notes(self, lines, **options):
+        stdout, stderr = StringIO(), StringIO()
+        with NamedTemporaryFile('w', suffix='.jsonl') as file:
+            file.write('\n'.join(lines))
+            file.flush()
+            call_command(
+                'import_notes', file.name, author='Author',
+                stdout=stdout, stderr=stderr, **options
+            )
+        return stdout.getvalue(), stderr.getvalue()
+
+    def test_import(self):
+        """Заметки импортируются пачками, ошибки выводятся по номерам."""
+        stdout, stderr = self.import_notes([
+            json.dumps({'title': 'Заметка', 'text': 'Первая'}),
+            json.dumps({'title': 'Заметка', 'text': 'Вторая'}),
+            '',
+            'не json',
+            json.dumps({'title': 'Своя', 'text': 'Текст', 'slug': 'own'}),
+        ], batch_size=2)
+        self.assertEqual(
+            list(Note.objects.order_by('pk').values_list('slug', 'text')),
+            [('zametka', 'Первая'), ('zametka-2', 'Вторая'),
+             ('own', 'Текст')]
+        )
+        self.assertIn('Импортировано заметок: 3, с ошибками: 1', stdout)
+        self.assertIn('Заметка 3:', stderr)
+
+    def test_unknown_author(self):
+        with self.assertRaises(CommandError):
+            call_command('import_notes', '-', author='Nobody')
@@ -11,5 +11,11 @@ urlpatterns = [
     path('note/<slug:slug>/', views.NoteDetail.as_view(), name='detail'),
     path('delete/<slug:slug>/', views.NoteDelete.as_view(), name='delete'),
     path('notes/', views.NotesList.as_view(), name='list'),
+    path('search/', views.NotesSearch.as_view(), name='search'),
+    path('bulk/add/', views.NotesBulkCreate.as_view(), name='bulk_add'),
+    path('bulk/edit/', views.NotesBulkUpdate.as_view(), name='bulk_edit'),
+    path(
+        'bulk/delete/', views.NotesBulkDelete.as_view(), name='bulk_delete'
+    ),
     path('done/', views.NoteSuccess.as_view(), name='success'),
 ]
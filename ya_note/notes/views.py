@@ -1,9 +1,18 @@
+import json
+
 from django.contrib.auth.mixins import LoginRequiredMixin
-from django.urls import reverse_lazy
+from django.db import IntegrityError, transaction
+from django.conf import settings
+from django.http import Http404, HttpResponseRedirect, JsonResponse
+from django.urls import reverse, reverse_lazy
+from django.utils.decorators import method_decorator
 from django.views import generic
+from django.views.decorators.http import condition
 
-from .forms import NoteForm
+from .bulk import create_notes, delete_notes, update_notes
+from .forms import WARNING, NoteForm
 from .models import Note
+from .search import search
 
 
 class Home(generic.TemplateView):
@@ -26,22 +35,32 @@ class NoteBase(LoginRequiredMixin):
         return self.model.objects.filter(author=self.request.user)
 
 
-class NoteCreate(NoteBase, generic.CreateView):
-    """Добавление заметки."""
+class NoteFormBase(NoteBase):
+    """Базовый класс для создания и редактирования заметки."""
     template_name = 'notes/form.html'
     form_class = NoteForm
 
     def form_valid(self, form):
-        new_note = form.save(commit=False)
-        new_note.author = self.request.user
-        new_note.save()
+        """Занятый slug обнаруживается уникальным индексом в базе данных."""
+        try:
+            with transaction.atomic():
+                self.object = form.save()
+        except IntegrityError:
+            form.add_error('slug', form.instance.slug + WARNING)
+            return self.form_invalid(form)
+        return HttpResponseRedirect(self.get_success_url())
+
+
+class NoteCreate(NoteFormBase, generic.CreateView):
+    """Добавление заметки."""
+
+    def form_valid(self, form):
+        form.instance.author = self.request.user
         return super().form_valid(form)
 
 
-class NoteUpdate(NoteBase, generic.UpdateView):
+class NoteUpdate(NoteFormBase, generic.UpdateView):
     """Редактирование заметки."""
-    template_name = 'notes/form.html'
-    form_class = NoteForm
 
 
 class NoteDelete(NoteBase, generic.DeleteView):
@@ -50,10 +69,154 @@ class NoteDelete(NoteBase, generic.DeleteView):
 
 
 class NotesList(NoteBase, generic.ListView):
-    """Список всех заметок пользователя."""
+    """
+    Список заметок пользователя или найденных по запросу ?q=.
+
+    Список разбит на страницы, из базы загружаются только поля,
+    которые выводятся в шаблоне.
+    """
     template_name = 'notes/list.html'
 
+    def get_paginate_by(self, queryset):
+        return settings.NOTES_COUNT_ON_PAGE
 
+    def get_queryset(self):
+        queryset = super().get_queryset().only(
+            'id', 'slug', 'title'
+        ).order_by('id')
+        query = self.request.GET.get('q')
+        if query:
+            queryset = search(queryset, query, self.request.user)
+        return queryset
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context['query'] = self.request.GET.get('q', '')
+        return context
+
+
+class NotesSearch(NoteBase, generic.View):
+    """Поиск по заметкам пользователя в формате JSON."""
+
+    def get(self, request, *args, **kwargs):
+        notes = search(
+            self.get_queryset(), request.GET.get('q'), request.user
+        ).values('id', 'slug', 'title')[:settings.NOTES_SEARCH_LIMIT]
+        return JsonResponse({'results': [
+            dict(note, url=reverse('notes:detail', args=(note['slug'],)))
+            for note in notes
+        ]})
+
+
+def get_note(request, slug):
+    """Заметка пользователя; загружается из базы один раз за запрос."""
+    if not hasattr(request, 'note'):
+        request.note = Note.objects.filter(
+            author=request.user, slug=slug
+        ).first()
+    return request.note
+
+
+def get_note_last_modified(request, slug):
+    note = get_note(request, slug)
+    return note.updated if note else None
+
+
+def get_note_etag(request, slug):
+    """Заметку видит только автор, поэтому ETag зависит лишь от неё."""
+    note = get_note(request, slug)
+    if note is None:
+        return None
+    return f'"{note.pk}-{note.updated.timestamp():.6f}"'
+
+
+@method_decorator(
+    condition(
+        etag_func=get_note_etag, last_modified_func=get_note_last_modified
+    ),
+    name='get'
+)
 class NoteDetail(NoteBase, generic.DetailView):
     """Заметка подробно."""
     template_name = 'notes/detail.html'
+
+    def get_object(self, queryset=None):
+        note = get_note(self.request, self.kwargs['slug'])
+        if note is None:
+            raise Http404('Заметка не найдена.')
+        return note
+
+
+class NotesBulkBase(NoteBase, generic.View):
+    """
+    Базовый класс массовых операций с заметками.
+
+    Тело запроса — JSON-объект, в котором под ключом key лежит список
+    не длиннее NOTES_BULK_MAX_ITEMS. В ответе — обработанные заметки и
+    ошибки, каждая со своим номером в списке.
+    """
+    http_method_names = ['post']
+    key = 'notes'
+    result_key = None
+
+    def process(self, items):
+        raise NotImplementedError
+
+    def describe(self, note):
+        return {
+            'slug': note.slug,
+            'url': reverse('notes:detail', args=(note.slug,)),
+        }
+
+    def post(self, request, *args, **kwargs):
+        try:
+            items = json.loads(request.body)[self.key]
+        except (ValueError, KeyError, TypeError):
+            items = None
+        if not isinstance(items, list):
+            return JsonResponse(
+                {'error': f'Ожидается объект со списком {self.key}.'},
+                status=400
+            )
+        if len(items) > settings.NOTES_BULK_MAX_ITEMS:
+            return JsonResponse(
+                {'error': 'Не больше '
+                 f'{settings.NOTES_BULK_MAX_ITEMS} элементов за запрос.'},
+                status=400
+            )
+        done, errors = self.process(items)
+        return JsonResponse({
+            self.result_key: [
+                dict(self.describe(note), index=index)
+                for index, note in done
+            ],
+            'errors': errors,
+        })
+
+
+class NotesBulkCreate(NotesBulkBase):
+    """Добавление заметок пачкой."""
+    result_key = 'created'
+
+    def process(self, items):
+        return create_notes(self.request.user, items)
+
+
+class NotesBulkUpdate(NotesBulkBase):
+    """Редактирование заметок пачкой."""
+    result_key = 'updated'
+
+    def process(self, items):
+        return update_notes(self.request.user, items)
+
+
+class NotesBulkDelete(NotesBulkBase):
+    """Удаление заметок пачкой."""
+    key = 'slugs'
+    result_key = 'deleted'
+
+    def process(self, items):
+        return delete_notes(self.request.user, items)
+
+    def describe(self, slug):
+        return {'slug': slug}
@@ -1,9 +1,15 @@
+import os
+import sys
 from pathlib import Path
 
 from django.urls import reverse_lazy
 
 BASE_DIR = Path(__file__).resolve().parent.parent
 
+# Общий для проектов пакет ya_common лежит рядом с ними.
+if str(BASE_DIR.parent) not in sys.path:
+    sys.path.append(str(BASE_DIR.parent))
+
 SECRET_KEY = 'django-insecure-yipnj$#j!ajarq%k55z4kuf3x79)91h0h42o9!1ho(z=!%mt=#'
 
 DEBUG = False
@@ -31,6 +37,17 @@ MIDDLEWARE = [
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
 
+# Профилирование доли запросов (ya_common/profiling.py), по умолчанию
+# выключено. Перцентили доступны персоналу по адресу /profiling/.
+PROFILING_SAMPLE_RATE = float(
+    os.environ.get('YANOTE_PROFILING_SAMPLE_RATE', 0)
+)
+PROFILING_WINDOW = 1000
+# Префикс имён метрик в формате Prometheus.
+PROFILING_METRIC_PREFIX = 'yanote'
+if PROFILING_SAMPLE_RATE:
+    MIDDLEWARE.insert(0, 'ya_common.profiling.ProfilingMiddleware')
+
 ROOT_URLCONF = 'yanote.urls'
 
 TEMPLATES = [
@@ -59,6 +76,32 @@ DATABASES = {
     }
 }
 
+# Профиль базы данных: 'default' или 'production'. В боевом профиле
+# соединения переиспользуются между запросами, пишущий процесс не
+# блокирует читающих (WAL), а при занятой базе соединение ждёт
+# освобождения блокировки, а не падает сразу.
+DATABASE_PROFILE = os.environ.get('YANOTE_DATABASE_PROFILE', 'default')
+
+# PRAGMA, выполняемые при открытии каждого соединения с SQLite.
+SQLITE_PRAGMAS = {}
+
+if DATABASE_PROFILE == 'production':
+    DATABASES['default'].update(
+        CONN_MAX_AGE=int(os.environ.get('YANOTE_CONN_MAX_AGE', 600)),
+        OPTIONS={
+            # Время ожидания блокировки базы, секунды.
+            'timeout': float(os.environ.get('YANOTE_DATABASE_TIMEOUT', 20)),
+        },
+    )
+    SQLITE_PRAGMAS = {
+        'journal_mode': 'WAL',
+        'synchronous': 'NORMAL',
+        'mmap_size': 256 * 1024 * 1024,
+        # Отрицательное значение задаёт размер кеша в килобайтах.
+        'cache_size': -64 * 1024,
+        'temp_store': 'MEMORY',
+    }
+
 
 AUTH_PASSWORD_VALIDATORS = [
     {
@@ -87,3 +130,21 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
 LOGIN_URL = reverse_lazy('users:login')
 LOGIN_REDIRECT_URL = reverse_lazy('notes:home')
+
+NOTES_COUNT_ON_PAGE = 50
+
+NOTES_SEARCH_LIMIT = 20
+
+# Сколько последних заголовков помнит кеш транслитерации slug.
+NOTES_SLUGIFY_CACHE_SIZE = 4096
+
+# Фоновые задачи после записи (ya_common/jobs.py, notes/jobs.py).
+NOTES_JOBS_EAGER = False
+NOTES_JOBS_MAX_WORKERS = 2
+NOTES_JOBS_MAX_ATTEMPTS = 5
+NOTES_JOBS_RETRY_DELAY = 10
+# Через сколько секунд незавершённую задачу можно забрать снова.
+NOTES_JOBS_TIMEOUT = 60 * 5
+
+# Наибольшее число заметок в одном запросе массовых операций.
+NOTES_BULK_MAX_ITEMS = 1000